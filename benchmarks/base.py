@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, print_function, unicode_literals
+from django.conf import settings
+import time
+
+
+def setup(**options):
+    """Configure and set up django for running a benchmark against an
+    in-memory SQLite database.
+
+    :param options: Additional settings.
+    """
+    if not settings.configured:
+        defaults = dict(
+            USE_TZ=True,
+            DATABASES={
+                'default': {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': ':memory:',
+                }
+            },
+            INSTALLED_APPS=[
+                'django.contrib.auth',
+                'django.contrib.contenttypes',
+                'conference',
+            ],
+        )
+        defaults.update(options)
+        settings.configure(**defaults)
+
+    import django
+    django.setup()
+
+
+def migrate(target=None, verbosity=0):
+    """Migrate all apps, or the conference app to a specific migration.
+
+    :param target: Conference migration name, e.g. ``'0001'``.
+    :type target: str
+    """
+    from django.core.management import call_command
+    args = ['conference', target] if target else []
+    call_command('migrate', *args, verbosity=verbosity, interactive=False)
+
+
+class Timer(object):
+    """Context manager measuring elapsed wall-clock time, in seconds."""
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.time() - self.start
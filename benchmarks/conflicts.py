@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time conflict detection for schedules of 10,000 and 100,000 time slots,
+comparing the sweep line against checking every pair of time slots.
+
+Usage::
+
+    python -m benchmarks.conflicts [--timeslots 10000 100000] [--rooms 50]
+        [--naive 10000]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+import itertools
+
+
+def create_timeslots(timeslots, rooms):
+    """Create time slots back-to-back in each room, with every 100th time
+    slot overlapping the previous one, and a presenter for every 5 time
+    slots, spread across the schedule."""
+    from conference.models import (Conference, Presenter, Resource, TimeSlot,
+                                   Venue)
+    from django.utils import timezone
+
+    start = timezone.now()
+    conference = Conference.objects.create(name='Conference', slug='bench')
+    venue = Venue.objects.create(name='Venue')
+    resources = Resource.objects.bulk_create([
+        Resource(name='Room {}'.format(n), venue=venue) for n in range(rooms)])
+    presenters = Presenter.objects.bulk_create([
+        Presenter(name='Presenter {}'.format(n))
+        for n in range(timeslots // 5)])
+    objs, timeslot_resources, timeslot_presenters = [], [], []
+    for n in range(timeslots):
+        hour = n // rooms
+        start_at = start + datetime.timedelta(hours=hour)
+        if n % 100 == 99:
+            start_at -= datetime.timedelta(minutes=30)
+        timeslot = TimeSlot(conference=conference,
+                            name='Time Slot {}'.format(n), start_at=start_at,
+                            end_at=start_at + datetime.timedelta(hours=1))
+        objs.append(timeslot)
+        timeslot_resources.append(TimeSlot.resources.through(
+            timeslot=timeslot, resource=resources[n % rooms]))
+        timeslot_presenters.append(TimeSlot.presenters.through(
+            timeslot=timeslot, presenter=presenters[n % len(presenters)]))
+    TimeSlot.objects.bulk_create(objs, batch_size=500)
+    TimeSlot.resources.through.objects.bulk_create(timeslot_resources,
+                                                   batch_size=500)
+    TimeSlot.presenters.through.objects.bulk_create(timeslot_presenters,
+                                                    batch_size=500)
+
+
+def find_conflicts_naive(intervals):
+    """Compare every pair of intervals."""
+    return [(a[0], a[3], b[3])
+            for a, b in itertools.combinations(intervals, 2)
+            if a[0] == b[0] and a[1] < b[2] and b[1] < a[2]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--timeslots', type=int, nargs='+',
+                        default=[10000, 100000])
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--naive', type=int, default=10000,
+                        help='Maximum time slots to check pairwise.')
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.conflicts import find_overlaps, get_intervals
+    from conference.models import (Conference, Presenter, Resource, TimeSlot,
+                                   Venue)
+
+    for timeslots in args.timeslots:
+        for model in [TimeSlot, Conference, Presenter, Resource, Venue]:
+            model.objects.all().delete()
+        create_timeslots(timeslots, args.rooms)
+        print('{} time slots:'.format(timeslots))
+
+        with Timer() as timer:
+            conflicts = TimeSlot.objects.conflicts()
+        print('  {:28} {:8.2f} s  ({} conflicts)'.format(
+            'conflicts() incl. queries', timer.elapsed, len(conflicts)))
+
+        intervals = list(get_intervals(TimeSlot.objects.all(), 'resources'))
+        with Timer() as timer:
+            overlaps = list(find_overlaps(intervals))
+        print('  {:28} {:8.2f} s  ({} conflicts)'.format(
+            'sweep line (resources)', timer.elapsed, len(overlaps)))
+
+        if timeslots <= args.naive:
+            with Timer() as timer:
+                overlaps = find_conflicts_naive(intervals)
+            print('  {:28} {:8.2f} s  ({} conflicts)'.format(
+                'pairwise (resources)', timer.elapsed, len(overlaps)))
+        else:
+            print('  {:28} skipped, more than {} time slots'.format(
+                'pairwise (resources)', args.naive))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time the bulk import of a generated schedule, and of importing the same
+schedule again (which should create nothing), comparing against creating
+each time slot and its relations with the ORM one at a time.
+
+Usage::
+
+    python -m benchmarks.import_schedule [--timeslots 100000]
+        [--conferences 10] [--rooms 50] [--naive 1000]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+
+
+def generate(timeslots, conferences, rooms):
+    start = datetime.datetime(2016, 1, 1)
+    data = {'timeslots': []}
+    for n in range(timeslots):
+        start_at = start + datetime.timedelta(hours=n // rooms)
+        data['timeslots'].append({
+            'conference': 'conference-{}'.format(n % conferences),
+            'name': 'Time Slot {}'.format(n),
+            'start_at': start_at.isoformat() + 'Z',
+            'end_at': (start_at + datetime.timedelta(hours=1)).isoformat() +
+            'Z',
+            'presenters': ['Presenter {}'.format(n % (timeslots // 5 or 1))],
+            'resources': ['Venue {}/Room {}'.format(n % conferences,
+                                                    n % rooms)],
+        })
+    return data
+
+
+def import_naive(data):
+    """Import time slots with one ``get_or_create`` per object."""
+    from conference.importer import parse_resource, parse_timestamp
+    from conference.models import (Conference, Presenter, Resource, TimeSlot,
+                                   Venue)
+    from django.db import transaction
+
+    with transaction.atomic():
+        for fields in data['timeslots']:
+            conference, _ = Conference.objects.get_or_create(
+                slug=fields['conference'],
+                defaults={'name': fields['conference']})
+            timeslot, _ = TimeSlot.objects.get_or_create(
+                conference=conference, name=fields['name'],
+                start_at=parse_timestamp(fields['start_at']),
+                defaults={'end_at': parse_timestamp(fields['end_at'])})
+            for name in fields['presenters']:
+                timeslot.presenters.add(
+                    Presenter.objects.get_or_create(name=name)[0])
+            for resource in fields['resources']:
+                venue_name, name = parse_resource(resource)
+                venue, _ = Venue.objects.get_or_create(name=venue_name)
+                timeslot.resources.add(Resource.objects.get_or_create(
+                    venue=venue, name=name)[0])
+
+
+def report(name, rows, timer):
+    print('  {:24} {:8.2f} s  {:10.0f} rows/s'.format(
+        name, timer.elapsed, rows / max(timer.elapsed, 1e-6)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--timeslots', type=int, default=100000)
+    parser.add_argument('--conferences', type=int, default=10)
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--naive', type=int, default=1000,
+                        help='Time slots to import one at a time.')
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.importer import ScheduleImporter
+    from conference.models import TimeSlot
+
+    data = generate(args.timeslots, args.conferences, args.rooms)
+    print('Importing {} time slots:'.format(args.timeslots))
+    with Timer() as timer:
+        ScheduleImporter().import_data(data)
+    report('bulk', args.timeslots, timer)
+    with Timer() as timer:
+        created = ScheduleImporter().import_data(data)
+    report('bulk (again)', args.timeslots, timer)
+    assert not sum(created.values())
+
+    TimeSlot.objects.all().delete()
+    naive = {'timeslots': data['timeslots'][:args.naive]}
+    with Timer() as timer:
+        import_naive(naive)
+    report('naive ({} rows)'.format(args.naive), args.naive, timer)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Show the query plans, and timings, of the time slot time-range filters on
+SQLite, before and after the (conference, start_at) and (conference, end_at)
+indexes are added.
+
+Usage::
+
+    python -m benchmarks.indexes [--timeslots 100000] [--conferences 100]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+
+
+def create_timeslots(timeslots, conferences):
+    from conference.models import Conference, TimeSlot
+    from django.utils import timezone
+
+    start = timezone.now() - datetime.timedelta(hours=timeslots // 2)
+    Conference.objects.bulk_create([
+        Conference(name='Conference {}'.format(n),
+                   slug='conference-{}'.format(n))
+        for n in range(conferences)])
+    conference_ids = list(Conference.objects.values_list('pk', flat=True))
+    TimeSlot.objects.bulk_create((
+        TimeSlot(conference_id=conference_ids[n % conferences],
+                 name='Time Slot {}'.format(n),
+                 start_at=start + datetime.timedelta(hours=n),
+                 end_at=start + datetime.timedelta(hours=n + 1))
+        for n in range(timeslots)), batch_size=500)
+    return Conference.objects.all()[conferences // 2]
+
+
+def report(conference, repeat=20):
+    from django.db import connection
+    from django.utils import timezone
+
+    now = timezone.now()
+    timeslots = conference.timeslots.all()
+    querysets = [
+        ('past', timeslots.past(now)),
+        ('current', timeslots.current(now)),
+        ('future', timeslots.future(now)),
+        ('next', timeslots.future(now)[:1]),
+    ]
+    for name, queryset in querysets:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        with Timer() as timer:
+            for _ in range(repeat):
+                list(queryset.values_list('pk', flat=True))
+        print('  {:8} {:8.2f} ms  {}'.format(
+            name, timer.elapsed * 1000 / repeat, '; '.join(plan)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--timeslots', type=int, default=100000)
+    parser.add_argument('--conferences', type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.models import TimeSlot
+    from django.db import connection
+
+    with Timer() as timer:
+        conference = create_timeslots(args.timeslots, args.conferences)
+    print('Created {} time slots in {:.1f} s'.format(args.timeslots,
+                                                     timer.elapsed))
+
+    # The indexes are dropped, and recreated, rather than migrating back to
+    # before they were added, as later migrations add fields to the tables.
+    index_together = TimeSlot._meta.index_together
+    with connection.schema_editor() as editor:
+        editor.alter_index_together(TimeSlot, index_together, [])
+    print('\nWithout time indexes:')
+    report(conference)
+
+    with connection.schema_editor() as editor:
+        editor.alter_index_together(TimeSlot, [], index_together)
+    print('\nWith (conference, start_at) and (conference, end_at) indexes:')
+    report(conference)
+
+
+if __name__ == '__main__':
+    main()
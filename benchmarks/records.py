@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare time slot records against model instances for a conference of
+10,000 time slots: loading time, memory, pickled (cached) size, and
+rendering and serializing throughput.
+
+Usage::
+
+    python -m benchmarks.records [--timeslots 10000] [--repeat 3] [--seed 0]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import gc
+import pickle
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+TEMPLATE = ('{% for timeslot in timeslots %}'
+            '{% include "conference/includes/timeslot.html" with full=True %}'
+            '{% endfor %}')
+
+
+def measure(load):
+    """Load objects, measuring the time and (where available) the memory
+    allocated, in bytes."""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+    with Timer() as timer:
+        objects = load()
+    size = None
+    if tracemalloc is not None:
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    return objects, timer.elapsed, size
+
+
+def best(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            function()
+        timings.append(timer.elapsed)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--timeslots', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup(TEMPLATES=[{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+    }])
+    migrate()
+
+    from conference.factories import ScheduleGenerator
+    from conference.models import Resource
+    from conference.records import load_records
+    from conference.serializers import TimeSlotSerializer
+    from django.db.models import Prefetch
+    from django.template import engines
+
+    with Timer() as timer:
+        conference = ScheduleGenerator(seed=args.seed).create(
+            timeslots=args.timeslots, resources=20, venues=2)[0]
+    print('Created {} time slots in {:.1f} s'.format(args.timeslots,
+                                                     timer.elapsed))
+
+    def load_instances():
+        resources = Resource.objects.select_related('venue')
+        return list(conference.timeslots.prefetch_related(
+            'presenters', Prefetch('resources', queryset=resources)))
+
+    template = engines['django'].from_string(TEMPLATE)
+    serializer = TimeSlotSerializer()
+    print('{:10} {:>9} {:>11} {:>11} {:>10} {:>13}'.format(
+        '', 'load (s)', 'memory (MB)', 'pickle (MB)', 'render (s)',
+        'serialize (s)'))
+    for name, load, serialize in [
+            ('instances', load_instances,
+             lambda timeslots: serializer.serialize(
+                 conference.timeslots.all())),
+            ('records', lambda: load_records(conference.timeslots.all()),
+             serializer.serialize_records)]:
+        timeslots, elapsed, size = measure(load)
+        pickled = len(pickle.dumps(timeslots, pickle.HIGHEST_PROTOCOL))
+        render = best(lambda: template.render({'timeslots': timeslots}),
+                      args.repeat)
+        serialized = best(lambda: serialize(timeslots), args.repeat)
+        print('{:10} {:9.2f} {:>11} {:11.1f} {:10.2f} {:13.2f}'.format(
+            name, elapsed,
+            'n/a' if size is None else '{:.1f}'.format(size / 1048576.0),
+            pickled / 1048576.0, render, serialized))
+
+
+if __name__ == '__main__':
+    main()
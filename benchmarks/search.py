@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure search latency over a generated corpus of 100,000 sessions, for
+the SQLite FTS5 and in-memory backends, against an ``icontains`` scan.
+
+Usage::
+
+    python -m benchmarks.search [--timeslots 100000] [--queries 200]
+        [--seed 0]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+import random
+
+
+WORDS = ('python django web data science machine learning async testing '
+         'security performance database query index cache template api '
+         'deployment container cloud scaling design community education '
+         'packaging typing documentation debugging profiling concurrency '
+         'network protocol parser compiler interpreter memory garbage '
+         'collector numpy pandas jupyter notebook visualisation geospatial '
+         'microservices observability logging metrics tracing').split()
+
+NAMES = ('Ada Grace Alan Barbara Guido Linus Margaret Katherine Dennis Ken '
+         'Radia Frances Donald Edsger Tim Hedy Niklaus John Shafi Leslie'
+         ).split()
+
+
+def make_vocabulary(rng, size=20000):
+    """Make a vocabulary of made-up words, most frequent first, with the
+    topic words at moderately frequent ranks."""
+    syllables = [consonant + vowel for consonant in 'bcdfghklmnprstvz'
+                 for vowel in 'aeiou']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables)
+                          for _ in range(rng.randint(2, 4))))
+    vocabulary = sorted(words)
+    rng.shuffle(vocabulary)
+    vocabulary[50:50] = WORDS
+    return vocabulary
+
+
+def make_text(rng, vocabulary, length):
+    """Make text with word frequencies following Zipf's law."""
+    return ' '.join(
+        vocabulary[min(int(rng.paretovariate(1.0)) - 1, len(vocabulary) - 1)]
+        for _ in range(length))
+
+
+def create_corpus(timeslots, seed):
+    from conference.models import Conference, Presenter, TimeSlot
+    from django.utils import timezone
+
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    start = timezone.now()
+    conference = Conference.objects.create(name='Conference', slug='bench')
+    presenters = Presenter.objects.bulk_create([
+        Presenter(name='{} {}'.format(rng.choice(NAMES),
+                                      rng.choice(NAMES) + 'son'),
+                  biography=make_text(rng, vocabulary, 30))
+        for _ in range(timeslots // 5)])
+    objs = [
+        TimeSlot(conference=conference,
+                 name=make_text(rng, vocabulary, 4).title(),
+                 description=make_text(rng, vocabulary, 60),
+                 start_at=start + datetime.timedelta(minutes=n),
+                 end_at=start + datetime.timedelta(minutes=n + 30))
+        for n in range(timeslots)]
+    TimeSlot.objects.bulk_create(objs, batch_size=500)
+    TimeSlot.presenters.through.objects.bulk_create([
+        TimeSlot.presenters.through(timeslot=timeslot,
+                                    presenter=rng.choice(presenters))
+        for timeslot in objs], batch_size=500)
+    return conference
+
+
+def get_queries(count, seed):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = rng.sample(WORDS, rng.choice([1, 1, 2]))
+        if rng.random() < 0.3:
+            words[-1] = words[-1][:4]
+        queries.append(' '.join(words))
+    return queries
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    print('  {:10} p50 {:8.2f} ms  p95 {:8.2f} ms  max {:8.2f} ms'.format(
+        name, timings[len(timings) // 2] * 1000,
+        timings[int(len(timings) * 0.95)] * 1000, timings[-1] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--timeslots', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.models import TimeSlot
+    from conference.search import FTS5Backend, MemoryBackend
+    from django.db import connection
+    from django.db.models import Q
+
+    with Timer() as timer:
+        conference = create_corpus(args.timeslots, args.seed)
+    print('Created {} time slots in {:.1f} s'.format(args.timeslots,
+                                                     timer.elapsed))
+    queries = get_queries(args.queries, args.seed)
+
+    backends = [('memory', MemoryBackend())]
+    if FTS5Backend.is_available(connection):
+        backends.insert(0, ('fts5', FTS5Backend()))
+    for name, backend in backends:
+        with Timer() as timer:
+            backend.rebuild()
+        print('{}: indexed in {:.1f} s'.format(name, timer.elapsed))
+        timings = []
+        for query in queries:
+            with Timer() as timer:
+                backend.search(query, conference=conference)
+            timings.append(timer.elapsed)
+        report(name, timings)
+
+    timings = []
+    for query in queries[:10]:
+        condition = Q()
+        for word in query.split():
+            condition &= (Q(name__icontains=word) |
+                          Q(description__icontains=word) |
+                          Q(presenters__biography__icontains=word))
+        with Timer() as timer:
+            list(TimeSlot.objects.filter(condition).distinct()[:20])
+        timings.append(timer.elapsed)
+    print('icontains (unranked, 10 queries):')
+    report('icontains', timings)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time the automatic scheduling of a deterministic conference of 500
+sessions in 30 rooms over 3 days, built with ``conference.factories``.
+
+Usage::
+
+    python -m benchmarks.solver [--sessions 500] [--rooms 30] [--days 3]
+        [--seed 0] [--budget 10]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+import random
+
+
+def create_fixture(sessions, rooms, days, seed):
+    """Create a conference with unscheduled sessions of 30 to 90 minutes,
+    each with one or two presenters, a fifth of whom are only available on
+    one day.
+
+    :returns: Conference, and presenter availability.
+    :rtype: tuple
+    """
+    from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                      VenueFactory)
+    from conference.models import Presenter, Resource, TimeSlot
+    from django.utils import timezone
+    from factory import fuzzy
+
+    fuzzy.reseed_random(seed)
+    rng = random.Random(seed)
+    start_date = datetime.date(2016, 5, 30)
+    conference = ConferenceFactory(
+        start_date=start_date,
+        end_date=start_date + datetime.timedelta(days=days - 1))
+    venue = VenueFactory()
+    conference.venues.add(venue)
+    Resource.objects.bulk_create([
+        Resource(name='Room {:02}'.format(n), venue=venue)
+        for n in range(rooms)])
+    presenters = Presenter.objects.bulk_create([
+        Presenter(name='Presenter {:04}'.format(n))
+        for n in range(sessions * 4 // 5)])
+    timeslots = []
+    for _ in range(sessions):
+        timeslot = TimeSlotFactory.build(conference=conference)
+        timeslot.end_at = timeslot.start_at + datetime.timedelta(
+            minutes=rng.choice([30, 45, 60, 90]))
+        timeslots.append(timeslot)
+    TimeSlot.objects.bulk_create(timeslots)
+    TimeSlot.presenters.through.objects.bulk_create([
+        TimeSlot.presenters.through(timeslot=timeslot, presenter=presenter)
+        for timeslot in timeslots
+        for presenter in rng.sample(presenters, rng.choice([1, 1, 2]))])
+    availability = {}
+    for presenter in presenters[::5]:
+        day = datetime.datetime.combine(
+            start_date + datetime.timedelta(days=rng.randrange(days)),
+            datetime.time())
+        availability[presenter.pk] = [(timezone.make_aware(day),
+                                       timezone.make_aware(
+                                           day + datetime.timedelta(days=1)))]
+    return conference, availability
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--rooms', type=int, default=30)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help='Solver time budget, in seconds.')
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.models import TimeSlot
+    from conference.solver import ScheduleSolver
+
+    conference, availability = create_fixture(args.sessions, args.rooms,
+                                              args.days, args.seed)
+    solver = ScheduleSolver(conference, availability=availability,
+                            time_budget=args.budget)
+    with Timer() as timer:
+        solution = solver.solve()
+    print('Placed {} of {} sessions in {:.2f} s'.format(
+        len(solution.assignments), args.sessions, timer.elapsed))
+    with Timer() as timer:
+        solver.save(solution)
+    print('Saved in {:.2f} s'.format(timer.elapsed))
+    conflicts = TimeSlot.objects.conflicts()
+    print('Conflicts: {}'.format(len(conflicts)))
+
+
+if __name__ == '__main__':
+    main()
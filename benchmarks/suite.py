@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time the conference views, time slot queries and admin changelists
+against synthetic conferences, writing the results as JSON and optionally
+comparing them with a baseline from an earlier run.
+
+Usage::
+
+    python -m benchmarks.suite [--conferences 20] [--timeslots 200]
+        [--presenters 2] [--resources 10] [--venues 2] [--repeat 20]
+        [--seed 0] [--output results.json] [--baseline baseline.json]
+        [--tolerance 0.25]
+
+The exit status is 1 when any benchmark is slower than the baseline's median
+by more than the tolerance, or makes more queries than the baseline.
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+from collections import OrderedDict
+import argparse
+import datetime
+import io
+import json
+import platform
+import sys
+
+
+def create_conferences(conferences, timeslots, presenters, resources, venues,
+                       seed):
+    """Create conferences, with sessions around the clock on the days either
+    side of today, so that some are in progress whenever the suite is run.
+
+    :param conferences: Number of conferences.
+    :param timeslots: Time slots for each conference.
+    :param presenters: Presenters for each time slot.
+    :param resources: Resources for each conference, across its venues.
+    :param venues: Venues for each conference.
+    :param seed: Random seed.
+    :returns: Conferences.
+    :rtype: list
+    """
+    from conference.factories import ScheduleGenerator
+    from django.utils import timezone
+
+    class Generator(ScheduleGenerator):
+
+        day_start = datetime.time(0)
+
+        day_end = datetime.time(23, 59)
+
+    # Each resource has about 20 sessions a day.
+    days = timeslots // (resources * 20) + 1
+    start_date = timezone.localtime(timezone.now()).date() - \
+        datetime.timedelta(days=days // 2)
+    return Generator(seed=seed).create(
+        conferences=conferences, timeslots=timeslots, resources=resources,
+        venues=venues, presenters_per_timeslot=(presenters, presenters),
+        start_date=start_date)
+
+
+def get_benchmarks(conference):
+    """Get the benchmarks, as ``(name, function)`` tuples, for the schedule
+    of the given conference."""
+    from conference.models import TimeSlot
+    from django.contrib.auth.models import User
+    from django.core.urlresolvers import reverse
+    from django.test import Client
+    from django.utils import timezone
+
+    user = User.objects.create_superuser('admin', 'admin@example.com',
+                                         'password')
+    client = Client()
+    client.force_login(user)
+    timeslots = TimeSlot.objects.filter(conference=conference)
+    changelist = reverse('admin:conference_timeslot_changelist')
+
+    def get(url, **data):
+        def view():
+            response = client.get(url, data)
+            assert response.status_code == 200, response.status_code
+        return view
+
+    return [
+        ('detail_view', get(conference.get_absolute_url())),
+        ('list_view', get(reverse('conference:conference_list'))),
+        ('past', lambda: list(timeslots.past())),
+        ('current', lambda: list(timeslots.current())),
+        ('future', lambda: list(timeslots.future())),
+        ('now', lambda: timeslots.now()),
+        ('next', lambda: timeslots.next()),
+        ('later', lambda: timeslots.later()),
+        ('now_next_later', lambda: timeslots.now_next_later(timezone.now())),
+        ('admin_changelist', get(changelist)),
+        ('admin_changelist_conference', get(
+            changelist, conference__id__exact=str(conference.pk))),
+    ]
+
+
+def run(function, repeat):
+    """Time repeated calls of a function, after one call whose queries are
+    counted.
+
+    :returns: Timings, in milliseconds, and the query count.
+    :rtype: dict
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        function()
+    # Read before requests in the timed calls reset the query log.
+    queries = len(context.captured_queries)
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            function()
+        timings.append(timer.elapsed * 1000)
+    timings.sort()
+    return OrderedDict([
+        ('queries', queries),
+        ('min_ms', round(timings[0], 3)),
+        ('median_ms', round(timings[len(timings) // 2], 3)),
+        ('mean_ms', round(sum(timings) / len(timings), 3)),
+        ('repeat', repeat),
+    ])
+
+
+def compare(results, baseline, tolerance):
+    """Compare results with a baseline.
+
+    :returns: Names of the benchmarks which regressed.
+    :rtype: list
+    """
+    regressions = []
+    print('\n{:30} {:>10} {:>10} {:>8} {:>9}'.format(
+        'compared to baseline', 'median ms', 'baseline', 'change',
+        'queries'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        change = result['median_ms'] / max(before['median_ms'], 0.001) - 1
+        queries = result['queries'] - before['queries']
+        regressed = change > tolerance or queries > 0
+        if regressed:
+            regressions.append(name)
+        print('{:30} {:10.2f} {:10.2f} {:+7.0%} {:+9d}{}'.format(
+            name, result['median_ms'], before['median_ms'], change, queries,
+            '  REGRESSED' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--conferences', type=int, default=20)
+    parser.add_argument('--timeslots', type=int, default=200,
+                        help='Time slots for each conference.')
+    parser.add_argument('--presenters', type=int, default=2,
+                        help='Presenters for each time slot.')
+    parser.add_argument('--resources', type=int, default=10,
+                        help='Resources for each conference.')
+    parser.add_argument('--venues', type=int, default=2,
+                        help='Venues for each conference.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Path to write the results to.')
+    parser.add_argument('--baseline',
+                        help='Path of earlier results to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown of each median, as a fraction.')
+    args = parser.parse_args()
+
+    setup(
+        ALLOWED_HOSTS=['testserver'],
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            },
+        },
+        INSTALLED_APPS=[
+            'django.contrib.admin',
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'django.contrib.messages',
+            'django.contrib.sessions',
+            'conference',
+        ],
+        MIDDLEWARE_CLASSES=[
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        ],
+        ROOT_URLCONF='conference.tests.urls',
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {
+                'context_processors': [
+                    'django.contrib.auth.context_processors.auth',
+                    'django.contrib.messages.context_processors.messages',
+                ],
+            },
+        }],
+    )
+    migrate()
+
+    import django
+    from django.db import connection
+
+    with Timer() as timer:
+        conferences = create_conferences(
+            args.conferences, args.timeslots, args.presenters,
+            args.resources, args.venues, args.seed)
+    print('Created {} conferences of {} time slots in {:.1f} s\n'.format(
+        args.conferences, args.timeslots, timer.elapsed))
+
+    results = OrderedDict()
+    print('{:30} {:>10} {:>10} {:>9}'.format('benchmark', 'median ms',
+                                             'min ms', 'queries'))
+    conference = conferences[len(conferences) // 2]
+    for name, function in get_benchmarks(conference):
+        results[name] = result = run(function, args.repeat)
+        print('{:30} {:10.2f} {:10.2f} {:9d}'.format(
+            name, result['median_ms'], result['min_ms'], result['queries']))
+
+    data = OrderedDict([
+        ('environment', OrderedDict([
+            ('python', platform.python_version()),
+            ('django', django.get_version()),
+            ('database', '{} {}'.format(connection.vendor, getattr(
+                connection.Database, 'sqlite_version', ''))),
+        ])),
+        ('parameters', OrderedDict(
+            (key, getattr(args, key)) for key in [
+                'conferences', 'timeslots', 'presenters', 'resources',
+                'venues', 'repeat', 'seed'])),
+        ('results', results),
+    ])
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+
+    if args.baseline:
+        with io.open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['parameters'] != data['parameters']:
+            print('\nWarning: the baseline was run with different '
+                  'parameters: {}'.format(baseline['parameters']))
+        if compare(results, baseline['results'], args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
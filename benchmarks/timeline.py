@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure building, and point-in-time lookups of, in-memory conference
+timelines, against the equivalent time slot queries, and the memory the
+timelines of many conferences take.
+
+Usage::
+
+    python -m benchmarks.timeline [--conferences 200] [--timeslots 300]
+        [--resources 10] [--lookups 10000] [--seed 0]
+
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+from .base import Timer, migrate, setup
+import argparse
+import datetime
+import random
+import sys
+
+
+def get_size(timeline):
+    """Get the memory taken by a timeline and its arrays, in bytes."""
+    return sys.getsizeof(timeline) + sum(
+        sys.getsizeof(getattr(timeline, name))
+        for name in type(timeline).__slots__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--conferences', type=int, default=200)
+    parser.add_argument('--timeslots', type=int, default=300)
+    parser.add_argument('--resources', type=int, default=10,
+                        help='Parallel tracks of each conference.')
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup()
+    migrate()
+
+    from conference.factories import ScheduleGenerator
+    from conference.models import Conference, TimeSlot
+    from conference.timeline import get_timeline
+    from django.utils import timezone
+
+    with Timer() as timer:
+        ScheduleGenerator(seed=args.seed).create(
+            conferences=args.conferences, timeslots=args.timeslots,
+            resources=args.resources, presenters_per_timeslot=(0, 0))
+    print('Created {} conferences of {} time slots in {:.1f} s'.format(
+        args.conferences, args.timeslots, timer.elapsed))
+
+    pks = list(Conference.objects.values_list('pk', flat=True))
+    with Timer() as timer:
+        timelines = [get_timeline(pk) for pk in pks]
+    size = sum(get_size(timeline) for timeline in timelines)
+    print('Built {} timelines in {:.1f} s ({:.2f} ms each), {:.1f} KiB '
+          '({:.0f} bytes per time slot)'.format(
+              len(timelines), timer.elapsed,
+              timer.elapsed * 1000 / len(timelines), size / 1024.0,
+              float(size) / max(args.conferences * args.timeslots, 1)))
+
+    rng = random.Random(args.seed)
+    start = timezone.now() - datetime.timedelta(days=1)
+    lookups = [(rng.choice(pks), start + datetime.timedelta(
+        minutes=rng.randrange(60 * 24 * 10))) for _ in range(args.lookups)]
+
+    with Timer() as timer:
+        for pk, at in lookups:
+            timeline = get_timeline(pk)
+            timeline.now_next_later(at)
+            timeline.next_boundary(at)
+    print('timeline: {:8.2f} us per lookup, including the cache version '
+          'check'.format(timer.elapsed * 1000000 / len(lookups)))
+
+    by_pk = dict(zip(pks, timelines))
+    with Timer() as timer:
+        for pk, at in lookups:
+            timeline = by_pk[pk]
+            timeline.now_next_later(at)
+            timeline.next_boundary(at)
+    print('timeline: {:8.2f} us per lookup, excluding it'.format(
+        timer.elapsed * 1000000 / len(lookups)))
+
+    queries = lookups[:args.lookups // 100 or 1]
+    with Timer() as timer:
+        for pk, at in queries:
+            timeslots = TimeSlot.objects.filter(conference_id=pk)
+            timeslots.now_next_later(at)
+            timeslots.next_boundary(at)
+    print('queries:  {:8.2f} us per lookup ({} lookups)'.format(
+        timer.elapsed * 1000000 / len(queries), len(queries)))
+
+
+if __name__ == '__main__':
+    main()
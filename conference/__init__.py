@@ -24,3 +24,6 @@ __url__ = 'https://github.com/mattaustin/django-conference'
 __author__ = 'Matt Austin <mail@mattaustin.me.uk>'
 __copyright__ = 'Copyright 2016 Matt Austin'
 __license__ = 'Apache 2.0'
+
+
+default_app_config = 'conference.apps.AppConfig'
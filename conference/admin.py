@@ -16,17 +16,96 @@
 
 
 from __future__ import absolute_import, unicode_literals
+from . import editing
+from .conflicts import FIELDS, get_clashes
 from .models import Conference, Presenter, Resource, TimeSlot, Venue
-from django.contrib import admin
+from .pagination import EstimatedCountPaginator
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.utils import lookup_needs_distinct
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import six, timezone
+import datetime
+
+
+def get_action_data(model_admin, request, field):
+    """Get the value of a field of the action form, or ``None`` if the form
+    is invalid."""
+    form = model_admin.action_form(request.POST)
+    form.fields['action'].choices = model_admin.get_action_choices(request)
+    if form.is_valid():
+        return form.cleaned_data[field]
+
+
+class ConferenceActionForm(ActionForm):
+
+    start_date = forms.DateField(required=False)
+
+
+class ConferenceRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Filter on a related field of time slots which, rather than listing
+    every related object, lists only those related to the selected
+    conference's time slots, and nothing until a conference is selected."""
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.all()
+        conference = request.GET.get('conference__id__exact')
+        try:
+            if conference:
+                queryset = queryset.filter(
+                    timeslots__conference=conference).distinct()
+            elif self.lookup_val:
+                queryset = queryset.filter(pk=self.lookup_val)
+            else:
+                return []
+            return [(obj.pk, six.text_type(obj)) for obj in queryset]
+        except (ValidationError, ValueError):
+            return []
+
+
+class TimeSlotChangeList(ChangeList):
+    """Change list which only removes duplicate rows when a lookup across a
+    many-to-many relation is in use, rather than whenever such a relation is
+    listed as a filter, so that the unfiltered list can be estimated and
+    paginated cheaply."""
+
+    def get_filters(self, request):
+        filter_specs, has_filters, lookup_params, use_distinct = super(
+            TimeSlotChangeList, self).get_filters(request)
+        if use_distinct:
+            use_distinct = any(lookup_needs_distinct(self.lookup_opts, key)
+                               for key in self.get_filters_params())
+        return filter_specs, has_filters, lookup_params, use_distinct
 
 
 @admin.register(Conference)
 class ConferenceAdmin(admin.ModelAdmin):
 
+    action_form = ConferenceActionForm
+
+    actions = ['clone_conferences']
+
     fields = [('name', 'slug'), 'city', ('start_date', 'end_date'), 'venues']
 
     prepopulated_fields = {'slug': ['name']}
 
+    def clone_conferences(self, request, queryset):
+        start_date = get_action_data(self, request, 'start_date')
+        if start_date is None:
+            self.message_user(request, 'Enter a start date for the copies of '
+                              'the selected conferences.', messages.ERROR)
+            return
+        with transaction.atomic():
+            copies = [editing.clone(conference, start_date)
+                      for conference in queryset]
+        self.message_user(request, 'Copied {} conference(s): {}.'.format(
+            len(copies), ', '.join(copy.slug for copy in copies)))
+    clone_conferences.short_description = (
+        'Copy selected conferences, with their schedules, to start date')
+
 
 @admin.register(Presenter)
 class PresenterAdmin(admin.ModelAdmin):
@@ -43,15 +122,97 @@ class ResourceInline(admin.TabularInline):
     model = Resource
 
 
+class TimeSlotActionForm(ActionForm):
+
+    minutes = forms.IntegerField(required=False)
+
+    resource = forms.ModelChoiceField(Resource.objects.all(), required=False)
+
+
+class TimeSlotAdminForm(forms.ModelForm):
+
+    class Meta(object):
+        model = TimeSlot
+        fields = '__all__'
+
+    def clean(self):
+        """Validate that no resource, or presenter, is assigned to another
+        time slot at an overlapping time."""
+        cleaned_data = super(TimeSlotAdminForm, self).clean()
+        start_at = cleaned_data.get('start_at')
+        end_at = cleaned_data.get('end_at')
+        if start_at is None or end_at is None:
+            return cleaned_data
+        overlapping = TimeSlot.objects.overlapping(start_at, end_at).exclude(
+            pk=self.instance.pk)
+        for field in FIELDS:
+            objects = cleaned_data.get(field)
+            if not objects:
+                continue
+            errors = []
+            for obj, timeslot in get_clashes(overlapping, field, objects):
+                errors.append(
+                    '"{}" is already assigned to "{}" ({:%Y-%m-%d %H:%M} - '
+                    '{:%H:%M}).'.format(obj, timeslot,
+                                        timezone.localtime(timeslot.start_at),
+                                        timezone.localtime(timeslot.end_at)))
+            if errors:
+                self.add_error(field, errors)
+        return cleaned_data
+
+
 @admin.register(TimeSlot)
 class TimeSlotAdmin(admin.ModelAdmin):
 
+    action_form = TimeSlotActionForm
+
+    actions = ['shift_timeslots', 'reassign_timeslots']
+
+    date_hierarchy = 'start_at'
+
     fields = ['conference', 'name', 'description', ('start_at', 'end_at'),
               'presenters', 'resources', 'video', 'slides']
 
-    list_display = ['name', 'conference', 'start_at', 'end_at']
-
-    list_filter = ['conference', 'presenters', 'resources']
+    form = TimeSlotAdminForm
+
+    list_display = ['name', 'conference', 'start_at', 'end_at',
+                    'bookmark_count']
+
+    list_filter = ['conference',
+                   ('presenters', ConferenceRelatedFieldListFilter),
+                   ('resources', ConferenceRelatedFieldListFilter)]
+
+    list_select_related = ['conference']
+
+    paginator = EstimatedCountPaginator
+
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return TimeSlotChangeList
+
+    def reassign_timeslots(self, request, queryset):
+        resource = get_action_data(self, request, 'resource')
+        if resource is None:
+            self.message_user(request, 'Select a resource to move the '
+                              'selected time slots to.', messages.ERROR)
+            return
+        pks = editing.reassign(queryset, resource)
+        self.message_user(request, 'Moved {} time slot(s) to "{}".'.format(
+            len(pks), resource))
+    reassign_timeslots.short_description = (
+        'Move selected time slots to resource')
+
+    def shift_timeslots(self, request, queryset):
+        minutes = get_action_data(self, request, 'minutes')
+        if not minutes:
+            self.message_user(request, 'Enter a number of minutes to shift '
+                              'the selected time slots by.', messages.ERROR)
+            return
+        pks = editing.shift(queryset, datetime.timedelta(minutes=minutes))
+        self.message_user(request, 'Shifted {} time slot(s) by {} '
+                          'minute(s).'.format(len(pks), minutes))
+    shift_timeslots.short_description = 'Shift selected time slots by minutes'
 
 
 @admin.register(Venue)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Personal agendas of starred time slots.
+
+Time slots are bookmarked by users, or by anonymous visitors identified by a
+key stored in their session, which is kept when they log in so that their
+bookmarks can then be moved to their user. The number of bookmarks of each
+time slot is kept in :py:attr:`~conference.models.TimeSlot.bookmark_count`,
+updated as bookmarks are added and removed, rather than counted for each
+request.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .conflicts import find_overlaps
+from .models import Bookmark, TimeSlot
+from collections import defaultdict
+from django.contrib.auth.signals import user_logged_in
+from django.db import IntegrityError, models, transaction
+from django.db.models import signals
+from django.dispatch import receiver
+import uuid
+
+
+#: Session key under which an anonymous visitor's agenda key is stored.
+SESSION_KEY = 'conference_agenda'
+
+
+def get_owner(request, create=False):
+    """Get the lookups identifying the bookmarks of the current user, or
+    anonymous visitor.
+
+    :param request: Request.
+    :type request: :py:class:`~django.http.HttpRequest`
+    :param create: Whether to create a key for an anonymous visitor who has
+        none yet.
+    :type create: bool
+    :returns: Lookups, or ``None`` if the visitor has no bookmarks.
+    :rtype: dict
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated():
+        return {'user': user}
+    session = getattr(request, 'session', None)
+    if session is None:
+        return None
+    if SESSION_KEY not in session and create:
+        session[SESSION_KEY] = uuid.uuid4().hex
+    if SESSION_KEY in session:
+        return {'session_key': session[SESSION_KEY]}
+
+
+def add(timeslot, **owner):
+    """Bookmark a time slot, unless it is already bookmarked.
+
+    :param timeslot: Time slot.
+    :type timeslot: :py:class:`~conference.models.TimeSlot`
+    :param owner: Lookups from :py:func:`.get_owner`.
+    :returns: Whether a bookmark was added.
+    :rtype: bool
+    """
+    try:
+        with transaction.atomic():
+            Bookmark.objects.create(timeslot=timeslot, **owner)
+    except IntegrityError:
+        return False
+    return True
+
+
+def remove(timeslot, **owner):
+    """Remove the bookmark of a time slot.
+
+    :param timeslot: Time slot.
+    :type timeslot: :py:class:`~conference.models.TimeSlot`
+    :param owner: Lookups from :py:func:`.get_owner`.
+    :returns: Whether a bookmark was removed.
+    :rtype: bool
+    """
+    bookmarks = Bookmark.objects.filter(timeslot=timeslot, **owner)
+    removed = bookmarks.exists()
+    bookmarks.delete()
+    return removed
+
+
+def get_agenda(conference, **owner):
+    """Get the bookmarked time slots of a conference, with their presenters
+    and resources, in a fixed number of queries.
+
+    Each time slot's :py:attr:`clashes` is set to the other bookmarked time
+    slots it overlaps.
+
+    :param conference: Conference.
+    :type conference: :py:class:`~conference.models.Conference`
+    :param owner: Lookups from :py:func:`.get_owner`.
+    :returns: Time slots, ordered by start time.
+    :rtype: list
+    """
+    timeslots = list(TimeSlot.objects.filter(
+        conference=conference,
+        pk__in=Bookmark.objects.filter(**owner).values('timeslot_id')
+    ).order_by('start_at', 'end_at').prefetch_related('presenters',
+                                                      'resources'))
+    clashes = find_clashes(timeslots)
+    for timeslot in timeslots:
+        timeslot.clashes = clashes[timeslot.pk]
+    return timeslots
+
+
+def find_clashes(timeslots):
+    """Find which time slots overlap each other, in a single pass over the
+    time slots sorted by start time.
+
+    :param timeslots: Time slots.
+    :type timeslots: list
+    :returns: Overlapping time slots, ordered by start time, by the primary
+        key of each time slot.
+    :rtype: dict
+    """
+    by_pk = dict((timeslot.pk, timeslot) for timeslot in timeslots)
+    clashes = defaultdict(list)
+    for _, first, second in find_overlaps(
+            (None, timeslot.start_at, timeslot.end_at, timeslot.pk)
+            for timeslot in timeslots):
+        clashes[first].append(by_pk[second])
+        clashes[second].append(by_pk[first])
+    for values in clashes.values():
+        values.sort(key=lambda timeslot: timeslot.start_at)
+    return clashes
+
+
+def recount(queryset=None):
+    """Recompute the bookmark counts of time slots from their bookmarks.
+
+    :param queryset: Time slots, defaults to all time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :returns: Number of time slots updated.
+    :rtype: int
+    """
+    queryset = TimeSlot.objects.all() if queryset is None else queryset
+    updated = 0
+    for pk, count, actual in queryset.annotate(
+            actual=models.Count('bookmarks')).values_list(
+                'pk', 'bookmark_count', 'actual'):
+        if count != actual:
+            updated += TimeSlot.objects.filter(pk=pk).update(
+                bookmark_count=actual)
+    return updated
+
+
+@receiver(signals.post_save, sender=Bookmark)
+def increment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TimeSlot.objects.filter(pk=instance.timeslot_id).update(
+            bookmark_count=models.F('bookmark_count') + 1)
+
+
+@receiver(signals.post_delete, sender=Bookmark)
+def decrement_count(sender, instance, **kwargs):
+    TimeSlot.objects.filter(pk=instance.timeslot_id,
+                            bookmark_count__gt=0).update(
+        bookmark_count=models.F('bookmark_count') - 1)
+
+
+@receiver(user_logged_in)
+def move_bookmarks(sender, request, user, **kwargs):
+    """Move an anonymous visitor's bookmarks to the user they log in as."""
+    session = getattr(request, 'session', None)
+    key = session.pop(SESSION_KEY, None) if session is not None else None
+    if key is None:
+        return
+    bookmarks = Bookmark.objects.filter(session_key=key)
+    with transaction.atomic():
+        bookmarks.filter(timeslot__bookmarks__user=user).delete()
+        bookmarks.update(user=user, session_key=None)
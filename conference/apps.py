@@ -23,4 +23,10 @@ class AppConfig(apps.AppConfig):
 
     label = 'conference'
 
-    name = 'django-conference'
+    name = 'conference'
+
+    def ready(self):
+        # The snapshot receiver is connected first, so that entries are
+        # rebuilt before cached schedules are invalidated.
+        from . import snapshot  # NOQA
+        from . import agenda, cache, live, search, signals, timeline  # NOQA
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Versioned caching of conference schedules.
+
+Cache keys include a per-conference version, which is incremented whenever
+a change to the conference's schedule is committed (see
+:py:data:`conference.signals.schedule_changed`), so that stale entries are
+never read. The cache alias and maximum timeout are configured with the
+``CONFERENCE_CACHE`` (default ``'default'``) and ``CONFERENCE_CACHE_TIMEOUT``
+(default 3600 seconds) settings.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .signals import schedule_changed
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+import functools
+import math
+import time
+
+
+def get_alias():
+    """Get the alias of the cache used for conference schedules.
+
+    :rtype: str
+    """
+    return getattr(settings, 'CONFERENCE_CACHE', 'default')
+
+
+def get_cache():
+    """Get the cache used for conference schedules.
+
+    :rtype: :py:class:`~django.core.cache.backends.base.BaseCache`
+    """
+    return caches[get_alias()]
+
+
+def get_timeout(until=None, at=None):
+    """Get the timeout for a cache entry which must expire at a given time.
+
+    :param until: Expiry time, or ``None`` for the maximum timeout.
+    :type until: :py:class:`~datetime.datetime`
+    :param at: Reference time, defaults to the current time.
+    :type at: :py:class:`~datetime.datetime`
+    :returns: Timeout, in seconds.
+    :rtype: int
+    """
+    timeout = getattr(settings, 'CONFERENCE_CACHE_TIMEOUT', 3600)
+    if until is not None:
+        seconds = (until - (at or timezone.now())).total_seconds()
+        timeout = min(timeout, max(int(math.ceil(seconds)), 1))
+    return timeout
+
+
+def get_version_key(conference_pk):
+    return 'conference:{}:version'.format(conference_pk)
+
+
+def new_version():
+    # Time-based, so that a version key evicted from the cache is never
+    # replaced by a previously used version.
+    return int(time.time() * 1000000)
+
+
+def get_version(conference_pk):
+    """Get the current cache version for a conference.
+
+    :param conference_pk: Conference primary key.
+    :returns: Version.
+    :rtype: int
+    """
+    cache = get_cache()
+    key = get_version_key(conference_pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(conference_pk):
+    """Increment the cache version for a conference, invalidating all of its
+    cache entries.
+
+    :param conference_pk: Conference primary key.
+    """
+    cache = get_cache()
+    key = get_version_key(conference_pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), None)
+
+
+def on_commit(func):
+    """Call a function once the current transaction commits, or at once
+    outside of a transaction (or on Django 1.8, which has no on-commit
+    hooks)."""
+    if hasattr(transaction, 'on_commit'):
+        transaction.on_commit(func)
+    else:
+        func()
+
+
+def make_key(conference_pk, *parts):
+    """Make a versioned cache key for a conference.
+
+    :param conference_pk: Conference primary key.
+    :param parts: Additional key parts, e.g. the name of the cached item.
+    :returns: Cache key.
+    :rtype: str
+    """
+    return ':'.join(['conference', str(conference_pk),
+                     str(get_version(conference_pk))] +
+                    [str(part) for part in parts])
+
+
+@receiver(schedule_changed)
+def invalidate(sender, conferences, **kwargs):
+    # Bumped once the change commits, as a request reading the schedule
+    # before then would otherwise cache the old rows under the new version.
+    for conference_pk in conferences:
+        on_commit(functools.partial(bump_version, conference_pk))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Detection of time slots which share a resource, or a presenter, at
+overlapping times.
+
+Intervals are grouped, and sorted by start time, then swept in order keeping
+a heap of the intervals still in progress, so finding every overlap takes
+O(n log n + k) time for n intervals and k overlaps, rather than comparing
+every pair of time slots.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from collections import namedtuple
+import heapq
+
+
+#: Related fields of :py:class:`~conference.models.TimeSlot` which may not be
+#: shared by overlapping time slots.
+FIELDS = ['resources', 'presenters']
+
+Conflict = namedtuple('Conflict', ['field', 'object_id', 'first', 'second'])
+
+
+def find_overlaps(intervals):
+    """Find overlapping intervals within each group.
+
+    Intervals are half-open, so an interval ending at the same time as
+    another starts does not overlap it.
+
+    :param intervals: ``(group, start, end, id)`` tuples, in any order.
+    :type intervals: iterable
+    :returns: ``(group, first_id, second_id)`` tuples for each overlapping
+        pair, where the first interval starts no later than the second.
+    :rtype: generator
+    """
+    group, active = None, []
+    for key, start, end, pk in sorted(intervals):
+        if key != group:
+            group, active = key, []
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other in active:
+            yield key, other, pk
+        heapq.heappush(active, (end, pk))
+
+
+def get_intervals(queryset, field):
+    """Get the intervals of time slots for each of their related objects.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param field: Related field name, e.g. ``'resources'``.
+    :type field: str
+    :returns: ``(object_id, start_at, end_at, timeslot_id)`` tuples.
+    :rtype: :py:class:`~django.db.models.query.QuerySet`
+    """
+    m2m_field = queryset.model._meta.get_field(field)
+    source = m2m_field.m2m_field_name()
+    target = m2m_field.m2m_reverse_field_name()
+    return getattr(queryset.model, field).through.objects.filter(**{
+        source + '__in': queryset.values_subquery('pk')}).values_list(
+            target + '_id', source + '__start_at', source + '__end_at',
+            source + '_id')
+
+
+def find_conflicts(queryset, fields=None):
+    """Find time slots sharing a related object at overlapping times, with a
+    single query for each related field.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param fields: Related field names, defaults to :py:data:`.FIELDS`.
+    :type fields: list
+    :returns: Conflicts.
+    :rtype: generator
+    """
+    for field in fields or FIELDS:
+        intervals = get_intervals(queryset, field)
+        for object_id, first, second in find_overlaps(intervals):
+            yield Conflict(field, object_id, first, second)
+
+
+def get_clashes(queryset, field, objects):
+    """Get which of the given related objects are assigned to time slots in
+    the queryset, e.g. those overlapping a time slot being edited.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param field: Related field name, e.g. ``'resources'``.
+    :type field: str
+    :param objects: Related objects.
+    :type objects: iterable
+    :returns: ``(object, timeslot)`` tuples.
+    :rtype: list
+    """
+    m2m_field = queryset.model._meta.get_field(field)
+    source = m2m_field.m2m_field_name()
+    target = m2m_field.m2m_reverse_field_name()
+    rows = getattr(queryset.model, field).through.objects.filter(**{
+        source + '__in': queryset.values_subquery('pk'),
+        target + '__in': objects}).select_related(source, target).order_by(
+            source + '__start_at')
+    return [(getattr(row, target), getattr(row, source)) for row in rows]
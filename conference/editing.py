@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk editing of conference schedules.
+
+Each operation reads the affected time slots once, then writes them with
+set-based updates and bulk inserts inside a single transaction, rather than
+saving each time slot (and each of its related fields) separately. As bulk
+writes send no model signals, :py:data:`~conference.signals.schedule_changed`
+is sent once each operation has finished.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .conflicts import FIELDS
+from .importer import chunks
+from .models import Conference, TimeSlot
+from .signals import send_schedule_changed
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+import datetime
+import uuid
+
+
+def get_through(field):
+    """Get the through model of a related field of time slots, and the names
+    of its time slot, and related object, foreign keys."""
+    m2m_field = TimeSlot._meta.get_field(field)
+    return (getattr(TimeSlot, field).through, m2m_field.m2m_field_name(),
+            m2m_field.m2m_reverse_field_name())
+
+
+def get_rows(queryset):
+    # Querysets from the admin may be distinct, which update() rejects, so
+    # time slots are written by primary key.
+    rows = set(queryset.values_list('pk', 'conference_id'))
+    return ([pk for pk, _ in rows],
+            set(conference for _, conference in rows))
+
+
+def shift(queryset, delta, batch_size=500):
+    """Move time slots earlier, or later, by the same amount of time.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param delta: Amount of time to move the time slots by.
+    :type delta: :py:class:`~datetime.timedelta`
+    :returns: Primary keys of the time slots moved.
+    :rtype: list
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pks, conferences = get_rows(queryset)
+        for batch in chunks(pks, batch_size):
+            TimeSlot.objects.filter(pk__in=batch).update(
+                start_at=F('start_at') + delta, end_at=F('end_at') + delta,
+                updated_at=now)
+    send_schedule_changed(sender=TimeSlot, conferences=conferences,
+                          timeslots=pks)
+    return pks
+
+
+def reassign(queryset, resource, batch_size=500):
+    """Replace the resources of time slots with a single resource.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param resource: Resource.
+    :type resource: :py:class:`~conference.models.Resource`
+    :returns: Primary keys of the time slots reassigned.
+    :rtype: list
+    """
+    through, source, target = get_through('resources')
+    now = timezone.now()
+    with transaction.atomic():
+        pks, conferences = get_rows(queryset)
+        for batch in chunks(pks, batch_size):
+            through.objects.filter(**{source + '_id__in': batch}).delete()
+            TimeSlot.objects.filter(pk__in=batch).update(updated_at=now)
+        through.objects.bulk_create([
+            through(**{source + '_id': pk, target + '_id': resource.pk})
+            for pk in pks],
+            batch_size=batch_size)
+    send_schedule_changed(sender=TimeSlot, conferences=conferences,
+                          timeslots=pks)
+    return pks
+
+
+def get_copy_slug(slug):
+    """Get an unused slug for a copy of the conference with the given slug.
+
+    :param slug: Slug of the conference being copied.
+    :type slug: str
+    :rtype: str
+    """
+    max_length = Conference._meta.get_field('slug').max_length
+    base = '{}-copy'.format(slug[:max_length - 9])
+    existing = set(Conference.objects.filter(
+        slug__startswith=base).values_list('slug', flat=True))
+    candidate, number = base, 1
+    while candidate in existing:
+        number += 1
+        candidate = '{}-{}'.format(base, number)
+    return candidate
+
+
+def add(value, offset):
+    return value + offset if value is not None else None
+
+
+def get_offset(conference, timeslots, start_date):
+    """Get the number of days between a conference, and a copy of it
+    starting on the given date.
+
+    :rtype: :py:class:`~datetime.timedelta`
+    """
+    first_date = conference.start_date
+    if first_date is None and timeslots:
+        first_date = timezone.localtime(
+            min(timeslot.start_at for timeslot in timeslots)).date()
+    if start_date is None or first_date is None:
+        return datetime.timedelta()
+    return start_date - first_date
+
+
+def clone(conference, start_date=None, name=None, slug=None,
+          batch_size=500):
+    """Copy a conference, together with its venues and its schedule of time
+    slots, including their presenters and resources.
+
+    Presenters, resources and venues are shared with the original
+    conference, rather than copied, so unless the copy is moved to another
+    date its time slots clash with the original ones.
+
+    :param conference: Conference to copy.
+    :type conference: :py:class:`~conference.models.Conference`
+    :param start_date: Date of the first day of the copy, to which its
+        dates, and time slots, are moved by the same number of days.
+        Defaults to the same dates as the original.
+    :type start_date: :py:class:`~datetime.date`
+    :param name: Name of the copy, defaults to the original name followed by
+        "(copy)".
+    :type name: str
+    :param slug: Slug of the copy, defaults to an unused slug based on the
+        original.
+    :type slug: str
+    :returns: Copy of the conference.
+    :rtype: :py:class:`~conference.models.Conference`
+    """
+    with transaction.atomic():
+        timeslots = list(TimeSlot.objects.filter(conference=conference))
+        offset = get_offset(conference, timeslots, start_date)
+        copy = Conference.objects.create(
+            name=name or '{} (copy)'.format(conference.name),
+            slug=slug or get_copy_slug(conference.slug), city=conference.city,
+            start_date=start_date or conference.start_date,
+            end_date=add(conference.end_date, offset))
+        copy.venues.add(*conference.venues.all())
+        pks = {}
+        for timeslot in timeslots:
+            pks[timeslot.pk] = uuid.uuid4()
+            timeslot.pk = pks[timeslot.pk]
+            timeslot.conference = copy
+            timeslot.start_at += offset
+            timeslot.end_at += offset
+            timeslot.bookmark_count = 0
+        TimeSlot.objects.bulk_create(timeslots, batch_size=batch_size)
+        for field in FIELDS:
+            through, source, target = get_through(field)
+            rows = through.objects.filter(**{
+                source + '__conference': conference}).values_list(
+                    source + '_id', target + '_id')
+            through.objects.bulk_create([
+                through(**{source + '_id': pks[timeslot], target + '_id': obj})
+                for timeslot, obj in rows], batch_size=batch_size)
+    send_schedule_changed(sender=TimeSlot, conferences=[copy.pk],
+                          timeslots=pks.values())
+    return copy
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Static export of conference schedules.
+
+The conference list is exported as a single page, and each conference as
+its schedule page, JSON schedule and iCalendar feed, at the paths of their
+URLs. A manifest in the output directory records a fingerprint of each
+export, computed from the same validators as the ETags of the views, so
+only conferences whose schedule has changed, or whose next time slot
+boundary has passed, are rendered again.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .models import Conference
+from .views import api, calendar, conference
+from .views.mixins import (annotate_validators, get_schedule_validators,
+                           make_etag)
+from django.conf import settings
+from django.core.urlresolvers import resolve, reverse
+from django.db import connections, models
+from django.test import RequestFactory
+from django.utils import timezone, translation
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+
+
+#: Name of the manifest file, in the output directory.
+MANIFEST = 'manifest.json'
+
+#: Version of the manifest format; older manifests are ignored.
+MANIFEST_VERSION = 1
+
+
+class ExportError(Exception):
+    """Raised when a page cannot be exported."""
+
+
+def get_path(url):
+    """Get the path of the file a URL is exported to, relative to the
+    output directory, with ``index.html`` for URLs ending in a slash.
+
+    :rtype: str
+    """
+    path = url.lstrip('/')
+    if not path or path.endswith('/'):
+        path += 'index.html'
+    return path
+
+
+def write(path, content):
+    """Write a file atomically, by renaming a temporary file in the same
+    directory over it, so the file is never served partly written.
+
+    :param path: File path.
+    :param content: File content.
+    :type content: bytes
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.',
+                                     suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(temp_path, 0o644)
+        getattr(os, 'replace', os.rename)(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def remove(output_dir, path):
+    """Remove an exported file, and any directories left empty."""
+    try:
+        os.remove(os.path.join(output_dir, path))
+    except OSError:
+        pass
+    directory = os.path.dirname(path)
+    while directory:
+        try:
+            os.rmdir(os.path.join(output_dir, directory))
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def render(view, url, host):
+    """Render a page as it would be served for a request.
+
+    :param view: View function.
+    :param url: URL of the page.
+    :param host: Host name the request is made for.
+    :returns: Response content.
+    :rtype: bytes
+    :raises: :py:class:`.ExportError` if the response is not successful.
+    """
+    request = RequestFactory(SERVER_NAME=host).get(url)
+    request.resolver_match = match = resolve(url)
+    response = view(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise ExportError('"{}" responded with status {}.'.format(
+            url, response.status_code))
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.content
+
+
+class StaticExporter(object):
+    """Exporter of conference schedules to static files, rendering the
+    conferences which changed since the last export across a pool of
+    processes.
+
+    :param output_dir: Directory the files are written to.
+    :type output_dir: str
+    :param host: Host name the pages are rendered for, used in the
+        iCalendar feed.
+    :type host: str
+    :param processes: Number of processes rendering conferences (default:
+        the number of CPUs), or 1 to render in this process.
+    :type processes: int
+
+    """
+
+    #: URL name and view of each page exported for a conference.
+    conference_pages = [
+        ('conference:conference_detail', conference.DetailView.as_view()),
+        ('conference:conference_schedule', api.ScheduleView.as_view()),
+        ('conference:conference_calendar', calendar.CalendarView.as_view()),
+    ]
+
+    #: URL name and view of the conference list, exported as a single page.
+    list_page = ('conference:conference_list',
+                 conference.ListView.as_view(paginate_by=None))
+
+    def __init__(self, output_dir, host='localhost', processes=None):
+        self.output_dir = output_dir
+        self.host = host
+        self.processes = processes
+
+    def export(self, force=False):
+        """Export the conferences whose fingerprint differs from the
+        manifest, remove the files of deleted conferences, then write the
+        manifest.
+
+        :param force: Whether to render every conference again.
+        :type force: bool
+        :returns: Slugs of the conferences exported, left unchanged and
+            removed.
+        :rtype: dict
+        """
+        manifest = self.read_manifest()
+        # The files of conferences deleted since the last export are removed
+        # even when everything is rendered again.
+        previous = manifest.get('conferences', {})
+        if force or manifest.get('host') != self.host:
+            manifest = {}
+        exported = manifest.get('conferences', {})
+        fingerprints = self.get_fingerprints()
+        changed = [slug for slug, fingerprint in fingerprints.items()
+                   if exported.get(slug, {}).get('fingerprint') !=
+                   fingerprint]
+        removed = [slug for slug in previous if slug not in fingerprints]
+        conferences = dict((slug, exported[slug]) for slug in exported
+                           if slug in fingerprints)
+        for slug, files in self.render_conferences(changed, exported):
+            conferences[slug] = {'fingerprint': fingerprints[slug],
+                                 'files': files}
+        for slug in removed:
+            for path in previous[slug]['files']:
+                remove(self.output_dir, path)
+        index = manifest.get('index', {})
+        fingerprint = self.get_list_fingerprint()
+        if changed or removed or index.get('fingerprint') != fingerprint:
+            index = {'fingerprint': fingerprint,
+                     'files': self.render_list(index.get('files', {}))}
+        self.write_manifest({'version': MANIFEST_VERSION, 'host': self.host,
+                             'index': index, 'conferences': conferences})
+        return {
+            'exported': sorted(changed),
+            'unchanged': sorted(set(fingerprints) - set(changed)),
+            'removed': sorted(removed),
+        }
+
+    def get_fingerprints(self):
+        """Get the fingerprint of each conference, in a single query.
+
+        :returns: Fingerprints, by conference slug.
+        :rtype: dict
+        """
+        queryset = annotate_validators(Conference.objects.all(),
+                                       timezone.now())
+        return dict((conference.slug,
+                     make_etag(get_schedule_validators(conference)[0]))
+                    for conference in queryset)
+
+    def get_list_fingerprint(self):
+        values = Conference.objects.aggregate(
+            updated_at=models.Max('updated_at'), count=models.Count('pk'))
+        return make_etag([values['updated_at'], values['count']])
+
+    def read_manifest(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (IOError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def render_conference(self, slug, files=None):
+        """Render the pages of a conference, writing the files whose
+        content changed.
+
+        :param slug: Conference slug.
+        :param files: SHA-256 digests of the files last exported, by path.
+        :returns: SHA-256 digests of the exported files, by path.
+        :rtype: dict
+        """
+        return self.render_pages([
+            (view, reverse(name, kwargs={'slug': slug}))
+            for name, view in self.conference_pages], files or {})
+
+    def render_conferences(self, slugs, exported):
+        """Render the given conferences, across a pool of processes unless
+        a single process is configured.
+
+        :returns: Conference slugs, and the digests of their files.
+        :rtype: iterator
+        """
+        arguments = [(self.output_dir, self.host, slug,
+                      exported.get(slug, {}).get('files'))
+                     for slug in slugs]
+        if self.processes == 1 or len(arguments) < 2:
+            for argument in arguments:
+                yield export_conference(argument)
+            return
+        # Forked processes must not share the database connections.
+        for connection in connections.all():
+            connection.close()
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            for result in pool.imap_unordered(export_conference, arguments):
+                yield result
+            pool.close()
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def render_list(self, files=None):
+        name, view = self.list_page
+        with translation.override(settings.LANGUAGE_CODE):
+            return self.render_pages([(view, reverse(name))], files or {})
+
+    def render_pages(self, pages, files):
+        digests = {}
+        for view, url in pages:
+            content = render(view, url, self.host)
+            path = get_path(url)
+            digests[path] = hashlib.sha256(content).hexdigest()
+            full_path = os.path.join(self.output_dir, path)
+            if (files.get(path) != digests[path] or
+                    not os.path.exists(full_path)):
+                write(full_path, content)
+        for path in set(files) - set(digests):
+            remove(self.output_dir, path)
+        return digests
+
+    def write_manifest(self, manifest):
+        write(os.path.join(self.output_dir, MANIFEST), json.dumps(
+            manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def export_conference(arguments):
+    """Render the pages of a conference, in a pool process.
+
+    :param arguments: Output directory, host name, conference slug, and the
+        digests of the files last exported.
+    :type arguments: tuple
+    :returns: Conference slug, and the digests of its exported files.
+    :rtype: tuple
+    """
+    output_dir, host, slug, files = arguments
+    exporter = StaticExporter(output_dir, host=host, processes=1)
+    with translation.override(settings.LANGUAGE_CODE):
+        return slug, exporter.render_conference(slug, files)
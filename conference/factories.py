@@ -16,7 +16,13 @@
 
 
 from __future__ import absolute_import, unicode_literals
+from django.apps import apps
+from django.db import transaction
 from django.utils import timezone
+import datetime
+import heapq
+import itertools
+import random
 
 try:
     import factory
@@ -36,6 +42,24 @@ class ConferenceFactory(factory.django.DjangoModelFactory):
         model = 'conference.Conference'
 
 
+class PresenterFactory(factory.django.DjangoModelFactory):
+
+    name = factory.Sequence(lambda n: 'Presenter {}'.format(n))
+
+    class Meta(object):
+        model = 'conference.Presenter'
+
+
+class ResourceFactory(factory.django.DjangoModelFactory):
+
+    name = factory.Sequence(lambda n: 'Room {}'.format(n))
+
+    venue = factory.SubFactory('conference.factories.VenueFactory')
+
+    class Meta(object):
+        model = 'conference.Resource'
+
+
 class TimeSlotFactory(factory.django.DjangoModelFactory):
 
     conference = factory.SubFactory('conference.factories.ConferenceFactory')
@@ -59,3 +83,162 @@ class VenueFactory(factory.django.DjangoModelFactory):
 
     class Meta(object):
         model = 'conference.Venue'
+
+
+class ScheduleGenerator(object):
+    """Generate conferences with realistic schedules, in bulk.
+
+    Objects are built (but not saved) with the factories above, then
+    inserted with ``bulk_create``, together with the rows of each
+    many-to-many relation, so that a conference of 50,000 time slots is
+    created in seconds rather than minutes.
+
+    Each resource has a schedule of sessions, separated by breaks, within
+    the hours of each day, and presenters are only assigned to sessions
+    which do not overlap their others. The same seed generates the same
+    schedules, though primary keys differ.
+
+    :param seed: Random seed.
+    :type seed: int
+    :param batch_size: Rows inserted by each query.
+    :type batch_size: int
+
+    """
+
+    #: Session lengths, in minutes.
+    durations = [30, 45, 60, 90]
+
+    #: Breaks between sessions, in minutes.
+    breaks = [0, 15, 15, 30]
+
+    #: Time of the first session on each day.
+    day_start = datetime.time(9)
+
+    #: Time by which the last session on each day ends.
+    day_end = datetime.time(18)
+
+    def __init__(self, seed=None, batch_size=500):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        if seed is not None:
+            fuzzy.reseed_random(seed)
+
+    def create(self, conferences=1, timeslots=100, resources=10, venues=1,
+               presenters_per_timeslot=(1, 2), start_date=None):
+        """Create conferences, each with its own venues, resources,
+        presenters and schedule.
+
+        :param conferences: Number of conferences.
+        :type conferences: int
+        :param timeslots: Time slots for each conference.
+        :type timeslots: int
+        :param resources: Resources for each conference, across its venues.
+        :type resources: int
+        :param venues: Venues for each conference.
+        :type venues: int
+        :param presenters_per_timeslot: Minimum and maximum presenters of
+            each time slot.
+        :type presenters_per_timeslot: tuple
+        :param start_date: Date of the first day of each conference, defaults
+            to today.
+        :type start_date: :py:class:`~datetime.date`
+        :returns: Conferences.
+        :rtype: list
+        """
+        rows = dict((name, []) for name in [
+            'Conference', 'Venue', 'Resource', 'Presenter', 'TimeSlot',
+            'Conference.venues', 'TimeSlot.resources', 'TimeSlot.presenters'])
+        start_date = start_date or timezone.localtime(timezone.now()).date()
+        for _ in range(conferences):
+            self.build_conference(rows, timeslots, resources, venues,
+                                  presenters_per_timeslot, start_date)
+        with transaction.atomic():
+            self.insert(rows)
+        # Bulk inserts send no model signals, so search indexes, snapshots
+        # and cached schedules are updated here.
+        from .signals import send_schedule_changed
+        send_schedule_changed(
+            sender=apps.get_model('conference', 'TimeSlot'),
+            conferences=[conference.pk for conference in rows['Conference']])
+        return rows['Conference']
+
+    def insert(self, rows):
+        for name in ['Conference', 'Venue', 'Resource', 'Presenter',
+                     'TimeSlot']:
+            model = apps.get_model('conference', name)
+            model.objects.bulk_create(rows[name], batch_size=self.batch_size)
+        for name in ['Conference.venues', 'TimeSlot.resources',
+                     'TimeSlot.presenters']:
+            model_name, field = name.split('.')
+            through = getattr(apps.get_model('conference', model_name),
+                              field).through
+            through.objects.bulk_create(
+                [through(**values) for values in rows[name]],
+                batch_size=self.batch_size)
+
+    def build_conference(self, rows, timeslots, resources, venues,
+                         presenters_per_timeslot, start_date):
+        venue_objs = [VenueFactory.build() for _ in range(venues)]
+        resource_objs = [ResourceFactory.build(venue=venue_objs[n % venues])
+                         for n in range(resources)]
+        schedule = self.build_schedule(timeslots, resources, start_date)
+        conference = ConferenceFactory.build(
+            start_date=start_date,
+            end_date=max(end_at for _, _, end_at in schedule).date())
+        rows['Conference'].append(conference)
+        rows['Venue'].extend(venue_objs)
+        rows['Resource'].extend(resource_objs)
+        rows['Conference.venues'].extend(
+            {'conference_id': conference.pk, 'venue_id': venue.pk}
+            for venue in venue_objs)
+        # Presenters are reused once free, from a heap ordered by the time
+        # their last session ends.
+        free, busy, order = [], [], itertools.count()
+        for resource, start_at, end_at in schedule:
+            timeslot = TimeSlotFactory.build(
+                conference=conference, start_at=start_at, end_at=end_at)
+            rows['TimeSlot'].append(timeslot)
+            rows['TimeSlot.resources'].append(
+                {'timeslot_id': timeslot.pk,
+                 'resource_id': resource_objs[resource].pk})
+            while busy and busy[0][0] <= start_at:
+                free.append(heapq.heappop(busy)[2])
+            for _ in range(self.random.randint(*presenters_per_timeslot)):
+                if free and self.random.random() < 0.5:
+                    index = self.random.randrange(len(free))
+                    free[index], free[-1] = free[-1], free[index]
+                    presenter = free.pop()
+                else:
+                    presenter = PresenterFactory.build()
+                    rows['Presenter'].append(presenter)
+                heapq.heappush(busy, (end_at, next(order), presenter))
+                rows['TimeSlot.presenters'].append(
+                    {'timeslot_id': timeslot.pk,
+                     'presenter_id': presenter.pk})
+
+    def build_schedule(self, timeslots, resources, start_date):
+        """Build the schedule of non-overlapping sessions in each resource.
+
+        :returns: ``(resource, start_at, end_at)`` tuples, ordered by start
+            time.
+        :rtype: list
+        """
+        schedule = []
+        for resource in range(resources):
+            count = timeslots // resources + (resource < timeslots % resources)
+            day, start_at = start_date, None
+            for _ in range(count):
+                duration = datetime.timedelta(
+                    minutes=self.random.choice(self.durations))
+                if start_at is None or \
+                        (start_at + duration).time() > self.day_end:
+                    if start_at is not None:
+                        day += datetime.timedelta(days=1)
+                    start_at = timezone.make_aware(
+                        datetime.datetime.combine(day, self.day_start))
+                end_at = start_at + duration
+                schedule.append((resource, start_at, end_at))
+                start_at = end_at + datetime.timedelta(
+                    minutes=self.random.choice(self.breaks))
+        schedule.sort(key=lambda row: (row[1], row[0]))
+        return schedule
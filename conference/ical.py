@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generation and validation of iCalendar (:rfc:`5545`) schedules."""
+
+from __future__ import absolute_import, unicode_literals
+from . import __title__, __version__, snapshot
+from .models import TimeSlot
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+import json
+
+
+CRLF = '\r\n'
+
+PRODID = '-//{0}//{0} {1}//EN'.format(__title__, __version__)
+
+
+def escape_text(value):
+    """Escape a TEXT property value.
+
+    :param value: Text.
+    :type value: str
+    :rtype: str
+    """
+    return (value.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def format_datetime(value):
+    """Format a date-time property value, in UTC.
+
+    :param value: Aware date-time.
+    :type value: :py:class:`~datetime.datetime`
+    :rtype: str
+    """
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def fold_line(line):
+    """Fold a content line into lines of no more than 75 octets, without
+    splitting multi-octet characters, and terminate it with CRLF.
+
+    :param line: Unfolded content line.
+    :type line: str
+    :rtype: str
+    """
+    if len(line) * 4 <= 75 or len(line.encode('utf-8')) <= 75:
+        return line + CRLF
+    lines, length, start = [], 0, 0
+    for index, character in enumerate(line):
+        size = len(character.encode('utf-8'))
+        # Continuation lines start with a space.
+        if length + size > (75 if not lines else 74):
+            lines.append(line[start:index])
+            length, start = 0, index
+        length += size
+    lines.append(line[start:])
+    return (CRLF + ' ').join(lines) + CRLF
+
+
+def content_line(name, value):
+    return fold_line('{}:{}'.format(name, value))
+
+
+def iter_chunks(queryset, fields, chunk_size=500):
+    """Iterate over the values of time slots (or schedule entries), a fixed
+    number of rows at a time, ordered by ``(start_at, pk)``.
+
+    Each chunk is fetched by seeking past the previous chunk's last
+    ``(start_at, pk)``, rather than with a server-side cursor, so that
+    memory use is flat on all databases (including SQLite, where
+    :py:meth:`~django.db.models.query.QuerySet.iterator` reads all rows).
+
+    :param queryset: Time slots, or schedule entries.
+    :type queryset: :py:class:`~django.db.models.query.QuerySet`
+    :param fields: Field names, including ``'pk'`` and ``'start_at'``.
+    :type fields: list
+    :param chunk_size: Number of rows to load at a time.
+    :type chunk_size: int
+    :returns: Iterator of lists of value tuples.
+    """
+    pk_index, start_at_index = fields.index('pk'), fields.index('start_at')
+    queryset = queryset.order_by('start_at', 'pk').values_list(*fields)
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield chunk
+        if len(chunk) < chunk_size:
+            break
+        last_start_at = chunk[-1][start_at_index]
+        last_pk = chunk[-1][pk_index]
+        chunk = list(queryset.filter(
+            Q(start_at__gt=last_start_at) |
+            Q(start_at=last_start_at, pk__gt=last_pk))[:chunk_size])
+
+
+def iter_timeslot_rows(queryset, chunk_size=500):
+    """Iterate over time slots, as tuples with their presenter names and
+    resource locations, loading a fixed number of time slots at a time.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :param chunk_size: Number of time slots to load at a time.
+    :type chunk_size: int
+    :returns: Iterator of ``(pk, name, description, start_at, end_at,
+        updated_at, video, presenters, resources)`` tuples.
+    """
+    fields = ['pk', 'name', 'description', 'start_at', 'end_at',
+              'updated_at', 'video']
+    for chunk in iter_chunks(queryset, fields, chunk_size=chunk_size):
+        pks = [row[0] for row in chunk]
+        presenters = defaultdict(list)
+        for pk, name in TimeSlot.presenters.through.objects.filter(
+                timeslot__in=pks).order_by('presenter__name').values_list(
+                'timeslot_id', 'presenter__name'):
+            presenters[pk].append(name)
+        resources = defaultdict(list)
+        for pk, name, venue in TimeSlot.resources.through.objects.filter(
+                timeslot__in=pks).order_by('resource__name').values_list(
+                'timeslot_id', 'resource__name', 'resource__venue__name'):
+            resources[pk].append('{} ({})'.format(name, venue))
+        for row in chunk:
+            yield row + (presenters[row[0]], resources[row[0]])
+
+
+def iter_entry_rows(queryset, chunk_size=500):
+    """Iterate over schedule entries, as tuples in the same form as
+    :py:func:`.iter_timeslot_rows`, with a single query for each chunk.
+
+    :param queryset: Schedule entries.
+    :type queryset: :py:class:`~django.db.models.query.QuerySet`
+    :param chunk_size: Number of entries to load at a time.
+    :type chunk_size: int
+    """
+    fields = ['pk', 'name', 'description', 'start_at', 'end_at',
+              'updated_at', 'video', 'presenters_data', 'resources_data']
+    for chunk in iter_chunks(queryset, fields, chunk_size=chunk_size):
+        for row in chunk:
+            resources = ['{} ({})'.format(name, venue)
+                         for name, venue in json.loads(row[8])]
+            yield row[:7] + (json.loads(row[7]), resources)
+
+
+def iter_calendar(conference, domain, chunk_size=500):
+    """Iterate over the lines of an iCalendar stream for a conference's
+    schedule, with an event for each time slot.
+
+    :param conference: Conference.
+    :type conference: :py:class:`~conference.models.Conference`
+    :param domain: Domain name used for event UIDs.
+    :type domain: str
+    :param chunk_size: Number of time slots to load at a time.
+    :type chunk_size: int
+    :returns: Iterator of folded, CRLF-terminated, content lines, joined
+        for each component.
+    """
+    yield ''.join([
+        content_line('BEGIN', 'VCALENDAR'),
+        content_line('VERSION', '2.0'),
+        content_line('PRODID', PRODID),
+        content_line('CALSCALE', 'GREGORIAN'),
+        content_line('X-WR-CALNAME', escape_text(conference.name))])
+    if snapshot.is_enabled():
+        rows = iter_entry_rows(conference.schedule_entries.all(),
+                               chunk_size=chunk_size)
+    else:
+        rows = iter_timeslot_rows(conference.timeslots.all(),
+                                  chunk_size=chunk_size)
+    for (pk, name, description, start_at, end_at, updated_at, video,
+         presenters, resources) in rows:
+        if presenters:
+            description = 'With {}.\n\n{}'.format(
+                ', '.join(presenters), description).strip()
+        lines = [
+            content_line('BEGIN', 'VEVENT'),
+            content_line('UID', '{}@{}'.format(pk, domain)),
+            content_line('DTSTAMP', format_datetime(updated_at)),
+            content_line('DTSTART', format_datetime(start_at)),
+            content_line('DTEND', format_datetime(end_at)),
+            content_line('SUMMARY', escape_text(name))]
+        if description:
+            lines.append(content_line('DESCRIPTION', escape_text(description)))
+        if resources:
+            lines.append(content_line('LOCATION',
+                                      escape_text(', '.join(resources))))
+        if video:
+            lines.append(content_line('URL', video))
+        lines.append(content_line('END', 'VEVENT'))
+        yield ''.join(lines)
+    yield content_line('END', 'VCALENDAR')
+
+
+def validate_calendar(content):
+    """Validate the structure of an iCalendar stream.
+
+    Lines must be CRLF-terminated and no longer than 75 octets, components
+    must be properly nested, the calendar must have ``VERSION`` and
+    ``PRODID`` properties, and each event must have ``UID``, ``DTSTAMP``
+    and ``DTSTART`` properties.
+
+    :param content: iCalendar stream.
+    :type content: bytes
+    :raises: :py:class:`~django.core.exceptions.ValidationError`
+    """
+    required = {'VCALENDAR': {'VERSION', 'PRODID'},
+                'VEVENT': {'UID', 'DTSTAMP', 'DTSTART'}}
+    if not content.endswith(CRLF.encode('ascii')):
+        raise ValidationError('Content must end with CRLF.')
+    components, properties, line = [], [], ''
+    for number, octets in enumerate(content.split(b'\r\n')[:-1], 1):
+        if b'\n' in octets or b'\r' in octets:
+            raise ValidationError('Line {} has a bare CR or LF.'.format(
+                number))
+        if len(octets) > 75:
+            raise ValidationError('Line {} is longer than 75 octets.'.format(
+                number))
+        if octets.startswith((b' ', b'\t')):
+            # Continuation of a folded line.
+            continue
+        line = octets.decode('utf-8')
+        if ':' not in line:
+            raise ValidationError('Line {} has no value.'.format(number))
+        name, value = line.split(':', 1)
+        name = name.split(';')[0].upper()
+        if name == 'BEGIN':
+            components.append(value)
+            properties.append(set())
+        elif name == 'END':
+            if not components or components[-1] != value:
+                raise ValidationError('Line {} ends {} out of order.'.format(
+                    number, value))
+            missing = required.get(value, set()) - properties[-1]
+            if missing:
+                raise ValidationError('{} is missing {}.'.format(
+                    value, ', '.join(sorted(missing))))
+            components.pop()
+            properties.pop()
+            if not components and number != content.count(b'\r\n'):
+                raise ValidationError('Content follows the calendar.')
+        elif not components:
+            raise ValidationError('Line {} is outside a component.'.format(
+                number))
+        else:
+            properties[-1].add(name)
+    if components:
+        raise ValidationError('{} is not ended.'.format(components[-1]))
+    if not line:
+        raise ValidationError('Content is empty.')
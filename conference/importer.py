@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk import of conference schedules.
+
+Objects are matched to existing rows by natural key: conferences by slug,
+venues and presenters by name, resources by venue and name, and time slots
+by conference, name and start time. Existing rows are left unchanged, so
+importing the same data again creates nothing.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .models import Conference, Presenter, Resource, TimeSlot, Venue
+from .signals import send_schedule_changed
+from collections import Counter, OrderedDict
+from django.db import transaction
+from django.utils import six, timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import csv
+import io
+import json
+
+
+#: Optional presenter fields which may be imported.
+PRESENTER_FIELDS = ['biography', 'email', 'blog', 'twitter_handle',
+                    'irc_handle', 'github_handle', 'slack_handle', 'business',
+                    'position']
+
+
+class ImportDataError(ValueError):
+    """Raised when the data to import is invalid."""
+
+
+def chunks(values, size):
+    values = list(values)
+    for index in range(0, len(values), size):
+        yield values[index:index + size]
+
+
+def parse_resource(value):
+    """Parse a resource reference, either a ``{'venue': ..., 'name': ...}``
+    dict or a ``'Venue/Name'`` string, into a ``(venue, name)`` tuple."""
+    if isinstance(value, dict):
+        return value['venue'], value['name']
+    venue, separator, name = value.rpartition('/')
+    if not separator:
+        raise ImportDataError('Resource "{}" has no venue.'.format(value))
+    return venue.strip(), name.strip()
+
+
+def parse_timestamp(value):
+    timestamp = parse_datetime(value) if value else None
+    if timestamp is None:
+        raise ImportDataError('Invalid date-time "{}".'.format(value))
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp
+
+
+def read_json(path):
+    """Read schedule data from a JSON document.
+
+    The document is an object with optional ``conferences``, ``venues``,
+    ``resources``, ``presenters`` and ``timeslots`` lists. Time slots refer
+    to their conference by slug, to presenters by name, and to resources as
+    ``'Venue/Name'`` strings or ``{'venue': ..., 'name': ...}`` objects.
+
+    :param path: File path.
+    :type path: str
+    :rtype: dict
+    """
+    with io.open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_csv(path):
+    """Read time slots from a CSV file with a header row.
+
+    The columns are ``conference`` (slug), ``name``, ``start_at`` and
+    ``end_at``, and optionally ``description``, ``video``, ``presenters``
+    (names) and ``resources`` (``'Venue/Name'`` strings), with multiple
+    presenters and resources separated by semicolons.
+
+    :param path: File path.
+    :type path: str
+    :rtype: dict
+    """
+    def split(value):
+        return [item.strip() for item in (value or '').split(';')
+                if item.strip()]
+
+    if six.PY2:
+        with open(path, 'rb') as f:
+            rows = [{key.decode('utf-8'): (value or b'').decode('utf-8')
+                     for key, value in row.items()}
+                    for row in csv.DictReader(f)]
+    else:
+        with io.open(path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    for row in rows:
+        row['presenters'] = split(row.get('presenters'))
+        row['resources'] = split(row.get('resources'))
+    return {'timeslots': rows}
+
+
+class ScheduleImporter(object):
+    """Importer of conferences, venues, resources, presenters and time
+    slots, using set-based lookups and batched inserts for both rows and
+    M2M relations.
+
+    :param batch_size: Maximum number of rows to look up, or insert, in a
+        single query.
+    :type batch_size: int
+
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.created = Counter()
+
+    def import_data(self, data):
+        """Import schedule data, in a single transaction.
+
+        :param data: Schedule data, as returned by :py:func:`.read_json`.
+        :type data: dict
+        :returns: Number of rows created for each model (and M2M relation).
+        :rtype: :py:class:`~collections.Counter`
+        :raises: :py:class:`.ImportDataError` if the data is invalid.
+        """
+        self.created = Counter()
+        try:
+            with transaction.atomic():
+                conferences = self.import_all(data)
+        except (KeyError, TypeError) as e:
+            raise ImportDataError('Invalid data: {!r}.'.format(e))
+        send_schedule_changed(sender=TimeSlot, conferences=conferences)
+        return self.created
+
+    def import_all(self, data):
+        timeslots = data.get('timeslots', [])
+        venues = self.import_venues(
+            OrderedDict((venue['name'], venue)
+                        for venue in data.get('venues', [])),
+            [name for conference in data.get('conferences', [])
+             for name in conference.get('venues', [])] +
+            [parse_resource(resource)[0]
+             for resource in data.get('resources', [])] +
+            [parse_resource(resource)[0] for timeslot in timeslots
+             for resource in timeslot.get('resources', [])])
+        resources = self.import_resources(venues, [
+            parse_resource(resource) for resource in
+            data.get('resources', []) + [
+                resource for timeslot in timeslots
+                for resource in timeslot.get('resources', [])]])
+        presenters = self.import_presenters(
+            OrderedDict((presenter['name'], presenter)
+                        for presenter in data.get('presenters', [])),
+            [name for timeslot in timeslots
+             for name in timeslot.get('presenters', [])])
+        conferences = self.import_conferences(
+            OrderedDict((conference['slug'], conference)
+                        for conference in data.get('conferences', [])),
+            [timeslot['conference'] for timeslot in timeslots], venues)
+        self.import_timeslots(timeslots, conferences, presenters, resources)
+        return set(conferences.values())
+
+    def get_existing(self, queryset, lookup, values, key_fields):
+        """Get the primary keys of existing rows, matching a single field
+        lookup, with one query for each batch of values.
+
+        :returns: Primary keys, keyed by the values of ``key_fields``.
+        :rtype: dict
+        """
+        existing = {}
+        for batch in chunks(set(values), self.batch_size):
+            rows = queryset.filter(**{lookup: batch}).values_list(
+                'pk', *key_fields)
+            for row in rows:
+                key = row[1] if len(key_fields) == 1 else row[1:]
+                existing.setdefault(key, row[0])
+        return existing
+
+    def create(self, model, objs):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.created[model._meta.object_name] += len(objs)
+        return objs
+
+    def import_venues(self, data, names):
+        names = list(data) + names
+        venues = self.get_existing(Venue.objects, 'name__in', names,
+                                   ['name'])
+        objs = [Venue(name=name,
+                      address=data.get(name, {}).get('address', ''))
+                for name in OrderedDict.fromkeys(names) if name not in venues]
+        venues.update((venue.name, venue.pk)
+                      for venue in self.create(Venue, objs))
+        return venues
+
+    def import_resources(self, venues, keys):
+        resources = {}
+        for batch in chunks(set(venues.values()), self.batch_size):
+            resources.update(
+                ((venue, name), pk) for pk, venue, name in
+                Resource.objects.filter(venue__in=batch).values_list(
+                    'pk', 'venue_id', 'name'))
+        objs = [Resource(name=name, venue_id=venues[venue])
+                for venue, name in OrderedDict.fromkeys(keys)
+                if (venues[venue], name) not in resources]
+        resources.update(((resource.venue_id, resource.name), resource.pk)
+                         for resource in self.create(Resource, objs))
+        return dict(((venue, name), resources[(venues[venue], name)])
+                    for venue, name in keys)
+
+    def import_presenters(self, data, names):
+        names = list(data) + names
+        presenters = self.get_existing(Presenter.objects, 'name__in', names,
+                                       ['name'])
+        objs = []
+        for name in OrderedDict.fromkeys(names):
+            if name not in presenters:
+                fields = data.get(name, {})
+                objs.append(Presenter(name=name, **dict(
+                    (field, fields[field]) for field in PRESENTER_FIELDS
+                    if fields.get(field))))
+        presenters.update((presenter.name, presenter.pk)
+                          for presenter in self.create(Presenter, objs))
+        return presenters
+
+    def import_conferences(self, data, slugs, venues):
+        slugs = list(data) + slugs
+        conferences = self.get_existing(Conference.objects, 'slug__in', slugs,
+                                        ['slug'])
+        objs = []
+        for slug in OrderedDict.fromkeys(slugs):
+            if slug not in conferences:
+                fields = data.get(slug, {})
+                objs.append(Conference(
+                    slug=slug, name=fields.get('name') or slug,
+                    city=fields.get('city') or '',
+                    start_date=parse_date(fields.get('start_date') or ''),
+                    end_date=parse_date(fields.get('end_date') or '')))
+        conferences.update((conference.slug, conference.pk)
+                           for conference in self.create(Conference, objs))
+        self.link(Conference.venues.through, 'conference', 'venue', [
+            (conferences[slug], venues[name])
+            for slug, fields in data.items()
+            for name in fields.get('venues', [])])
+        return conferences
+
+    def import_timeslots(self, data, conferences, presenters, resources):
+        timeslots = {}
+        for batch in chunks(set(conferences.values()), self.batch_size):
+            timeslots.update(
+                ((conference, name, start_at), pk)
+                for pk, conference, name, start_at in
+                TimeSlot.objects.filter(conference__in=batch).values_list(
+                    'pk', 'conference_id', 'name', 'start_at'))
+        objs, timeslot_presenters, timeslot_resources = [], [], []
+        for fields in data:
+            key = (conferences[fields['conference']], fields['name'],
+                   parse_timestamp(fields['start_at']))
+            if key not in timeslots:
+                timeslot = TimeSlot(
+                    conference_id=key[0], name=key[1], start_at=key[2],
+                    end_at=parse_timestamp(fields['end_at']),
+                    description=fields.get('description') or '',
+                    video=fields.get('video') or '')
+                timeslots[key] = timeslot.pk
+                objs.append(timeslot)
+            timeslot_presenters.extend(
+                (timeslots[key], presenters[name])
+                for name in fields.get('presenters', []))
+            timeslot_resources.extend(
+                (timeslots[key], resources[parse_resource(resource)])
+                for resource in fields.get('resources', []))
+        self.create(TimeSlot, objs)
+        self.link(TimeSlot.presenters.through, 'timeslot', 'presenter',
+                  timeslot_presenters)
+        self.link(TimeSlot.resources.through, 'timeslot', 'resource',
+                  timeslot_resources)
+
+    def link(self, through, source, target, pairs):
+        """Create the M2M relations between pairs of primary keys which do
+        not already exist."""
+        source_field, target_field = source + '_id', target + '_id'
+        existing = set()
+        for batch in chunks(set(source for source, _ in pairs),
+                            self.batch_size):
+            existing.update(through.objects.filter(**{
+                source + '__in': batch}).values_list(source_field,
+                                                     target_field))
+        objs = [through(**{source_field: source, target_field: target})
+                for source, target in OrderedDict.fromkeys(pairs)
+                if (source, target) not in existing]
+        self.create(through, objs)
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Opt-in measurement of the queries, database time and rendering time of
+conference views and time slot queryset methods.
+
+Instrumentation is enabled by the ``CONFERENCE_INSTRUMENTATION_SINKS``
+setting, a list of dotted paths of :py:class:`.BaseSink` subclasses which
+each measurement is recorded by (default empty, i.e. disabled). Queries
+which are repeated with only their parameters differing, typically from a
+related object being loaded for each row ("N+1" queries), are reported as
+:py:attr:`.Measurement.repeated`.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connections
+from django.db.backends.utils import CursorWrapper
+from django.utils.module_loading import import_string
+import functools
+import logging
+import re
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+#: Number of times a query may run, with different parameters, before it is
+#: reported as repeated.
+REPEATED_THRESHOLD = 3
+
+_sinks = {}
+
+_capturing = []
+
+_recording = threading.local()
+
+LITERALS_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+IN_RE = re.compile(r'IN \((?:\?, )*\?\)')
+
+
+def normalize(sql):
+    """Replace the literal values in a query with placeholders, so that
+    queries differing only in their parameters compare equal."""
+    return IN_RE.sub('IN (...)', LITERALS_RE.sub('?', sql))
+
+
+class Measurement(object):
+    """The queries and timings of a view, or queryset method, call.
+
+    :param name: Name of the view, or method.
+    :type name: str
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = []
+        self.render_time = 0.0
+        self.total_time = 0.0
+
+    @property
+    def count(self):
+        """Number of queries made.
+
+        :rtype: int
+        """
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        """Total time spent on queries, in seconds.
+
+        :rtype: float
+        """
+        return sum(float(query['time']) for query in self.queries)
+
+    @property
+    def repeated(self):
+        """Queries made at least :py:data:`.REPEATED_THRESHOLD` times,
+        differing only in their parameters.
+
+        :returns: ``(sql, count)`` tuples, most repeated first.
+        :rtype: list
+        """
+        counts = Counter(normalize(query['sql']) for query in self.queries)
+        return [(sql, count) for sql, count in counts.most_common()
+                if count >= REPEATED_THRESHOLD]
+
+
+class RecordingCursorWrapper(CursorWrapper):
+    """Cursor wrapper adding its queries to the measurements in progress on
+    the current thread.
+
+    Unlike ``connection.queries``, this needs neither ``DEBUG`` nor a debug
+    cursor, and keeps no log of its own which could fill up in threads
+    which never receive ``request_started``.
+
+    """
+
+    def execute(self, sql, params=None):
+        start = time.time()
+        try:
+            return super(RecordingCursorWrapper, self).execute(sql, params)
+        finally:
+            self.record(start, sql, params)
+
+    def executemany(self, sql, param_list):
+        start = time.time()
+        try:
+            return super(RecordingCursorWrapper, self).executemany(
+                sql, param_list)
+        finally:
+            try:
+                times = len(param_list)
+            except TypeError:  # An iterator
+                times = '?'
+            self.record(start, '{} times: {}'.format(times, sql), None)
+
+    def record(self, start, sql, params):
+        measurements = get_recording()
+        if not measurements:
+            return
+        query = {
+            'sql': self.db.ops.last_executed_query(self.cursor, sql, params),
+            'time': '{:.3f}'.format(time.time() - start),
+        }
+        for measurement in measurements:
+            measurement.queries.append(query)
+
+
+class BaseSink(object):
+    """Receives each measurement while instrumentation is enabled."""
+
+    def record(self, measurement):
+        """Record a measurement.
+
+        :param measurement: Measurement.
+        :type measurement: :py:class:`.Measurement`
+        """
+        raise NotImplementedError
+
+
+class LoggingSink(BaseSink):
+    """Logs each measurement to the ``conference.instrumentation`` logger, as
+    a warning when queries were repeated."""
+
+    def record(self, measurement):
+        logger.info('%s: %d queries, %.1f ms database, %.1f ms render, '
+                    '%.1f ms total', measurement.name, measurement.count,
+                    measurement.db_time * 1000, measurement.render_time * 1000,
+                    measurement.total_time * 1000)
+        for sql, count in measurement.repeated:
+            logger.warning('%s: query repeated %d times: %s',
+                           measurement.name, count, sql)
+
+
+class MemorySink(BaseSink):
+    """Keeps each measurement in :py:attr:`measurements`."""
+
+    def __init__(self):
+        self.measurements = []
+
+    def record(self, measurement):
+        self.measurements.append(measurement)
+
+
+class PrometheusSink(BaseSink):
+    """Accumulates totals for each view, or method, in this process, which
+    are exposed in the Prometheus text format by
+    :py:class:`~conference.views.metrics.MetricsView`."""
+
+    #: Metric names, and the measurement values they total.
+    metrics = [
+        ('conference_calls_total', lambda measurement: 1),
+        ('conference_queries_total', lambda measurement: measurement.count),
+        ('conference_repeated_queries_total',
+         lambda measurement: sum(count for _, count in measurement.repeated)),
+        ('conference_db_seconds_total',
+         lambda measurement: measurement.db_time),
+        ('conference_render_seconds_total',
+         lambda measurement: measurement.render_time),
+        ('conference_seconds_total',
+         lambda measurement: measurement.total_time),
+    ]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = defaultdict(lambda: [0] * len(self.metrics))
+
+    def record(self, measurement):
+        with self.lock:
+            totals = self.totals[measurement.name]
+            for index, (_, value) in enumerate(self.metrics):
+                totals[index] += value(measurement)
+
+    def render(self):
+        """Render the totals in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        with self.lock:
+            totals = sorted((name, list(values))
+                            for name, values in self.totals.items())
+        lines = []
+        for index, (metric, _) in enumerate(self.metrics):
+            lines.append('# TYPE {} counter'.format(metric))
+            for name, values in totals:
+                lines.append('{}{{name="{}"}} {}'.format(
+                    metric, name.replace('\\', '\\\\').replace('"', '\\"'),
+                    values[index]))
+        return '\n'.join(lines) + '\n'
+
+
+def get_sinks():
+    """Get the configured sinks, and any sinks capturing measurements for
+    :py:func:`.capture`.
+
+    :rtype: list of :py:class:`.BaseSink`
+    """
+    paths = tuple(getattr(settings, 'CONFERENCE_INSTRUMENTATION_SINKS', ()))
+    if paths not in _sinks:
+        _sinks[paths] = [import_string(path)() for path in paths]
+    return _sinks[paths] + _capturing
+
+
+def is_enabled():
+    """Whether measurements are being recorded.
+
+    :rtype: bool
+    """
+    return bool(get_sinks())
+
+
+def get_recording():
+    """Get the measurements in progress on the current thread, innermost
+    last.
+
+    :rtype: list of :py:class:`.Measurement`
+    """
+    try:
+        return _recording.measurements
+    except AttributeError:
+        _recording.measurements = []
+        return _recording.measurements
+
+
+def instrument(connection):
+    """Wrap the cursors of a database connection with
+    :py:class:`.RecordingCursorWrapper`, whether or not they are debug
+    cursors. Connections are local to each thread, so each thread's
+    connections are instrumented the first time it records.
+
+    :param connection: Database connection.
+    """
+    if getattr(connection, 'conference_instrumented', False):
+        return
+    make_cursor = connection.make_cursor
+    make_debug_cursor = connection.make_debug_cursor
+    connection.make_cursor = lambda cursor: RecordingCursorWrapper(
+        make_cursor(cursor), connection)
+    connection.make_debug_cursor = lambda cursor: RecordingCursorWrapper(
+        make_debug_cursor(cursor), connection)
+    connection.conference_instrumented = True
+
+
+@contextmanager
+def record(name):
+    """Measure the queries, on every database, made within the block, and
+    record the measurement with each sink when the block completes.
+
+    :param name: Name of the view, or method.
+    :type name: str
+    :returns: Measurement, whose :py:attr:`~.Measurement.render_time` may be
+        set within the block.
+    :rtype: :py:class:`.Measurement`
+    """
+    measurement = Measurement(name)
+    for alias in connections:
+        instrument(connections[alias])
+    recording = get_recording()
+    recording.append(measurement)
+    start = time.time()
+    try:
+        yield measurement
+    finally:
+        measurement.total_time = time.time() - start
+        recording.remove(measurement)
+    for sink in get_sinks():
+        sink.record(measurement)
+
+
+def measured(method):
+    """Decorate a queryset method so that its calls are measured, as
+    ``'<class name>.<method name>'``, while instrumentation is enabled."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not is_enabled():
+            return method(self, *args, **kwargs)
+        with record('{}.{}'.format(type(self).__name__, method.__name__)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def capture():
+    """Capture measurements made within the block, whether or not
+    instrumentation is enabled by the settings, e.g. in tests.
+
+    :returns: Measurements, appended to as they are recorded.
+    :rtype: list of :py:class:`.Measurement`
+    """
+    sink = MemorySink()
+    _capturing.append(sink)
+    try:
+        yield sink.measurements
+    finally:
+        _capturing.remove(sink)
+
+
+class InstrumentationTestMixin(object):
+    """:py:class:`~django.test.TestCase` mixin with assertions on the
+    measurements made within a block."""
+
+    @contextmanager
+    def assertMeasured(self, name, max_queries=None, repeated=False):
+        """Assert that the named view, or method, is measured within the
+        block, making at most ``max_queries`` queries, and (unless
+        ``repeated`` is ``True``) repeating none of them.
+
+        :param name: Name of the view, or method.
+        :type name: str
+        :param max_queries: Maximum number of queries for each call.
+        :type max_queries: int
+        :param repeated: Whether repeated queries are allowed.
+        :type repeated: bool
+        """
+        with capture() as measurements:
+            yield measurements
+        measurements = [measurement for measurement in measurements
+                        if measurement.name == name]
+        self.assertTrue(measurements, '{} was not measured.'.format(name))
+        for measurement in measurements:
+            if max_queries is not None:
+                self.assertLessEqual(
+                    measurement.count, max_queries,
+                    '{} made {} queries, {} expected at most:\n{}'.format(
+                        name, measurement.count, max_queries, '\n'.join(
+                            query['sql'] for query in measurement.queries)))
+            if not repeated:
+                self.assertEqual(
+                    [], measurement.repeated,
+                    '{} repeated queries.'.format(name))
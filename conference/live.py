@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Live "now and next" updates of conference schedules, pushed to
+subscribers when a time slot starts or ends, or the schedule is edited.
+
+A single :py:class:`Scheduler` per process holds the current state of each
+conference with subscribers, loading it once for all of them, and only
+again at the next time slot boundary or when the schedule changes. Changes
+made in other processes are noticed by their schedule cache version (see
+:py:mod:`conference.cache`), which is checked on every tick. The
+scheduler itself does not read the clock, or wait: it is driven by a
+:py:class:`ThreadDriver` (used by the event stream view), or by an
+:py:class:`AsyncioDriver` on an asyncio event loop.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from . import cache, routers
+from .models import TimeSlot
+from .signals import schedule_changed
+from collections import OrderedDict, namedtuple
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.dispatch import receiver
+from django.utils import timezone
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+
+logger = logging.getLogger(__name__)
+
+#: An update of a conference schedule, with an ``id`` which only changes
+#: when the ``data`` (JSON) does.
+Event = namedtuple('Event', ['id', 'data'])
+
+_lock = threading.Lock()
+
+_schedulers = {}
+
+
+def serialize_timeslot(timeslot):
+    if timeslot is not None:
+        return OrderedDict([
+            ('id', timeslot.pk),
+            ('name', timeslot.name),
+            ('start_at', timeslot.start_at),
+            ('end_at', timeslot.end_at),
+        ])
+
+
+def load_event(conference_pk, at):
+    """Load the current, next and next+1 time slots of a conference, in a
+    single query.
+
+    :param conference_pk: Conference primary key.
+    :param at: Reference time.
+    :type at: :py:class:`~datetime.datetime`
+    :returns: Event, and the time it may next change (or ``None``).
+    :rtype: tuple
+    """
+    # Read from the primary database, as the event is kept until the
+    # conference's schedule version changes again.
+    with routers.pinned():
+        now_next_later = TimeSlot.objects.filter(
+            conference_id=conference_pk).now_next_later(at)
+    data = json.dumps(OrderedDict([
+        ('now', [serialize_timeslot(timeslot)
+                 for timeslot in now_next_later.current]),
+        ('next', serialize_timeslot(now_next_later.next)),
+        ('later', serialize_timeslot(now_next_later.later)),
+    ]), cls=DjangoJSONEncoder)
+    # Current time slots end, and the next one starts, after the reference
+    # time; no other time slot starts or ends before them.
+    boundaries = [timeslot.end_at for timeslot in now_next_later.current]
+    if now_next_later.next is not None:
+        boundaries.append(now_next_later.next.start_at)
+    event = Event(hashlib.md5(data.encode('utf-8')).hexdigest(), data)
+    return event, min(boundaries) if boundaries else None
+
+
+class Channel(object):
+
+    def __init__(self):
+        self.boundary = None
+        self.event = None
+        self.stale = True
+        self.subscribers = []
+        self.version = None
+
+
+class Subscription(object):
+    """A subscription to the events of a conference, returned by
+    :py:meth:`Scheduler.subscribe`."""
+
+    def __init__(self, scheduler, conference_pk, callback):
+        self.scheduler = scheduler
+        self.conference_pk = conference_pk
+        self.callback = callback
+
+    def cancel(self):
+        """Stop receiving events."""
+        self.scheduler.unsubscribe(self)
+
+
+class Scheduler(object):
+    """Publisher of conference schedule events to subscribers, loading each
+    conference once for all of its subscribers.
+
+    The scheduler is clock-agnostic: :py:meth:`tick` is called with the
+    current time, when :py:attr:`wakeup` is called or the time it last
+    returned has passed.
+
+    :param loader: Function loading the event of a conference at a given
+        time, and the time it may next change, e.g. :py:func:`.load_event`.
+    :type loader: callable
+    :param get_version: Function getting the schedule version of a
+        conference, which changes whenever its schedule is edited, in any
+        process.
+    :type get_version: callable
+
+    """
+
+    #: Time after which loading a conference which failed is retried, in
+    #: seconds.
+    retry_wait = 5
+
+    #: Called (from any thread) when :py:meth:`tick` should be called
+    #: sooner than it last requested, set by the driver.
+    wakeup = None
+
+    def __init__(self, loader=load_event, get_version=cache.get_version):
+        self.channels = {}
+        self.get_version = get_version
+        self.loader = loader
+        self.lock = threading.Lock()
+
+    def invalidate(self, conference_pks):
+        """Reload the events of the given conferences on the next tick, e.g.
+        after their schedule changed.
+
+        :param conference_pks: Conference primary keys.
+        :type conference_pks: iterable
+        """
+        with self.lock:
+            channels = [self.channels[pk] for pk in conference_pks
+                        if pk in self.channels]
+            for channel in channels:
+                channel.stale = True
+        if channels:
+            self.notify()
+
+    def notify(self):
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def publish(self, channel, event):
+        with self.lock:
+            if event == channel.event:
+                return
+            channel.event = event
+            subscribers = list(channel.subscribers)
+        for subscription in subscribers:
+            subscription.callback(event)
+
+    def subscribe(self, conference_pk, callback):
+        """Subscribe to the events of a conference. The current event, if
+        already loaded, is published to the new subscriber immediately.
+
+        :param conference_pk: Conference primary key.
+        :param callback: Called with each :py:class:`.Event`, from the
+            driver's thread.
+        :type callback: callable
+        :rtype: :py:class:`.Subscription`
+        """
+        subscription = Subscription(self, conference_pk, callback)
+        with self.lock:
+            channel = self.channels.get(conference_pk)
+            if channel is None:
+                channel = self.channels[conference_pk] = Channel()
+            channel.subscribers.append(subscription)
+            event = channel.event
+        if event is not None:
+            callback(event)
+        else:
+            self.notify()
+        return subscription
+
+    def subscriber_count(self):
+        """Get the number of subscribers, to all conferences.
+
+        :rtype: int
+        """
+        with self.lock:
+            return sum(len(channel.subscribers)
+                       for channel in self.channels.values())
+
+    def tick(self, at):
+        """Reload, and publish, the events of the conferences which were
+        invalidated, whose schedule version changed, or whose next boundary
+        has passed. A conference which fails to load is retried after
+        :py:attr:`retry_wait` seconds.
+
+        :param at: Current time.
+        :type at: :py:class:`~datetime.datetime`
+        :returns: Time the next tick is due (or ``None``).
+        :rtype: :py:class:`~datetime.datetime`
+        """
+        with self.lock:
+            conference_pks = list(self.channels)
+        versions = dict((pk, self.get_version(pk)) for pk in conference_pks)
+        with self.lock:
+            due = [(pk, channel) for pk, channel in self.channels.items()
+                   if channel.stale or
+                   (pk in versions and channel.version != versions[pk]) or
+                   (channel.boundary is not None and channel.boundary <= at)]
+            # Invalidations while loading mark the channel stale again.
+            for pk, channel in due:
+                channel.stale = False
+        for pk, channel in due:
+            version = (versions[pk] if pk in versions
+                       else self.get_version(pk))
+            try:
+                event, boundary = self.loader(pk, at)
+            except Exception:
+                logger.exception('Could not load the live schedule of '
+                                 'conference %s.', pk)
+                channel.boundary = at + datetime.timedelta(
+                    seconds=self.retry_wait)
+                continue
+            channel.boundary = boundary
+            channel.version = version
+            self.publish(channel, event)
+        with self.lock:
+            boundaries = [channel.boundary
+                          for channel in self.channels.values()
+                          if channel.boundary is not None]
+            if any(channel.stale for channel in self.channels.values()):
+                return at
+        return min(boundaries) if boundaries else None
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            channel = self.channels.get(subscription.conference_pk)
+            if channel is None or subscription not in channel.subscribers:
+                return
+            channel.subscribers.remove(subscription)
+            if not channel.subscribers:
+                del self.channels[subscription.conference_pk]
+
+
+class ThreadDriver(object):
+    """Drive a scheduler from a daemon thread, waiting until the next tick
+    is due or the scheduler is woken up.
+
+    :param scheduler: Scheduler.
+    :type scheduler: :py:class:`.Scheduler`
+    :param clock: Function returning the current time.
+    :type clock: callable
+
+    """
+
+    #: Longest time to wait between ticks, in seconds.
+    max_wait = 60
+
+    #: Time to wait after a tick failed, in seconds.
+    retry_wait = 5
+
+    def __init__(self, scheduler, clock=timezone.now):
+        self.clock = clock
+        self.scheduler = scheduler
+        self.scheduler.wakeup = self.wake
+        self.stopped = False
+        self.thread = None
+        self.woken = threading.Event()
+
+    def run(self):
+        while not self.stopped:
+            self.woken.clear()
+            wait = self.max_wait
+            try:
+                close_old_connections()
+                due = self.scheduler.tick(self.clock())
+            except Exception:
+                logger.exception('Could not update live schedules.')
+                wait = self.retry_wait
+            else:
+                if due is not None:
+                    wait = min(wait, max(
+                        (due - self.clock()).total_seconds(), 0))
+            self.woken.wait(wait)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run,
+                                       name='conference-live')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        self.wake()
+        if self.thread is not None:
+            self.thread.join()
+
+    def wake(self):
+        self.woken.set()
+
+
+class AsyncioDriver(object):
+    """Drive a scheduler from an asyncio event loop, running each tick
+    (which may query the database) in the loop's default executor.
+
+    :param scheduler: Scheduler.
+    :type scheduler: :py:class:`.Scheduler`
+    :param loop: Event loop (default: the current event loop).
+    :param clock: Function returning the current time.
+    :type clock: callable
+    :raises: :py:class:`RuntimeError` if asyncio is not available.
+
+    """
+
+    #: Longest time to wait between ticks, in seconds.
+    max_wait = 60
+
+    #: Time to wait after a tick failed, in seconds.
+    retry_wait = 5
+
+    def __init__(self, scheduler, loop=None, clock=timezone.now):
+        if asyncio is None:
+            raise RuntimeError('asyncio is not available.')
+        self.clock = clock
+        self.handle = None
+        self.loop = loop or asyncio.get_event_loop()
+        self.pending = None
+        self.scheduler = scheduler
+        self.scheduler.wakeup = self.wake
+        self.woken = False
+
+    def done(self, future):
+        self.pending = None
+        wait = self.max_wait
+        try:
+            due = future.result()
+        except Exception:
+            logger.exception('Could not update live schedules.')
+            wait = self.retry_wait
+        else:
+            if self.woken:
+                wait = 0
+            elif due is not None:
+                wait = min(wait, max((due - self.clock()).total_seconds(), 0))
+        self.schedule(wait)
+
+    def run(self):
+        self.handle = None
+        self.woken = False
+        self.pending = self.loop.run_in_executor(None, self.scheduler.tick,
+                                                 self.clock())
+        self.pending.add_done_callback(self.done)
+
+    def schedule(self, wait):
+        if self.handle is not None:
+            self.handle.cancel()
+        self.handle = self.loop.call_later(wait, self.run)
+
+    def start(self):
+        self.schedule(0)
+
+    def stop(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def subscribe(self, conference_pk):
+        """Subscribe to the events of a conference, delivered to a queue on
+        the event loop.
+
+        :returns: Queue of events, and the subscription.
+        :rtype: tuple
+        """
+        events = asyncio.Queue(loop=self.loop)
+        callback = functools.partial(self.loop.call_soon_threadsafe,
+                                     events.put_nowait)
+        return events, self.scheduler.subscribe(conference_pk, callback)
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.wake_soon)
+
+    def wake_soon(self):
+        if self.pending is not None:
+            # Tick again as soon as the running tick is done.
+            self.woken = True
+        else:
+            self.schedule(0)
+
+
+def get_scheduler():
+    """Get the scheduler shared by the views of this process, driven by a
+    :py:class:`.ThreadDriver` started the first time.
+
+    :rtype: :py:class:`.Scheduler`
+    """
+    pid = os.getpid()
+    with _lock:
+        # A forked process does not inherit the driver's thread.
+        if pid not in _schedulers:
+            scheduler = Scheduler()
+            ThreadDriver(scheduler).start()
+            _schedulers[pid] = scheduler
+        return _schedulers[pid]
+
+
+@receiver(schedule_changed)
+def invalidate(sender, conferences, **kwargs):
+    scheduler = _schedulers.get(os.getpid())
+    if scheduler is not None:
+        # The scheduler loads events with its own database connection.
+        cache.on_commit(functools.partial(scheduler.invalidate, conferences))
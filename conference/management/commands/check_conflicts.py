@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ...conflicts import FIELDS
+from ...models import TimeSlot
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+
+    help = ('Report time slots which share a resource, or a presenter, at '
+            'overlapping times.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', metavar='slug', nargs='*',
+                            help='Conference to check (default: all).')
+        parser.add_argument('--field', dest='fields', action='append',
+                            choices=FIELDS,
+                            help='Related field to check (default: all).')
+
+    def handle(self, *args, **options):
+        timeslots = TimeSlot.objects.all()
+        if options['slugs']:
+            timeslots = timeslots.filter(conference__slug__in=options['slugs'])
+        conflicts = timeslots.conflicts(fields=options['fields'])
+        if not conflicts:
+            self.stdout.write('No conflicts found.')
+            return
+        subquery = timeslots.values_subquery('pk')
+        names = dict(timeslots.values_list('pk', 'name'))
+        related = {}
+        for field in options['fields'] or FIELDS:
+            model = TimeSlot._meta.get_field(field).related_model
+            related[field] = dict(model.objects.filter(
+                timeslots__in=subquery).distinct().values_list('pk', 'name'))
+        for conflict in conflicts:
+            self.stdout.write('{}: "{}" overlaps "{}" ({}).'.format(
+                related[conflict.field][conflict.object_id],
+                names[conflict.first], names[conflict.second],
+                conflict.field))
+        raise CommandError('{} conflicts found.'.format(len(conflicts)))
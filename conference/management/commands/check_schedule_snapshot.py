@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ... import snapshot
+from ...models import Conference
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+
+    help = ('Verify the schedule snapshot against the time slots, presenters, '
+            'resources and venues it is built from.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', metavar='slug', nargs='*',
+                            help='Conference to check (default: all).')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Rebuild the entries which differ.')
+
+    def handle(self, *args, **options):
+        conferences = None
+        if options['slugs']:
+            conferences = list(Conference.objects.filter(
+                slug__in=options['slugs']).values_list('pk', flat=True))
+        problems = snapshot.check(conferences)
+        if not problems:
+            self.stdout.write('The schedule snapshot is consistent.')
+            return
+        for problem, pk in problems:
+            self.stdout.write('{}: {}'.format(problem.capitalize(), pk))
+        if not options['rebuild']:
+            raise CommandError('{} schedule entries differ.'.format(
+                len(problems)))
+        snapshot.rebuild(timeslots=[pk for problem, pk in problems])
+        self.stdout.write('Rebuilt {} schedule entries.'.format(
+            len(problems)))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ...export import ExportError, StaticExporter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+
+class Command(BaseCommand):
+
+    help = ('Export the conference list, and the schedule page, JSON and '
+            'iCalendar feed of each conference, to static files.')
+
+    # The pages are rendered in the default language.
+    leave_locale_alone = True
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Directory to export to.')
+        parser.add_argument('--host', default=self.get_default_host(),
+                            help='Host name the pages are rendered for '
+                                 '(default: from ALLOWED_HOSTS).')
+        parser.add_argument('--processes', type=int,
+                            help='Number of rendering processes (default: '
+                                 'the number of CPUs).')
+        parser.add_argument('--force', action='store_true',
+                            help='Export every conference, even if '
+                                 'unchanged.')
+
+    def get_default_host(self):
+        for host in settings.ALLOWED_HOSTS:
+            host = host.lstrip('.')
+            if host and host != '*':
+                return host
+        return 'localhost'
+
+    def handle(self, *args, **options):
+        if options['processes'] is not None and options['processes'] < 1:
+            raise CommandError('--processes must be at least 1.')
+        exporter = StaticExporter(options['output_dir'],
+                                  host=options['host'],
+                                  processes=options['processes'])
+        started = time.time()
+        try:
+            result = exporter.export(force=options['force'])
+        except (ExportError, IOError, OSError) as e:
+            raise CommandError('Could not export: {}'.format(e))
+        self.stdout.write(
+            'Exported {} conferences ({} unchanged, {} removed) to "{}" in '
+            '{:.2f}s.'.format(len(result['exported']),
+                              len(result['unchanged']),
+                              len(result['removed']), options['output_dir'],
+                              time.time() - started))
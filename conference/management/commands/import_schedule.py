@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ...importer import ScheduleImporter, read_csv, read_json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+import os
+import time
+
+
+class Command(BaseCommand):
+
+    help = 'Import conference schedules from JSON or CSV files.'
+
+    readers = {
+        'csv': read_csv,
+        'json': read_json,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', metavar='path', nargs='+',
+                            help='JSON or CSV file to import.')
+        parser.add_argument('--format', choices=sorted(self.readers),
+                            help='File format (default: from the file '
+                                 'extension).')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per query (default: 500).')
+
+    def handle(self, *args, **options):
+        importer = ScheduleImporter(batch_size=options['batch_size'])
+        # All files are imported, or none are.
+        with transaction.atomic():
+            for path in options['paths']:
+                self.import_path(importer, path, options['format'])
+
+    def import_path(self, importer, path, file_format=None):
+        file_format = (file_format or
+                       os.path.splitext(path)[1].lstrip('.').lower())
+        if file_format not in self.readers:
+            raise CommandError(
+                'Unknown format for "{}", use --format.'.format(path))
+        started = time.time()
+        try:
+            data = self.readers[file_format](path)
+            created = importer.import_data(data)
+        except (IOError, ValueError) as e:
+            raise CommandError('Could not import "{}": {}'.format(path, e))
+        elapsed = max(time.time() - started, 1e-6)
+        rows = len(data.get('timeslots', []))
+        self.stdout.write('Imported {} time slots from "{}" in {:.2f}s '
+                          '({:.0f} rows/s).'.format(rows, path, elapsed,
+                                                    rows / elapsed))
+        for name, count in sorted(created.items()):
+            self.stdout.write('  Created {}: {}'.format(name, count))
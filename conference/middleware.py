@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from . import routers
+import time
+
+try:
+    from django.utils.deprecation import MiddlewareMixin
+except ImportError:  # Django < 1.10
+    MiddlewareMixin = object
+
+
+class ReadYourWritesMiddleware(MiddlewareMixin):
+    """Pin a client's reads to the primary database for a while after any of
+    its requests writes, so it sees its own changes despite replication lag
+    (see :py:mod:`conference.routers`).
+
+    The pinning time is kept in a cookie rather than the session, so that
+    reading it does not make responses vary by cookie.
+
+    """
+
+    #: Name of the cookie holding the time until which reads are pinned.
+    cookie_name = 'conference_pinned_until'
+
+    def process_request(self, request):
+        routers.reset()
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        if pinned_until > time.time():
+            routers.pin()
+
+    def process_response(self, request, response):
+        if routers.has_written():
+            timeout = routers.get_pinning_timeout()
+            response.set_cookie(self.cookie_name,
+                                '{:.3f}'.format(time.time() + timeout),
+                                max_age=timeout, httponly=True)
+        routers.reset()
+        return response
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 19:39
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conference', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='conference',
+            options={'ordering': ['start_date', 'id']},
+        ),
+        migrations.AlterIndexTogether(
+            name='conference',
+            index_together=set([('start_date', 'id')]),
+        ),
+    ]
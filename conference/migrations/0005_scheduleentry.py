@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 19:59
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conference', '0004_conference_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleEntry',
+            fields=[
+                ('timeslot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule_entry', serialize=False, to='conference.TimeSlot')),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, default='')),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('video', models.URLField(blank=True, default='')),
+                ('updated_at', models.DateTimeField()),
+                ('presenters_data', models.TextField(default='[]')),
+                ('resources_data', models.TextField(default='[]')),
+                ('conference', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_entries', to='conference.Conference')),
+            ],
+            options={
+                'verbose_name_plural': 'schedule entries',
+                'ordering': ['start_at'],
+                'default_related_name': 'schedule_entries',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='scheduleentry',
+            index_together=set([('conference', 'start_at')]),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 20:12
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def is_fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in [row[0] for row in cursor.fetchall()]
+
+
+def create_search_index(apps, schema_editor):
+    if is_fts5_available(schema_editor.connection):
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE conference_search USING fts5('
+            'timeslot_id UNINDEXED, conference_id UNINDEXED, name, '
+            'presenters, description, biographies)')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS conference_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conference', '0005_scheduleentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
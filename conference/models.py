@@ -17,12 +17,43 @@
 
 from __future__ import absolute_import, unicode_literals
 from . import querysets
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
+import json
 import uuid
 
 
+@python_2_unicode_compatible
+class Bookmark(models.Model):
+    """A time slot starred by a user, or by an anonymous visitor, for their
+    personal agenda.
+    """
+
+    id = models.UUIDField('ID', primary_key=True, default=uuid.uuid4,
+                          editable=False)
+
+    timeslot = models.ForeignKey('conference.TimeSlot',
+                                 on_delete=models.CASCADE)
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True,
+                             on_delete=models.CASCADE)
+
+    # Anonymous visitors are identified by a key stored in their session,
+    # which (unlike the session key) is kept when they log in.
+    session_key = models.CharField(max_length=40, blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(object):
+        default_related_name = 'bookmarks'
+        unique_together = [['user', 'timeslot'], ['session_key', 'timeslot']]
+
+    def __str__(self):
+        return self.timeslot.name
+
+
 @python_2_unicode_compatible
 class Conference(models.Model):
 
@@ -41,9 +72,12 @@ class Conference(models.Model):
 
     venues = models.ManyToManyField('conference.Venue', blank=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta(object):
         default_related_name = 'conferences'
-        ordering = ['start_date']
+        index_together = [['start_date', 'id']]
+        ordering = ['start_date', 'id']
 
     def __str__(self):
         return self.name
@@ -106,6 +140,63 @@ class Resource(models.Model):
         return self.name
 
 
+@python_2_unicode_compatible
+class ScheduleEntry(models.Model):
+    """A denormalized, display-ready copy of a time slot, together with the
+    names of its presenters and resources, maintained when the
+    ``CONFERENCE_SCHEDULE_SNAPSHOT`` setting is enabled.
+
+    """
+
+    timeslot = models.OneToOneField('conference.TimeSlot', primary_key=True,
+                                    on_delete=models.CASCADE,
+                                    related_name='schedule_entry')
+
+    conference = models.ForeignKey('conference.Conference',
+                                   on_delete=models.CASCADE)
+
+    name = models.CharField(max_length=200)
+
+    description = models.TextField(blank=True, default='')
+
+    start_at = models.DateTimeField()
+
+    end_at = models.DateTimeField()
+
+    video = models.URLField(blank=True, default='')
+
+    updated_at = models.DateTimeField()
+
+    presenters_data = models.TextField(default='[]')
+
+    resources_data = models.TextField(default='[]')
+
+    class Meta(object):
+        default_related_name = 'schedule_entries'
+        index_together = [['conference', 'start_at']]
+        ordering = ['start_at']
+        verbose_name_plural = 'schedule entries'
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def presenter_names(self):
+        """Names of the presenters, ordered by name.
+
+        :rtype: list
+        """
+        return json.loads(self.presenters_data)
+
+    @property
+    def resource_names(self):
+        """Names of the resources, ordered by name.
+
+        :rtype: list
+        """
+        return [name for name, venue in json.loads(self.resources_data)]
+
+
 @python_2_unicode_compatible
 class TimeSlot(models.Model):
     """A timeslot, typically representing a session/presentation at the
@@ -136,15 +227,38 @@ class TimeSlot(models.Model):
     slides = models.FileField(max_length=250, upload_to='slides', blank=True,
                               null=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    #: Number of bookmarks, maintained as they are added and removed.
+    bookmark_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = querysets.TimeSlotQuerySet.as_manager()
 
     class Meta(object):
         default_related_name = 'timeslots'
+        index_together = [['conference', 'start_at'],
+                          ['conference', 'end_at']]
         ordering = ['start_at']
 
     def __str__(self):
         return self.name
 
+    @property
+    def presenter_names(self):
+        """Names of the presenters, ordered by name.
+
+        :rtype: list
+        """
+        return [presenter.name for presenter in self.presenters.all()]
+
+    @property
+    def resource_names(self):
+        """Names of the resources, ordered by name.
+
+        :rtype: list
+        """
+        return [resource.name for resource in self.resources.all()]
+
 
 @python_2_unicode_compatible
 class Venue(models.Model):
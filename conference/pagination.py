@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+import base64
+import binascii
+
+
+def estimate_count(queryset):
+    """Estimate the number of rows in the table of an unfiltered queryset,
+    from the database's statistics, without counting them.
+
+    Statistics are kept by PostgreSQL and MySQL, and by SQLite once
+    ``ANALYZE`` has been run.
+
+    :param queryset: Queryset.
+    :type queryset: :py:class:`~django.db.models.query.QuerySet`
+    :returns: Estimated count, or ``None`` if the queryset is filtered, or no
+        estimate is available.
+    :rtype: int
+    """
+    query = queryset.query
+    if (query.where or query.distinct or query.low_mark or
+            query.high_mark is not None):
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s',
+                           [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                           "AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT MAX(CAST(stat AS INTEGER)) FROM '
+                           'sqlite_stat1 WHERE tbl = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class KeysetPage(object):
+    """A page of objects from a :py:class:`.KeysetPaginator`.
+
+    :param object_list: Objects on the page.
+    :type object_list: list
+    :param cursor: Cursor the page was requested with, or ``None`` for the
+        first page.
+    :type cursor: str
+    :param next_cursor: Cursor for the next page, or ``None`` if this is the
+        last page.
+    :type next_cursor: str
+
+    """
+
+    def __init__(self, object_list, cursor, next_cursor):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator(object):
+    """Paginator seeking to each page using the ordering ``(field, pk)``,
+    rather than an offset, so that the cost of fetching a page does not grow
+    with its depth.
+
+    Objects with a ``NULL`` value for the (nullable) field come first, on
+    all databases.
+
+    :param queryset: Queryset to paginate.
+    :type queryset: :py:class:`~django.db.models.query.QuerySet`
+    :param per_page: Maximum number of objects on each page.
+    :type per_page: int
+    :param field: Name of the field to order by, before the primary key.
+    :type field: str
+
+    """
+
+    def __init__(self, queryset, per_page, field):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.field = field
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field)
+        value = '' if value is None else value.isoformat()
+        cursor = '{}|{}'.format(value, obj.pk).encode('utf-8')
+        return base64.urlsafe_b64encode(cursor).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            cursor = base64.urlsafe_b64decode(
+                (cursor + '=' * (-len(cursor) % 4)).encode('ascii'))
+            value, pk = cursor.decode('utf-8').split('|')
+            if not pk:
+                raise ValueError('Missing primary key.')
+            field = self.queryset.model._meta.get_field(self.field)
+            value = field.to_python(value) if value else None
+            pk = self.queryset.model._meta.pk.to_python(pk)
+        except (binascii.Error, TypeError, UnicodeError, ValidationError,
+                ValueError):
+            raise InvalidPage('Invalid cursor.')
+        return value, pk
+
+    def page(self, cursor=None):
+        """Get the page of objects following the given cursor.
+
+        :param cursor: Cursor of the previous page's last object, or
+            ``None`` for the first page.
+        :type cursor: str
+        :returns: Page.
+        :rtype: :py:class:`.KeysetPage`
+        :raises: :py:class:`~django.core.paginator.InvalidPage` if the cursor
+            is invalid.
+        """
+        limit = self.per_page + 1
+        isnull = '{}__isnull'.format(self.field)
+        object_list = []
+        if cursor is None:
+            value, pk = None, None
+        else:
+            value, pk = self.decode_cursor(cursor)
+        if cursor is None or value is None:
+            queryset = self.queryset.filter(**{isnull: True})
+            if pk is not None:
+                queryset = queryset.filter(pk__gt=pk)
+            object_list.extend(queryset.order_by('pk')[:limit])
+        if len(object_list) < limit:
+            queryset = self.queryset.filter(**{isnull: False})
+            if value is not None:
+                queryset = queryset.filter(
+                    Q(**{'{}__gt'.format(self.field): value}) |
+                    Q(**{self.field: value, 'pk__gt': pk}))
+            object_list.extend(queryset.order_by(self.field, 'pk')[
+                :limit - len(object_list)])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return KeysetPage(object_list, cursor, next_cursor)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the database's estimate of the number of rows for
+    unfiltered querysets of large tables, rather than counting every row.
+
+    Estimates can be out of date, so the last page may be empty, or (if
+    more rows have been added since) some rows may not be reachable by page
+    number.
+
+    """
+
+    #: Estimated counts below which rows are counted exactly.
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= self.threshold:
+            return estimate
+        return super(EstimatedCountPaginator, self).count
@@ -16,41 +16,131 @@
 
 
 from __future__ import absolute_import, unicode_literals
-from django.db import models
+from .conflicts import find_conflicts
+from .instrumentation import measured
+from .routers import get_primary
+from collections import namedtuple
+from django.db import connections, models
 from django.utils import timezone
 
 
+NowNextLater = namedtuple('NowNextLater', ['current', 'next', 'later'])
+
+
+def split_now_next_later(timeslots, at):
+    """Split time slots into those happening at, and the next two starting
+    after, the given time.
+
+    :param timeslots: Time slots, ordered by start time.
+    :type timeslots: iterable
+    :param at: Reference time.
+    :type at: :py:class:`~datetime.datetime`
+    :returns: Current time slots, and the next and next+1 future time slots.
+    :rtype: :py:class:`.NowNextLater`
+    """
+    current, future = [], []
+    for timeslot in timeslots:
+        if timeslot.start_at > at:
+            future.append(timeslot)
+            if len(future) == 2:
+                break
+        elif timeslot.end_at > at:
+            current.append(timeslot)
+    future.extend([None, None])
+    return NowNextLater(current, future[0], future[1])
+
+
+def get_next_boundary(timeslots, at):
+    """Get the first time after the given time at which a time slot starts or
+    ends.
+
+    :param timeslots: Time slots.
+    :type timeslots: iterable
+    :param at: Reference time.
+    :type at: :py:class:`~datetime.datetime`
+    :returns: Boundary time, or ``None`` if no time slots end after the
+        reference time.
+    :rtype: :py:class:`~datetime.datetime`
+    """
+    boundaries = [boundary for timeslot in timeslots
+                  for boundary in [timeslot.start_at, timeslot.end_at]
+                  if boundary > at]
+    return min(boundaries) if boundaries else None
+
+
 class TimeSlotQuerySet(models.query.QuerySet):
     """Customised :py:class:`~django.db.models.db.query.QuerySet` for
     :py:class:`~conference.models.TimeSlot` model."""
 
-    def past(self):
+    def past(self, at=None):
         """Filter for time slots in the past.
 
+        :param at: Reference time, defaults to the current time.
+        :type at: :py:class:`~datetime.datetime`
         :returns: Filtered queryset.
         :rtype: :py:class:`.TimeSlotQuerySet`
         """
-        now = timezone.now()
+        now = at or timezone.now()
         return self.filter(end_at__lte=now)
 
-    def current(self):
+    def current(self, at=None):
         """Filter for time slots happening now.
 
+        :param at: Reference time, defaults to the current time.
+        :type at: :py:class:`~datetime.datetime`
         :returns: Filtered queryset.
         :rtype: :py:class:`.TimeSlotQuerySet`
         """
-        now = timezone.now()
+        now = at or timezone.now()
         return self.filter(start_at__lte=now, end_at__gt=now)
 
-    def future(self):
+    def future(self, at=None):
         """Filter for future time slots.
 
+        :param at: Reference time, defaults to the current time.
+        :type at: :py:class:`~datetime.datetime`
         :returns: Filtered queryset.
         :rtype: :py:class:`.TimeSlotQuerySet`
         """
-        now = timezone.now()
+        now = at or timezone.now()
         return self.filter(start_at__gt=now)
 
+    def overlapping(self, start_at, end_at):
+        """Filter for time slots overlapping a time range.
+
+        :param start_at: Start of the time range.
+        :type start_at: :py:class:`~datetime.datetime`
+        :param end_at: End of the time range.
+        :type end_at: :py:class:`~datetime.datetime`
+        :returns: Filtered queryset.
+        :rtype: :py:class:`.TimeSlotQuerySet`
+        """
+        return self.filter(start_at__lt=end_at, end_at__gt=start_at)
+
+    def values_subquery(self, *fields):
+        """Get the values of the given fields, for use as a subquery (e.g.
+        with an ``__in`` lookup).
+
+        :returns: Values queryset.
+        :rtype: :py:class:`~django.db.models.query.QuerySet`
+        """
+        queryset = self.values(*fields)
+        # Django treats an object with a next() method as an iterator on
+        # Python 2, and would evaluate it, so a plain queryset is returned.
+        return models.QuerySet(self.model, query=queryset.query,
+                               using=self.db)
+
+    def primary(self):
+        """Read from the primary database, rather than a replica (see
+        :py:mod:`conference.routers`), e.g. to read writes made by another
+        thread.
+
+        :returns: Queryset.
+        :rtype: :py:class:`.TimeSlotQuerySet`
+        """
+        return self.using(get_primary())
+
+    @measured
     def now(self):
         """Filter for the next future time slot.
 
@@ -59,6 +149,7 @@ class TimeSlotQuerySet(models.query.QuerySet):
         """
         return self.current().first()
 
+    @measured
     def next(self):
         """Filter for the next future time slot.
 
@@ -67,12 +158,82 @@ class TimeSlotQuerySet(models.query.QuerySet):
         """
         return self.future().first()
 
+    @measured
     def later(self):
         """Filter for the next+1 future time slot.
 
         :returns: Time slot instance.
         :rtype: :py:class:`~conference.models.TimeSlot`
         """
-        queryset = self.future()[1:2]
-        if queryset:
-            return queryset[0]
+        timeslots = list(self.future()[1:2])
+        if timeslots:
+            return timeslots[0]
+
+    @measured
+    def now_next_later(self, at=None):
+        """Get the current, next and next+1 future time slots for a single
+        reference time.
+
+        When the queryset has already been evaluated (e.g. as a prefetched
+        relation) the result is computed from the cached time slots without
+        querying the database. Otherwise a single query is made, limited to
+        the current time slots and the next two future time slots on
+        databases supporting sliced subqueries.
+
+        :param at: Reference time, defaults to the current time.
+        :type at: :py:class:`~datetime.datetime`
+        :returns: Current time slots, and the next and next+1 future time
+            slots.
+        :rtype: :py:class:`.NowNextLater`
+        """
+        at = at or timezone.now()
+        if self._result_cache is not None:
+            timeslots = sorted(self._result_cache, key=lambda t: t.start_at)
+            return split_now_next_later(timeslots, at)
+        queryset = self.filter(end_at__gt=at)
+        if connections[self.db].features.allow_sliced_subqueries:
+            upcoming = self.future(at).order_by('start_at')[:2]
+            queryset = queryset.filter(
+                models.Q(start_at__lte=at) |
+                models.Q(pk__in=upcoming.values_subquery('pk')))
+        return split_now_next_later(queryset.order_by('start_at'), at)
+
+    @measured
+    def next_boundary(self, at=None):
+        """Get the first time after the reference time at which a time slot
+        starts or ends, i.e. when the result of :py:meth:`.now_next_later`
+        may next change.
+
+        When the queryset has already been evaluated the result is computed
+        from the cached time slots without querying the database.
+
+        :param at: Reference time, defaults to the current time.
+        :type at: :py:class:`~datetime.datetime`
+        :returns: Boundary time, or ``None`` if no time slots end after the
+            reference time.
+        :rtype: :py:class:`~datetime.datetime`
+        """
+        at = at or timezone.now()
+        if self._result_cache is not None:
+            return get_next_boundary(self._result_cache, at)
+        start_at = models.Case(
+            models.When(start_at__gt=at, then=models.F('start_at')),
+            output_field=models.DateTimeField())
+        boundaries = self.filter(end_at__gt=at).aggregate(
+            start_at=models.Min(start_at), end_at=models.Min('end_at'))
+        boundaries = [boundary for boundary in boundaries.values()
+                      if boundary is not None]
+        return min(boundaries) if boundaries else None
+
+    @measured
+    def conflicts(self, fields=None):
+        """Find time slots which share a resource, or a presenter, at
+        overlapping times.
+
+        :param fields: Related field names, defaults to
+            :py:data:`conference.conflicts.FIELDS`.
+        :type fields: list
+        :returns: Conflicts, ordered by related field, object and start time.
+        :rtype: list of :py:class:`~conference.conflicts.Conflict`
+        """
+        return list(find_conflicts(self, fields=fields))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lightweight, read-only records of time slots, with their presenters and
+resources, for rendering and serializing schedules.
+
+Records are loaded with :py:meth:`~django.db.models.query.QuerySet.values_list`
+in three queries, regardless of the number of time slots, and hold only the
+fields which are displayed: time slots use ``__slots__`` rather than a
+per-instance dict, and each presenter, resource and venue is a single
+named tuple shared by all of its time slots. Records pickle compactly, for
+the schedule cache.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .models import TimeSlot
+from collections import defaultdict, namedtuple
+from django.utils.encoding import python_2_unicode_compatible
+
+
+PresenterRecord = namedtuple('PresenterRecord', ['id', 'name'])
+
+ResourceRecord = namedtuple('ResourceRecord', ['id', 'name', 'venue'])
+
+VenueRecord = namedtuple('VenueRecord', ['id', 'name'])
+
+#: Fields of each related object path (as used by
+#: :py:class:`~conference.serializers.TimeSlotSerializer`) held by records.
+FIELDS = {
+    '': ['id', 'name', 'description', 'start_at', 'end_at', 'video',
+         'updated_at'],
+    'presenters': ['id', 'name'],
+    'resources': ['id', 'name'],
+    'resources.venue': ['id', 'name'],
+}
+
+
+@python_2_unicode_compatible
+class TimeSlotRecord(object):
+    """A time slot, with its presenters and resources ordered by name."""
+
+    __slots__ = ['id', 'conference_id', 'name', 'description', 'start_at',
+                 'end_at', 'video', 'updated_at', 'bookmark_count',
+                 'presenters', 'resources']
+
+    def __init__(self, id, conference_id, name, description, start_at,
+                 end_at, video, updated_at, bookmark_count, presenters=(),
+                 resources=()):
+        self.id = id
+        self.conference_id = conference_id
+        self.name = name
+        self.description = description
+        self.start_at = start_at
+        self.end_at = end_at
+        self.video = video
+        self.updated_at = updated_at
+        self.bookmark_count = bookmark_count
+        self.presenters = presenters
+        self.resources = resources
+
+    def __eq__(self, other):
+        return isinstance(other, TimeSlotRecord) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __reduce__(self):
+        return (TimeSlotRecord, tuple(getattr(self, name)
+                                      for name in self.__slots__))
+
+    def __repr__(self):
+        return '<TimeSlotRecord: {}>'.format(self)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def presenter_names(self):
+        """Names of the presenters, ordered by name.
+
+        :rtype: list
+        """
+        return [presenter.name for presenter in self.presenters]
+
+    @property
+    def resource_names(self):
+        """Names of the resources, ordered by name.
+
+        :rtype: list
+        """
+        return [resource.name for resource in self.resources]
+
+
+def load_records(queryset):
+    """Load records of time slots, in their queryset's order, in three
+    queries.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :rtype: list
+    """
+    rows = list(queryset.values_list(
+        'pk', 'conference_id', 'name', 'description', 'start_at', 'end_at',
+        'video', 'updated_at', 'bookmark_count'))
+    if not rows:
+        return []
+    timeslots = queryset.values_subquery('pk')
+    presenters, presenter_records = defaultdict(list), {}
+    for pk, presenter_pk, name in TimeSlot.presenters.through.objects.filter(
+            timeslot__in=timeslots).order_by('presenter__name').values_list(
+            'timeslot_id', 'presenter_id', 'presenter__name'):
+        if presenter_pk not in presenter_records:
+            presenter_records[presenter_pk] = PresenterRecord(presenter_pk,
+                                                              name)
+        presenters[pk].append(presenter_records[presenter_pk])
+    resources, resource_records, venues = defaultdict(list), {}, {}
+    for (pk, resource_pk, name, venue_pk,
+         venue_name) in TimeSlot.resources.through.objects.filter(
+            timeslot__in=timeslots).order_by('resource__name').values_list(
+            'timeslot_id', 'resource_id', 'resource__name',
+            'resource__venue_id', 'resource__venue__name'):
+        if resource_pk not in resource_records:
+            if venue_pk not in venues:
+                venues[venue_pk] = VenueRecord(venue_pk, venue_name)
+            resource_records[resource_pk] = ResourceRecord(
+                resource_pk, name, venues[venue_pk])
+        resources[pk].append(resource_records[resource_pk])
+    return [TimeSlotRecord(*row, presenters=tuple(presenters[row[0]]),
+                           resources=tuple(resources[row[0]]))
+            for row in rows]
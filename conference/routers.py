@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing of conference reads to replica databases.
+
+With :py:class:`ReplicaRouter` in the ``DATABASE_ROUTERS`` setting, reads of
+conference models go to a database chosen at random from the
+``CONFERENCE_REPLICA_DATABASES`` setting (default empty, i.e. no routing),
+and writes go to the ``CONFERENCE_PRIMARY_DATABASE`` (default
+``'default'``).
+
+Once a thread writes, its reads are pinned to the primary database, so it
+reads its own writes despite replication lag, e.g. in signal receivers.
+:py:class:`~conference.middleware.ReadYourWritesMiddleware` unpins each
+request, and pins the following requests of the same client for
+``CONFERENCE_PINNING_TIMEOUT`` seconds (default 15).
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from contextlib import contextmanager
+from django.conf import settings
+import random
+import threading
+
+
+_state = threading.local()
+
+
+def get_primary():
+    """Get the alias of the primary database, which is written to.
+
+    :rtype: str
+    """
+    return getattr(settings, 'CONFERENCE_PRIMARY_DATABASE', 'default')
+
+
+def get_replicas():
+    """Get the aliases of the replica databases, which are read from.
+
+    :rtype: list
+    """
+    return getattr(settings, 'CONFERENCE_REPLICA_DATABASES', [])
+
+
+def get_pinning_timeout():
+    """Get the time for which a client's reads are pinned to the primary
+    database after it writes, in seconds.
+
+    :rtype: int
+    """
+    return getattr(settings, 'CONFERENCE_PINNING_TIMEOUT', 15)
+
+
+def has_written():
+    """Whether the current thread has written to the primary database since
+    it was last reset.
+
+    :rtype: bool
+    """
+    return getattr(_state, 'written', False)
+
+
+def is_pinned():
+    """Whether the current thread reads from the primary database.
+
+    :rtype: bool
+    """
+    return getattr(_state, 'pinned', False) or has_written()
+
+
+def pin():
+    """Pin the current thread's reads to the primary database, until
+    :py:func:`.reset`."""
+    _state.pinned = True
+
+
+@contextmanager
+def pinned():
+    """Pin reads to the primary database within a block."""
+    previous = getattr(_state, 'pinned', False)
+    pin()
+    try:
+        yield
+    finally:
+        _state.pinned = previous
+
+
+def reset():
+    """Unpin the current thread's reads, e.g. at the start of a request."""
+    _state.pinned = False
+    _state.written = False
+
+
+class ReplicaRouter(object):
+    """Database router sending reads of conference models to replicas, and
+    writes to the primary database."""
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = set([get_primary()] + list(get_replicas()))
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'conference':
+            replicas = get_replicas()
+            if not replicas or is_pinned():
+                return get_primary()
+            return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == 'conference':
+            _state.written = True
+            return get_primary()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from . import cache, records, routers, snapshot, timeline
+from .models import ScheduleEntry
+from .querysets import get_next_boundary, split_now_next_later
+from django.utils import timezone, translation
+from django.utils.functional import cached_property
+
+
+class Schedule(object):
+    """The schedule for a conference.
+
+    All time slots for the conference, together with their presenters,
+    resources and venues, are loaded up-front as lightweight records (see
+    :py:mod:`conference.records`) in a fixed number of queries, regardless
+    of the number of time slots.
+
+    :param conference: Conference to build the schedule for.
+    :type conference: :py:class:`~conference.models.Conference`
+    :param at: Reference time for the "now", "next" and "later" time slots,
+        defaults to the current time.
+    :type at: :py:class:`~datetime.datetime`
+    :param cached: Whether to read, and store, the loaded time slots and
+        rendered template fragments in the conference schedule cache.
+    :type cached: bool
+
+    """
+
+    def __init__(self, conference, at=None, cached=False):
+        self.conference = conference
+        self.at = at or timezone.now()
+        self.cached = cached
+
+    def get_queryset(self):
+        """Get the queryset used to load the time slots.
+
+        When the schedule snapshot is enabled, its entries are loaded with a
+        single query instead.
+
+        :returns: Time slots queryset, or schedule entries queryset.
+        :rtype: :py:class:`~django.db.models.query.QuerySet`
+        """
+        if snapshot.is_enabled():
+            return ScheduleEntry.objects.filter(conference=self.conference)
+        return self.conference.timeslots.all()
+
+    def load(self):
+        """Load the time slots.
+
+        :returns: Time slot records, or schedule entries.
+        :rtype: list
+        """
+        if snapshot.is_enabled():
+            return list(self.queryset)
+        return records.load_records(self.queryset)
+
+    @cached_property
+    def queryset(self):
+        return self.get_queryset()
+
+    @cached_property
+    def timeslots(self):
+        """All time slots, ordered by start time.
+
+        :rtype: list
+        """
+        if not self.cached:
+            return self.load()
+        key = cache.make_key(self.conference.pk, 'timeslots')
+        timeslots = cache.get_cache().get(key)
+        if timeslots is None:
+            # Loaded from the primary database, as a lagging replica's time
+            # slots would be cached under the new version until they expire.
+            with routers.pinned():
+                timeslots = self.load()
+            cache.get_cache().set(key, timeslots, cache.get_timeout())
+        return timeslots
+
+    @cached_property
+    def now_next_later(self):
+        """The current, next and next+1 future time slots at the reference
+        time, computed from the loaded time slots.
+
+        :rtype: :py:class:`~conference.querysets.NowNextLater`
+        """
+        return split_now_next_later(self.timeslots, self.at)
+
+    @cached_property
+    def next_boundary(self):
+        """The first time after the reference time at which a time slot
+        starts or ends, from the conference timeline when cached.
+
+        :rtype: :py:class:`~datetime.datetime`
+        """
+        if not self.cached:
+            return get_next_boundary(self.timeslots, self.at)
+        # The time slots are only loaded if the timeline must be built, e.g.
+        # not when template fragments are cached.
+        return timeline.get_timeline(
+            self.conference.pk, lambda: self.timeslots).next_boundary(self.at)
+
+    @property
+    def cache_alias(self):
+        """Alias of the cache used for template fragments.
+
+        :rtype: str
+        """
+        return cache.get_alias()
+
+    @cached_property
+    def fragment_key(self):
+        """Key identifying this version of the schedule, for template
+        fragments rendered in the current language and time zone.
+
+        :rtype: str
+        """
+        return ':'.join([
+            str(self.conference.pk),
+            str(cache.get_version(self.conference.pk) if self.cached else ''),
+            translation.get_language() or '',
+            timezone.get_current_timezone_name()])
+
+    @property
+    def fragment_timeout(self):
+        """Timeout for template fragments which depend only on the version
+        of the schedule, e.g. the list of all time slots. Zero when the
+        schedule is not cached.
+
+        :rtype: int
+        """
+        return cache.get_timeout() if self.cached else 0
+
+    @property
+    def live_fragment_timeout(self):
+        """Timeout for template fragments which also depend on the reference
+        time, e.g. the current time slots, expiring at the next time slot
+        boundary. Zero when the schedule is not cached.
+
+        :rtype: int
+        """
+        if not self.cached:
+            return 0
+        return cache.get_timeout(self.next_boundary, at=self.at)
+
+    @property
+    def current(self):
+        """Time slots happening at the reference time.
+
+        :rtype: list
+        """
+        return self.now_next_later.current
+
+    @property
+    def next(self):
+        """The next future time slot.
+
+        :rtype: :py:class:`~conference.models.TimeSlot`
+        """
+        return self.now_next_later.next
+
+    @property
+    def later(self):
+        """The next+1 future time slot.
+
+        :rtype: :py:class:`~conference.models.TimeSlot`
+        """
+        return self.now_next_later.later
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Full-text search over time slots, and their presenters.
+
+Time slot names and descriptions, and presenter names and biographies, are
+indexed by a search backend, which is kept up-to-date when
+:py:data:`~conference.signals.schedule_changed` is sent. Results are ranked
+by BM25, with matches in names weighted above those in descriptions.
+
+The backend is set by the ``CONFERENCE_SEARCH_BACKEND`` setting, as the
+dotted path of a :py:class:`.BaseBackend` subclass. By default
+:py:class:`.FTS5Backend` is used on SQLite with FTS5, and otherwise
+:py:class:`.MemoryBackend`.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .importer import chunks
+from .models import TimeSlot
+from .signals import schedule_changed
+from collections import Counter, defaultdict, namedtuple
+from django.conf import settings
+from django.db import connections, router
+from django.dispatch import receiver
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+import uuid
+
+
+SearchResult = namedtuple('SearchResult', ['timeslot', 'score', 'snippet'])
+
+#: Indexed fields, and the weight of matches in each.
+WEIGHTS = [('name', 10.0), ('presenters', 5.0), ('description', 1.0),
+           ('biographies', 1.0)]
+
+#: Markers delimiting matches in raw snippets.
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+#: Maximum number of words in a snippet.
+SNIPPET_WORDS = 16
+
+_backends = {}
+
+
+def fold(text):
+    """Lower-case text, and remove diacritics."""
+    return ''.join(char for char in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Split text into folded words.
+
+    :rtype: list
+    """
+    return re.findall(r'\w+', fold(text), re.UNICODE)
+
+
+def highlight(snippet):
+    """Escape a raw snippet, wrapping its matches in ``<mark>`` elements.
+
+    :rtype: :py:class:`~django.utils.safestring.SafeText`
+    """
+    return mark_safe(escape(snippet).replace(MATCH_START, '<mark>').replace(
+        MATCH_END, '</mark>'))
+
+
+def get_documents(queryset, batch_size=500):
+    """Get the text to index for time slots.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :returns: ``(pk, conference_id, fields)`` tuples, where fields is a dict
+        of text keyed by field name.
+    :rtype: generator
+    """
+    rows = list(queryset.order_by().values_list(
+        'pk', 'conference_id', 'name', 'description'))
+    for batch in chunks(rows, batch_size):
+        presenters = defaultdict(list)
+        for pk, name, biography in TimeSlot.presenters.through.objects.filter(
+                timeslot__in=[row[0] for row in batch]).order_by(
+                'presenter__name').values_list(
+                'timeslot_id', 'presenter__name', 'presenter__biography'):
+            presenters[pk].append((name, biography))
+        for pk, conference_id, name, description in batch:
+            yield pk, conference_id, {
+                'name': name,
+                'description': description,
+                'presenters': ', '.join(
+                    name for name, _ in presenters[pk]),
+                'biographies': '\n'.join(
+                    biography for _, biography in presenters[pk]
+                    if biography),
+            }
+
+
+def make_snippet(fields, tokens):
+    """Make a raw snippet from the field with the most matches, with the
+    matching words wrapped in :py:data:`.MATCH_START` and
+    :py:data:`.MATCH_END`.
+
+    :param fields: Text, keyed by field name.
+    :type fields: dict
+    :param tokens: Folded query words, matching words they prefix.
+    :type tokens: list
+    :rtype: str
+    """
+    best = None
+    for field, _ in WEIGHTS:
+        parts = re.split(r'(\w+)', fields[field], flags=re.UNICODE)
+        matches = [index for index in range(1, len(parts), 2)
+                   if fold(parts[index]).startswith(tuple(tokens))]
+        if matches and (best is None or len(matches) > len(best[1])):
+            best = parts, matches
+    if best is None:
+        return fields['name'][:100]
+    parts, matches = best
+    for index in matches:
+        parts[index] = MATCH_START + parts[index] + MATCH_END
+    # Words are at odd indexes, with a few words of context before the
+    # first match.
+    first = max(1, matches[0] - SNIPPET_WORDS // 4 * 2)
+    last = min(len(parts), first + SNIPPET_WORDS * 2 - 1)
+    snippet = ''.join(parts[first:last]).strip()
+    return '{}{}{}'.format('…' if first > 1 else '', snippet,
+                           '…' if last < len(parts) - 1 else '')
+
+
+class BaseBackend(object):
+    """Base class for search backends."""
+
+    def index(self, timeslots):
+        """Add, update, or remove (where they no longer exist) time slots
+        in the index.
+
+        :param timeslots: Time slot primary keys.
+        :type timeslots: iterable
+        """
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Rebuild the index of all time slots."""
+        raise NotImplementedError
+
+    def query(self, text, conference=None, limit=20):
+        """Find time slots matching all words of the query, each as a
+        prefix.
+
+        :returns: ``(pk, score, raw_snippet)`` tuples, best first.
+        :rtype: list
+        """
+        raise NotImplementedError
+
+    def search(self, text, conference=None, limit=20):
+        """Find time slots matching all words of the query, each as a
+        prefix, e.g. ``'pyth web'`` matches "Python for the web".
+
+        :param text: Query.
+        :type text: str
+        :param conference: Conference to search within, defaults to all.
+        :type conference: :py:class:`~conference.models.Conference`
+        :param limit: Maximum number of results.
+        :type limit: int
+        :returns: Results, best first.
+        :rtype: list of :py:class:`.SearchResult`
+        """
+        if not tokenize(text):
+            return []
+        results = self.query(text, conference=conference, limit=limit)
+        timeslots = TimeSlot.objects.in_bulk([pk for pk, _, _ in results])
+        return [SearchResult(timeslots[pk], score, highlight(snippet))
+                for pk, score, snippet in results if pk in timeslots]
+
+
+class FTS5Backend(BaseBackend):
+    """Search backend using an SQLite FTS5 virtual table, created by the
+    ``0006_search_index`` migration."""
+
+    table = 'conference_search'
+
+    @classmethod
+    def is_available(cls, connection):
+        """Whether the database is SQLite, with the FTS5 extension.
+
+        :rtype: bool
+        """
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            return 'ENABLE_FTS5' in [row[0] for row in cursor.fetchall()]
+
+    def index(self, timeslots, batch_size=500):
+        for batch in chunks(timeslots, batch_size):
+            rows = [
+                (pk.hex, conference_id.hex) +
+                tuple(fields[field] for field, _ in WEIGHTS)
+                for pk, conference_id, fields in get_documents(
+                    TimeSlot.objects.filter(pk__in=batch))]
+            with self.get_connection(write=True).cursor() as cursor:
+                cursor.execute(
+                    'DELETE FROM {} WHERE timeslot_id IN ({})'.format(
+                        self.table, ', '.join(['%s'] * len(batch))),
+                    [uuid.UUID(str(pk)).hex for pk in batch])
+                if rows:
+                    cursor.executemany(
+                        'INSERT INTO {} (timeslot_id, conference_id, {}) '
+                        'VALUES (%s, %s, {})'.format(
+                            self.table,
+                            ', '.join(field for field, _ in WEIGHTS),
+                            ', '.join(['%s'] * len(WEIGHTS))), rows)
+
+    def get_connection(self, write=False):
+        """Get the connection to the database holding the time slots, to
+        write to or read from (see :py:mod:`conference.routers`)."""
+        if write:
+            return connections[router.db_for_write(TimeSlot)]
+        return connections[router.db_for_read(TimeSlot)]
+
+    def rebuild(self):
+        with self.get_connection(write=True).cursor() as cursor:
+            cursor.execute('DELETE FROM {}'.format(self.table))
+        self.index(TimeSlot.objects.values_list('pk', flat=True))
+
+    def query(self, text, conference=None, limit=20):
+        match = ' '.join('"{}"*'.format(token) for token in tokenize(text))
+        sql = ('SELECT timeslot_id, bm25({table}, 0, 0, {weights}), '
+               'snippet({table}, -1, %s, %s, %s, %s) FROM {table} '
+               'WHERE {table} MATCH %s').format(
+                   table=self.table,
+                   weights=', '.join(str(weight) for _, weight in WEIGHTS))
+        params = [MATCH_START, MATCH_END, '…', SNIPPET_WORDS, match]
+        if conference is not None:
+            sql += ' AND conference_id = %s'
+            params.append(conference.pk.hex)
+        sql += ' ORDER BY 2 LIMIT %s'
+        params.append(limit)
+        with self.get_connection().cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(uuid.UUID(pk), -rank, snippet)
+                    for pk, rank, snippet in cursor.fetchall()]
+
+
+class MemoryBackend(BaseBackend):
+    """Search backend using an in-process inverted index, built from the
+    database on the first query.
+
+    Each process keeps its own index, which is updated by the process saving
+    changes, so other processes only see changes once restarted.
+
+    """
+
+    #: BM25 parameters.
+    k1, b = 1.2, 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+        self.clear()
+
+    def clear(self):
+        self.documents = {}
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        self.terms = []
+        self.terms_changed = False
+
+    def add(self, pk, conference_id, fields):
+        counts = Counter()
+        for field, weight in WEIGHTS:
+            for token in tokenize(fields[field]):
+                counts[token] += weight
+        for token, count in counts.items():
+            if token not in self.postings:
+                self.terms_changed = True
+            self.postings[token][pk] = count
+        self.documents[pk] = (conference_id, fields, list(counts))
+        self.lengths[pk] = sum(counts.values())
+
+    def discard(self, pk):
+        if pk not in self.documents:
+            return
+        for token in self.documents.pop(pk)[2]:
+            del self.postings[token][pk]
+            if not self.postings[token]:
+                del self.postings[token]
+                self.terms_changed = True
+        del self.lengths[pk]
+
+    def index(self, timeslots, batch_size=500):
+        with self.lock:
+            if not self.built:
+                return
+            for batch in chunks(timeslots, batch_size):
+                for pk in batch:
+                    self.discard(uuid.UUID(str(pk)))
+                for document in get_documents(
+                        TimeSlot.objects.filter(pk__in=batch)):
+                    self.add(*document)
+
+    def rebuild(self):
+        with self.lock:
+            self.clear()
+            for document in get_documents(TimeSlot.objects.all()):
+                self.add(*document)
+            self.built = True
+
+    def expand(self, token):
+        """Get the indexed terms starting with a token.
+
+        :rtype: list
+        """
+        if self.terms_changed:
+            self.terms = sorted(self.postings)
+            self.terms_changed = False
+        index = bisect.bisect_left(self.terms, token)
+        terms = []
+        while (index < len(self.terms) and
+               self.terms[index].startswith(token)):
+            terms.append(self.terms[index])
+            index += 1
+        return terms
+
+    def query(self, text, conference=None, limit=20):
+        tokens = tokenize(text)
+        with self.lock:
+            if not self.built:
+                self.rebuild()
+            if not self.documents:
+                return []
+            count = len(self.documents)
+            average = float(sum(self.lengths.values())) / count
+            scores = None
+            for token in tokens:
+                matches = defaultdict(float)
+                for term in self.expand(token):
+                    postings = self.postings[term]
+                    idf = math.log(1 + (count - len(postings) + 0.5) /
+                                   (len(postings) + 0.5))
+                    for pk, frequency in postings.items():
+                        norm = 1 - self.b + self.b * self.lengths[pk] / average
+                        matches[pk] += idf * frequency * (self.k1 + 1) / (
+                            frequency + self.k1 * norm)
+                if scores is not None:
+                    matches = dict((pk, score + scores[pk])
+                                   for pk, score in matches.items()
+                                   if pk in scores)
+                scores = matches
+            if conference is not None:
+                scores = dict((pk, score) for pk, score in scores.items()
+                              if self.documents[pk][0] == conference.pk)
+            best = heapq.nlargest(limit, scores.items(),
+                                  key=lambda item: item[1])
+            return [(pk, score, make_snippet(self.documents[pk][1], tokens))
+                    for pk, score in best]
+
+
+def get_backend():
+    """Get the configured search backend.
+
+    :rtype: :py:class:`.BaseBackend`
+    """
+    path = getattr(settings, 'CONFERENCE_SEARCH_BACKEND', None)
+    if path not in _backends:
+        if path is not None:
+            backend = import_string(path)()
+        elif FTS5Backend.is_available(
+                connections[router.db_for_read(TimeSlot)]):
+            backend = FTS5Backend()
+        else:
+            backend = MemoryBackend()
+        _backends[path] = backend
+    return _backends[path]
+
+
+def search(text, conference=None, limit=20):
+    """Search time slots with the configured backend.
+
+    See :py:meth:`.BaseBackend.search`.
+    """
+    return get_backend().search(text, conference=conference, limit=limit)
+
+
+@receiver(schedule_changed)
+def update_index(sender, conferences, timeslots=None, **kwargs):
+    if timeslots is None:
+        timeslots = TimeSlot.objects.filter(
+            conference__in=list(conferences)).values_list('pk', flat=True)
+    get_backend().index(list(timeslots))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serialization of time slots, and their related objects, to primitive
+data using :py:meth:`~django.db.models.query.QuerySet.values`, fetching only
+the selected fields."""
+
+from __future__ import absolute_import, unicode_literals
+from . import records
+from .models import TimeSlot
+from collections import OrderedDict, defaultdict
+
+
+#: Fields which may be selected, for each related object path.
+FIELDS = OrderedDict([
+    ('', ['id', 'name', 'description', 'start_at', 'end_at', 'video',
+          'updated_at']),
+    ('presenters', ['id', 'name', 'biography', 'blog', 'twitter_handle',
+                    'irc_handle', 'github_handle', 'slack_handle', 'business',
+                    'position']),
+    ('resources', ['id', 'name']),
+    ('resources.venue', ['id', 'name', 'address']),
+])
+
+#: Lookups from the time slot M2M through models, for each related object
+#: path.
+LOOKUPS = {
+    'presenters': 'presenter',
+    'resources': 'resource',
+    'resources.venue': 'resource__venue',
+}
+
+#: Fields selected by default.
+DEFAULT_FIELDS = ['id', 'name', 'description', 'start_at', 'end_at', 'video',
+                  'presenters.id', 'presenters.name', 'resources.id',
+                  'resources.name', 'resources.venue.id',
+                  'resources.venue.name']
+
+
+class FieldError(ValueError):
+    """Raised when an unknown field is selected."""
+
+
+class TimeSlotSerializer(object):
+    """Serializer of time slots to dicts, with nested lists of presenters and
+    resources (and their venues).
+
+    :param fields: Selected fields, using dotted paths for related objects,
+        e.g. ``['name', 'start_at', 'presenters.name']``. Defaults to
+        :py:data:`.DEFAULT_FIELDS`.
+    :type fields: list
+    :raises: :py:class:`.FieldError` if an unknown field is selected.
+
+    """
+
+    def __init__(self, fields=None):
+        self.fields = OrderedDict((path, []) for path in FIELDS)
+        for field in fields or DEFAULT_FIELDS:
+            path, _, name = field.strip().rpartition('.')
+            if name not in FIELDS.get(path, []):
+                raise FieldError('Unknown field "{}".'.format(field))
+            if name not in self.fields[path]:
+                self.fields[path].append(name)
+
+    def get_related(self, queryset, related, paths):
+        """Get the selected fields of related objects, for each time slot.
+
+        :returns: Lists of dicts, keyed by time slot primary key.
+        :rtype: dict
+        """
+        lookups, keys = [], []
+        for path in paths:
+            for name in self.fields[path]:
+                lookups.append('{}__{}'.format(LOOKUPS[path], name))
+                keys.append((path, name))
+        related_objects = defaultdict(list)
+        if not lookups:
+            return related_objects
+        through = getattr(TimeSlot, related).through
+        rows = through.objects.filter(
+            timeslot__in=queryset.values_subquery('pk')).order_by(
+            '{}__name'.format(LOOKUPS[related])).values_list(
+            'timeslot_id', *lookups)
+        for row in rows:
+            data = OrderedDict()
+            for (path, name), value in zip(keys, row[1:]):
+                if path == related:
+                    data[name] = value
+                else:
+                    data.setdefault(path.split('.')[-1], OrderedDict())[
+                        name] = value
+            related_objects[row[0]].append(data)
+        return related_objects
+
+    def serialize(self, queryset):
+        """Serialize the time slots.
+
+        At most three queries are made: one for the time slots, and one each
+        for presenters and resources (with venues) if any of their fields
+        are selected.
+
+        :param queryset: Time slots.
+        :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+        :returns: Serialized time slots.
+        :rtype: list
+        """
+        presenters = self.get_related(queryset, 'presenters', ['presenters'])
+        resources = self.get_related(queryset, 'resources',
+                                     ['resources', 'resources.venue'])
+        timeslots = []
+        for values in queryset.values('pk', *self.fields['']):
+            data = OrderedDict(
+                (name, values[name]) for name in self.fields[''])
+            if self.fields['presenters']:
+                data['presenters'] = presenters[values['pk']]
+            if self.fields['resources'] or self.fields['resources.venue']:
+                data['resources'] = resources[values['pk']]
+            timeslots.append(data)
+        return timeslots
+
+    def serialize_records(self, timeslots):
+        """Serialize time slot records (see :py:mod:`conference.records`),
+        without querying the database.
+
+        :param timeslots: Time slot records.
+        :type timeslots: iterable
+        :returns: Serialized time slots.
+        :rtype: list
+        :raises: :py:class:`.FieldError` if a selected field is not held by
+            the records.
+        """
+        if not self.supports_records:
+            raise FieldError('Fields not held by time slot records.')
+        fields = self.fields
+        data = []
+        for timeslot in timeslots:
+            values = OrderedDict(
+                (name, getattr(timeslot, name)) for name in fields[''])
+            if fields['presenters']:
+                values['presenters'] = [
+                    OrderedDict((name, getattr(presenter, name))
+                                for name in fields['presenters'])
+                    for presenter in timeslot.presenters]
+            if fields['resources'] or fields['resources.venue']:
+                values['resources'] = []
+                for resource in timeslot.resources:
+                    resource_values = OrderedDict(
+                        (name, getattr(resource, name))
+                        for name in fields['resources'])
+                    if fields['resources.venue']:
+                        resource_values['venue'] = OrderedDict(
+                            (name, getattr(resource.venue, name))
+                            for name in fields['resources.venue'])
+                    values['resources'].append(resource_values)
+            data.append(values)
+        return data
+
+    @property
+    def supports_records(self):
+        """Whether the selected fields are all held by time slot records.
+
+        :rtype: bool
+        """
+        return all(name in records.FIELDS[path]
+                   for path, names in self.fields.items() for name in names)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .models import Conference, Presenter, Resource, TimeSlot, Venue
+from django.db.models import signals
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+
+#: Sent when the schedule of one or more conferences has changed, with the
+#: primary keys of the affected conferences as ``conferences``, and of the
+#: time slots whose own details, presenters or resources changed as
+#: ``timeslots`` (``None`` if any time slot of the conferences may have
+#: changed).
+schedule_changed = Signal(providing_args=['conferences', 'timeslots'])
+
+
+def send_schedule_changed(sender, conferences, timeslots=None):
+    conferences = set(conferences)
+    if conferences:
+        schedule_changed.send(
+            sender=sender, conferences=conferences,
+            timeslots=None if timeslots is None else set(timeslots))
+
+
+def get_affected(instance):
+    """Get the primary keys of the conferences whose schedule includes the
+    given instance, and of the time slots it is displayed with.
+
+    :param instance: Conference, presenter, resource, time slot or venue.
+    :returns: Conference, and time slot, primary keys.
+    :rtype: tuple
+    """
+    if isinstance(instance, Conference):
+        return {instance.pk}, set()
+    elif isinstance(instance, TimeSlot):
+        return {instance.conference_id}, {instance.pk}
+    elif isinstance(instance, Presenter):
+        queryset = TimeSlot.objects.filter(presenters=instance)
+    elif isinstance(instance, Resource):
+        queryset = TimeSlot.objects.filter(resources=instance)
+    elif isinstance(instance, Venue):
+        queryset = TimeSlot.objects.filter(resources__venue=instance)
+    rows = set(queryset.values_list('conference_id', 'pk'))
+    conferences = set(conference for conference, _ in rows)
+    if isinstance(instance, Venue):
+        conferences.update(Conference.objects.filter(
+            venues=instance).values_list('pk', flat=True))
+    return conferences, set(timeslot for _, timeslot in rows)
+
+
+@receiver(signals.pre_save, sender=TimeSlot)
+def handle_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    # A time slot moved to another conference leaves the schedule of the
+    # conference it was saved with.
+    if not raw and not instance._state.adding:
+        queryset = sender._default_manager.using(using).filter(pk=instance.pk)
+        instance._schedule_previous_conference = queryset.values_list(
+            'conference_id', flat=True).first()
+
+
+@receiver(signals.post_save, sender=Conference)
+@receiver(signals.post_save, sender=Presenter)
+@receiver(signals.post_save, sender=Resource)
+@receiver(signals.post_save, sender=TimeSlot)
+@receiver(signals.post_save, sender=Venue)
+def handle_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        conferences, timeslots = get_affected(instance)
+        previous = getattr(instance, '_schedule_previous_conference', None)
+        if previous is not None:
+            conferences.add(previous)
+            del instance._schedule_previous_conference
+        send_schedule_changed(sender, conferences, timeslots)
+
+
+@receiver(signals.pre_delete, sender=Presenter)
+@receiver(signals.pre_delete, sender=Resource)
+@receiver(signals.pre_delete, sender=Venue)
+def handle_pre_delete(sender, instance, **kwargs):
+    # Related rows are removed before post_delete is sent.
+    instance._schedule_affected = get_affected(instance)
+
+
+@receiver(signals.post_delete, sender=Conference)
+@receiver(signals.post_delete, sender=Presenter)
+@receiver(signals.post_delete, sender=Resource)
+@receiver(signals.post_delete, sender=TimeSlot)
+@receiver(signals.post_delete, sender=Venue)
+def handle_post_delete(sender, instance, **kwargs):
+    affected = getattr(instance, '_schedule_affected', None)
+    if affected is None:
+        affected = get_affected(instance)
+    send_schedule_changed(sender, *affected)
+
+
+@receiver(signals.m2m_changed, sender=Conference.venues.through)
+@receiver(signals.m2m_changed, sender=TimeSlot.presenters.through)
+@receiver(signals.m2m_changed, sender=TimeSlot.resources.through)
+def handle_m2m_changed(sender, instance, action, reverse, model, pk_set,
+                       **kwargs):
+    if not reverse:
+        # The instance is a conference or time slot.
+        if action.startswith('post_'):
+            send_schedule_changed(sender, *get_affected(instance))
+    elif action == 'pre_clear':
+        instance._schedule_affected = get_affected(instance)
+    elif action == 'post_clear':
+        send_schedule_changed(sender, *instance._schedule_affected)
+    elif action in ['post_add', 'post_remove'] and model is Conference:
+        send_schedule_changed(sender, pk_set, set())
+    elif action in ['post_add', 'post_remove']:
+        send_schedule_changed(sender, TimeSlot.objects.filter(
+            pk__in=pk_set).values_list('conference_id', flat=True), pk_set)
+
+
+@receiver(schedule_changed)
+def touch_conferences(sender, conferences, **kwargs):
+    # Conference.updated_at tracks changes to the whole schedule, including
+    # related objects, for conditional requests.
+    if sender is not Conference:
+        Conference.objects.filter(pk__in=conferences).update(
+            updated_at=timezone.now())
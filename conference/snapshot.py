@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Denormalized schedule snapshot.
+
+When the ``CONFERENCE_SCHEDULE_SNAPSHOT`` setting is ``True`` (default
+``False``), a :py:class:`~conference.models.ScheduleEntry` is kept for every
+time slot, holding its display-ready presenter and resource names, so that a
+schedule can be read with a single indexed query. Entries are rebuilt when
+:py:data:`~conference.signals.schedule_changed` is sent, for only the
+affected time slots where they are known.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .importer import chunks
+from .models import ScheduleEntry, TimeSlot
+from .signals import schedule_changed
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+import json
+
+
+#: Fields copied, or derived, from each time slot.
+FIELDS = ['conference_id', 'name', 'description', 'start_at', 'end_at',
+          'video', 'updated_at', 'presenters_data', 'resources_data']
+
+
+def is_enabled():
+    """Whether the schedule snapshot is maintained, and read from.
+
+    :rtype: bool
+    """
+    return getattr(settings, 'CONFERENCE_SCHEDULE_SNAPSHOT', False)
+
+
+def build_entries(queryset):
+    """Build (unsaved) schedule entries for time slots.
+
+    :param queryset: Time slots.
+    :type queryset: :py:class:`~conference.querysets.TimeSlotQuerySet`
+    :rtype: list
+    """
+    rows = list(queryset.values_list(
+        'pk', 'conference_id', 'name', 'description', 'start_at', 'end_at',
+        'video', 'updated_at'))
+    presenters, resources = defaultdict(list), defaultdict(list)
+    for batch in chunks([row[0] for row in rows], 500):
+        for pk, name in TimeSlot.presenters.through.objects.filter(
+                timeslot__in=batch).order_by('presenter__name').values_list(
+                'timeslot_id', 'presenter__name'):
+            presenters[pk].append(name)
+        for pk, name, venue in TimeSlot.resources.through.objects.filter(
+                timeslot__in=batch).order_by('resource__name').values_list(
+                'timeslot_id', 'resource__name', 'resource__venue__name'):
+            resources[pk].append([name, venue])
+    return [
+        ScheduleEntry(
+            timeslot_id=pk, conference_id=conference_id, name=name,
+            description=description, start_at=start_at, end_at=end_at,
+            video=video, updated_at=updated_at,
+            presenters_data=json.dumps(presenters[pk]),
+            resources_data=json.dumps(resources[pk]))
+        for (pk, conference_id, name, description, start_at, end_at, video,
+             updated_at) in rows]
+
+
+def get_timeslot_pks(conferences=None):
+    timeslots = TimeSlot.objects.all()
+    if conferences is not None:
+        timeslots = timeslots.filter(conference__in=list(conferences))
+    return list(timeslots.values_list('pk', flat=True))
+
+
+def rebuild(conferences=None, timeslots=None, batch_size=500):
+    """Rebuild the schedule entries of the given time slots, or else of all
+    time slots of the given conferences (or of all conferences).
+
+    :param conferences: Conference primary keys.
+    :type conferences: iterable
+    :param timeslots: Time slot primary keys.
+    :type timeslots: iterable
+    """
+    with transaction.atomic():
+        if timeslots is None:
+            entries = ScheduleEntry.objects.all()
+            if conferences is not None:
+                entries = entries.filter(conference__in=list(conferences))
+            entries.delete()
+            timeslots = get_timeslot_pks(conferences)
+        for batch in chunks(timeslots, batch_size):
+            ScheduleEntry.objects.filter(timeslot__in=batch).delete()
+            ScheduleEntry.objects.bulk_create(
+                build_entries(TimeSlot.objects.filter(pk__in=batch)))
+
+
+def check(conferences=None, batch_size=500):
+    """Compare the schedule snapshot with the normalized tables.
+
+    :param conferences: Conference primary keys, defaults to all
+        conferences.
+    :type conferences: iterable
+    :returns: ``(problem, timeslot_pk)`` tuples, where the problem is
+        ``'missing'``, ``'stale'`` or ``'orphaned'``.
+    :rtype: list
+    """
+    problems = []
+    timeslots = get_timeslot_pks(conferences)
+    for batch in chunks(timeslots, batch_size):
+        entries = dict(
+            (row[0], row[1:]) for row in ScheduleEntry.objects.filter(
+                timeslot__in=batch).values_list('pk', *FIELDS))
+        for entry in build_entries(TimeSlot.objects.filter(pk__in=batch)):
+            if entry.pk not in entries:
+                problems.append(('missing', entry.pk))
+            elif entries[entry.pk] != tuple(getattr(entry, field)
+                                            for field in FIELDS):
+                problems.append(('stale', entry.pk))
+    orphaned = ScheduleEntry.objects.exclude(
+        timeslot__in=TimeSlot.objects.values_subquery('pk'))
+    if conferences is not None:
+        orphaned = orphaned.filter(conference__in=list(conferences))
+    problems.extend(('orphaned', pk)
+                    for pk in orphaned.values_list('pk', flat=True))
+    return problems
+
+
+@receiver(schedule_changed)
+def update(sender, conferences, timeslots=None, **kwargs):
+    if is_enabled():
+        if timeslots is None:
+            rebuild(conferences=conferences)
+        else:
+            rebuild(timeslots=timeslots)
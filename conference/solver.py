@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Automatic scheduling of a conference's unscheduled sessions.
+
+Sessions are time slots which have not been assigned a resource (room). Each
+is placed, keeping its duration, at a start time and in a room of one of the
+conference's venues, such that no room or presenter is double-booked, and
+every presenter is available for the whole session.
+
+Sessions are placed greedily, most constrained first, at the earliest start
+time with a presenter-free slot and a free room. Busy times are kept as
+sorted interval lists, so each check is a binary search.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from .importer import chunks
+from .models import Resource, TimeSlot
+from .signals import send_schedule_changed
+from collections import defaultdict, namedtuple
+from django.db import models, transaction
+from django.utils import timezone
+import bisect
+import datetime
+import time
+
+
+Assignment = namedtuple('Assignment', ['timeslot', 'resource', 'start_at',
+                                       'end_at'])
+
+Solution = namedtuple('Solution', ['assignments', 'unscheduled'])
+
+
+class SolverError(ValueError):
+    """Raised when a conference can not be scheduled."""
+
+
+class Intervals(object):
+    """Sorted, disjoint, half-open time intervals.
+
+    :param intervals: ``(start, end)`` tuples, which are merged where they
+        overlap.
+    :type intervals: iterable
+
+    """
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end):
+        """Add an interval, merging it with any it overlaps or touches."""
+        first = bisect.bisect_left(self.ends, start)
+        last = bisect.bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+    def is_free(self, start, end):
+        """Whether the time range overlaps none of the intervals.
+
+        :rtype: bool
+        """
+        index = bisect.bisect_right(self.ends, start)
+        return index == len(self.starts) or self.starts[index] >= end
+
+    def contains(self, start, end):
+        """Whether the time range is within a single interval.
+
+        :rtype: bool
+        """
+        index = bisect.bisect_right(self.starts, start) - 1
+        return index >= 0 and self.ends[index] >= end
+
+
+class ScheduleSolver(object):
+    """Solver placing a conference's unscheduled sessions.
+
+    :param conference: Conference, with start and end dates.
+    :type conference: :py:class:`~conference.models.Conference`
+    :param availability: Times at which presenters are available, as lists
+        of ``(start, end)`` tuples keyed by presenter primary key. Presenters
+        not included are always available.
+    :type availability: dict
+    :param day_start: Time of day at which sessions may start.
+    :type day_start: :py:class:`~datetime.time`
+    :param day_end: Time of day by which sessions must end.
+    :type day_end: :py:class:`~datetime.time`
+    :param step: Interval between candidate start times.
+    :type step: :py:class:`~datetime.timedelta`
+    :param time_budget: Maximum time to spend placing sessions, in seconds.
+        Sessions not placed within the budget are left unscheduled.
+    :type time_budget: float
+
+    """
+
+    def __init__(self, conference, availability=None,
+                 day_start=datetime.time(9), day_end=datetime.time(18),
+                 step=datetime.timedelta(minutes=15), time_budget=10.0):
+        self.conference = conference
+        self.availability = dict(
+            (pk, Intervals(intervals))
+            for pk, intervals in (availability or {}).items())
+        self.day_start = day_start
+        self.day_end = day_end
+        self.step = step
+        self.time_budget = time_budget
+
+    def get_days(self):
+        """Get the time range of each day of the conference.
+
+        :returns: ``(start, end)`` tuples, in the current time zone.
+        :rtype: list
+        """
+        start_date = self.conference.start_date
+        end_date = self.conference.end_date or start_date
+        if start_date is None or end_date < start_date:
+            raise SolverError('The conference has no valid dates.')
+        days = []
+        for offset in range((end_date - start_date).days + 1):
+            date = start_date + datetime.timedelta(days=offset)
+            days.append((
+                timezone.make_aware(datetime.datetime.combine(
+                    date, self.day_start)),
+                timezone.make_aware(datetime.datetime.combine(
+                    date, self.day_end))))
+        return days
+
+    def get_sessions(self):
+        """Get the conference's time slots which have no resources.
+
+        :rtype: :py:class:`~conference.querysets.TimeSlotQuerySet`
+        """
+        return self.conference.timeslots.filter(
+            resources__isnull=True).prefetch_related('presenters')
+
+    def get_resources(self):
+        """Get the resources of the conference's venues.
+
+        :rtype: list
+        """
+        return list(Resource.objects.filter(
+            venue__conferences=self.conference).order_by('venue__name',
+                                                         'name', 'pk'))
+
+    def get_busy(self, resources, presenters, days):
+        """Get the times at which resources and presenters are already
+        booked, by any conference, during the given days.
+
+        :returns: :py:class:`.Intervals` keyed by resource, and by presenter,
+            primary key.
+        :rtype: tuple
+        """
+        # The tentative times of unscheduled sessions are not bookings.
+        timeslots = TimeSlot.objects.overlapping(
+            days[0][0], days[-1][1]).exclude(conference=self.conference,
+                                             resources__isnull=True)
+        resources_busy, presenters_busy = (defaultdict(Intervals),
+                                           defaultdict(Intervals))
+        for field, pks, busy in [('resource', resources, resources_busy),
+                                 ('presenter', presenters, presenters_busy)]:
+            through = getattr(TimeSlot, field + 's').through
+            for batch in chunks(pks, 500):
+                rows = through.objects.filter(**{
+                    'timeslot__in': timeslots.values_subquery('pk'),
+                    field + '__in': batch}).values_list(
+                        field + '_id', 'timeslot__start_at',
+                        'timeslot__end_at')
+                for pk, start_at, end_at in rows:
+                    busy[pk].add(start_at, end_at)
+        return resources_busy, presenters_busy
+
+    def get_priority(self, session):
+        """Get the sort key placing the most constrained sessions first."""
+        presenters = [presenter.pk for presenter in session.presenters.all()]
+        constrained = sum(1 for pk in presenters if pk in self.availability)
+        return (-constrained, -(session.end_at - session.start_at),
+                -len(presenters), session.name, str(session.pk))
+
+    def iter_starts(self, days, duration):
+        """Generate candidate start times, earliest first."""
+        for day_start, day_end in days:
+            start_at = day_start
+            while start_at + duration <= day_end:
+                yield start_at
+                start_at += self.step
+
+    def solve(self):
+        """Place the conference's unscheduled sessions.
+
+        :returns: Assignments, and the sessions which could not be placed.
+        :rtype: :py:class:`.Solution`
+        :raises: :py:class:`.SolverError` if the conference has no dates.
+        """
+        deadline = time.time() + self.time_budget
+        days = self.get_days()
+        sessions = sorted(self.get_sessions(), key=self.get_priority)
+        resources = self.get_resources()
+        resources_busy, presenters_busy = self.get_busy(
+            [resource.pk for resource in resources],
+            set(presenter.pk for session in sessions
+                for presenter in session.presenters.all()),
+            days)
+        assignments, unscheduled = [], []
+        for session in sessions:
+            assignment = None
+            if resources and time.time() < deadline:
+                assignment = self.place(session, days, resources,
+                                        resources_busy, presenters_busy)
+            if assignment is None:
+                unscheduled.append(session)
+                continue
+            resources_busy[assignment.resource.pk].add(assignment.start_at,
+                                                       assignment.end_at)
+            for presenter in session.presenters.all():
+                presenters_busy[presenter.pk].add(assignment.start_at,
+                                                  assignment.end_at)
+            assignments.append(assignment)
+        return Solution(assignments, unscheduled)
+
+    def place(self, session, days, resources, resources_busy,
+              presenters_busy):
+        """Find the earliest start time, and first room, for a session.
+
+        :rtype: :py:class:`.Assignment`
+        """
+        duration = session.end_at - session.start_at
+        presenters = [presenter.pk for presenter in session.presenters.all()]
+        for start_at in self.iter_starts(days, duration):
+            end_at = start_at + duration
+            if not all(presenters_busy[pk].is_free(start_at, end_at) and
+                       (pk not in self.availability or
+                        self.availability[pk].contains(start_at, end_at))
+                       for pk in presenters):
+                continue
+            for resource in resources:
+                if resources_busy[resource.pk].is_free(start_at, end_at):
+                    return Assignment(session, resource, start_at, end_at)
+
+    def save(self, solution, batch_size=100):
+        """Write the assignments to the database, updating start and end
+        times with a single query for each batch of time slots.
+
+        :param solution: Solution.
+        :type solution: :py:class:`.Solution`
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            for batch in chunks(solution.assignments, batch_size):
+                TimeSlot.objects.filter(
+                    pk__in=[assignment.timeslot.pk for assignment in batch]
+                ).update(
+                    start_at=self.get_case(batch, 'start_at'),
+                    end_at=self.get_case(batch, 'end_at'), updated_at=now)
+            TimeSlot.resources.through.objects.bulk_create([
+                TimeSlot.resources.through(
+                    timeslot_id=assignment.timeslot.pk,
+                    resource_id=assignment.resource.pk)
+                for assignment in solution.assignments], batch_size=500)
+        for assignment in solution.assignments:
+            assignment.timeslot.start_at = assignment.start_at
+            assignment.timeslot.end_at = assignment.end_at
+        if solution.assignments:
+            send_schedule_changed(
+                sender=TimeSlot, conferences=[self.conference.pk],
+                timeslots=[assignment.timeslot.pk
+                           for assignment in solution.assignments])
+
+    def get_case(self, assignments, field):
+        return models.Case(*[
+            models.When(pk=assignment.timeslot.pk, then=models.Value(
+                getattr(assignment, field),
+                output_field=models.DateTimeField()))
+            for assignment in assignments],
+            output_field=models.DateTimeField())
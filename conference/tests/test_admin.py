@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.admin import TimeSlotAdminForm
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Conference, Presenter, Resource, TimeSlot
+from conference.pagination import EstimatedCountPaginator, estimate_count
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+import datetime
+
+
+class TestEstimateCount(TestCase):
+
+    def setUp(self):
+        for _ in range(3):
+            TimeSlotFactory()
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_uses_statistics(self):
+        self.analyze()
+        TimeSlotFactory()
+
+        self.assertEqual(3, estimate_count(TimeSlot.objects.all()))
+
+    def test_filtered_queryset_is_not_estimated(self):
+        self.analyze()
+
+        self.assertIsNone(estimate_count(
+            TimeSlot.objects.filter(name='Keynote')))
+
+    def test_paginator_counts_small_tables(self):
+        self.analyze()
+        TimeSlotFactory()
+
+        self.assertEqual(4, EstimatedCountPaginator(
+            TimeSlot.objects.all(), 10).count)
+
+    def test_paginator_estimates_large_tables(self):
+        self.analyze()
+        TimeSlotFactory()
+        paginator = EstimatedCountPaginator(TimeSlot.objects.all(), 10)
+        paginator.threshold = 3
+
+        with self.assertNumQueries(2):
+            self.assertEqual(3, paginator.count)
+
+
+class TestTimeSlotAdmin(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com',
+                                             'password')
+        self.client.force_login(user)
+        self.url = reverse('admin:conference_timeslot_changelist')
+        self.conference = ConferenceFactory()
+        self.presenter = Presenter.objects.create(name='Ada')
+        self.other_presenter = Presenter.objects.create(name='Bob')
+        TimeSlotFactory().presenters.add(self.other_presenter)
+
+    def create_timeslots(self, count):
+        for _ in range(count):
+            TimeSlotFactory(conference=self.conference).presenters.add(
+                self.presenter)
+
+    def get_filter(self, response, title):
+        for spec in response.context['cl'].filter_specs:
+            if spec.title == title:
+                return spec
+
+    def test_changelist_query_count_is_independent_of_rows(self):
+        self.create_timeslots(1)
+        with self.assertNumQueries(9):
+            self.client.get(self.url)
+
+        self.create_timeslots(20)
+        with self.assertNumQueries(9):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, self.conference.name)
+
+    def test_related_filters_are_hidden_without_conference(self):
+        self.create_timeslots(1)
+
+        response = self.client.get(self.url)
+
+        self.assertIsNone(self.get_filter(response, 'presenters'))
+        self.assertIsNone(self.get_filter(response, 'resources'))
+
+    def test_unfiltered_changelist_is_not_distinct(self):
+        response = self.client.get(self.url)
+
+        self.assertFalse(response.context['cl'].queryset.query.distinct)
+
+    def test_related_filter_changelist_is_distinct(self):
+        response = self.client.get(self.url, {
+            'presenters__id__exact': str(self.other_presenter.pk)})
+
+        self.assertTrue(response.context['cl'].queryset.query.distinct)
+
+    def test_related_filters_are_limited_to_conference(self):
+        self.create_timeslots(2)
+
+        response = self.client.get(self.url, {
+            'conference__id__exact': str(self.conference.pk)})
+
+        self.assertEqual([(self.presenter.pk, 'Ada')], self.get_filter(
+            response, 'presenters').lookup_choices)
+
+    def test_related_filters_show_selected_object(self):
+        response = self.client.get(self.url, {
+            'presenters__id__exact': str(self.other_presenter.pk)})
+
+        self.assertEqual([(self.other_presenter.pk, 'Bob')], self.get_filter(
+            response, 'presenters').lookup_choices)
+        self.assertEqual(1, response.context['cl'].result_count)
+
+    def test_date_hierarchy(self):
+        self.create_timeslots(1)
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'xfull')
+        self.assertIsNotNone(response.context['cl'].date_hierarchy)
+
+
+class TestAdminActions(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com',
+                                             'password')
+        self.client.force_login(user)
+        self.conference = ConferenceFactory()
+        self.timeslots = [TimeSlotFactory(conference=self.conference)
+                          for _ in range(2)]
+        self.resource = Resource.objects.create(name='Hall',
+                                                venue=VenueFactory())
+
+    def post_action(self, model, action, selected, **data):
+        data.update({'action': action, '_selected_action': [
+            str(obj.pk) for obj in selected]})
+        return self.client.post(reverse(
+            'admin:conference_{}_changelist'.format(model)), data, follow=True)
+
+    def test_shift_timeslots(self):
+        response = self.post_action('timeslot', 'shift_timeslots',
+                                    self.timeslots[:1], minutes='30')
+
+        self.assertContains(response, 'Shifted 1 time slot(s) by 30 minute')
+        self.assertEqual(
+            self.timeslots[0].start_at + datetime.timedelta(minutes=30),
+            TimeSlot.objects.get(pk=self.timeslots[0].pk).start_at)
+        self.assertEqual(self.timeslots[1].start_at, TimeSlot.objects.get(
+            pk=self.timeslots[1].pk).start_at)
+
+    def test_shift_timeslots_requires_minutes(self):
+        response = self.post_action('timeslot', 'shift_timeslots',
+                                    self.timeslots)
+
+        self.assertContains(response, 'Enter a number of minutes')
+
+    def test_reassign_timeslots(self):
+        response = self.post_action('timeslot', 'reassign_timeslots',
+                                    self.timeslots,
+                                    resource=str(self.resource.pk))
+
+        self.assertContains(response,
+                            'Moved 2 time slot(s) to &quot;Hall&quot;.')
+        self.assertEqual(2, self.resource.timeslots.count())
+
+    def test_reassign_timeslots_requires_resource(self):
+        response = self.post_action('timeslot', 'reassign_timeslots',
+                                    self.timeslots)
+
+        self.assertContains(response, 'Select a resource')
+        self.assertEqual(0, self.resource.timeslots.count())
+
+    def test_clone_conferences(self):
+        response = self.post_action('conference', 'clone_conferences',
+                                    [self.conference],
+                                    start_date='2030-01-07')
+
+        copy = Conference.objects.get(
+            slug='{}-copy'.format(self.conference.slug))
+        self.assertContains(response, 'Copied 1 conference(s): {}.'.format(
+            copy.slug))
+        self.assertEqual(2, copy.timeslots.count())
+        self.assertEqual(datetime.date(2030, 1, 7), copy.start_date)
+
+    def test_clone_conferences_requires_start_date(self):
+        response = self.post_action('conference', 'clone_conferences',
+                                    [self.conference])
+
+        self.assertContains(response, 'Enter a start date')
+        self.assertEqual(1, Conference.objects.count())
+
+    def test_cloned_timeslots_can_be_edited(self):
+        self.timeslots[0].resources.add(self.resource)
+        self.post_action('conference', 'clone_conferences', [self.conference],
+                         start_date='2030-01-07')
+        copy = Conference.objects.get(
+            slug='{}-copy'.format(self.conference.slug))
+
+        for timeslot in [self.timeslots[0], copy.timeslots.get(
+                name=self.timeslots[0].name)]:
+            form = TimeSlotAdminForm(instance=timeslot, data={
+                'conference': timeslot.conference_id, 'name': 'Renamed',
+                'start_at': timezone.localtime(timeslot.start_at).strftime(
+                    '%Y-%m-%d %H:%M:%S'),
+                'end_at': timezone.localtime(timeslot.end_at).strftime(
+                    '%Y-%m-%d %H:%M:%S'),
+                'resources': [self.resource.pk]})
+
+            self.assertTrue(form.is_valid(), form.errors)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import agenda, editing
+from conference.factories import (ConferenceFactory, PresenterFactory,
+                                  ResourceFactory, TimeSlotFactory)
+from conference.models import Bookmark, TimeSlot
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import six, timezone
+
+
+def at(hour, minute=0):
+    return timezone.datetime(2016, 1, 2, hour, minute, tzinfo=timezone.utc)
+
+
+class AgendaTestCase(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.user = User.objects.create_user('ada', 'ada@example.com',
+                                             'password')
+        self.timeslots = [
+            TimeSlotFactory(conference=self.conference, name=name,
+                            start_at=start_at, end_at=end_at)
+            for name, start_at, end_at in [
+                ('Keynote', at(9), at(10)), ('Django', at(10), at(11)),
+                ('Python', at(10, 30), at(11, 30)),
+                ('Lunch', at(11), at(12))]]
+
+    def get_count(self, timeslot):
+        return TimeSlot.objects.get(pk=timeslot.pk).bookmark_count
+
+
+class TestAgenda(AgendaTestCase):
+
+    def test_bookmark_str(self):
+        timeslot = self.timeslots[0]
+        timeslot.name = 'Café'
+        bookmark = Bookmark(timeslot=timeslot, user=self.user)
+
+        self.assertEqual('Café', six.text_type(bookmark))
+
+    def test_find_clashes(self):
+        keynote, django, python, lunch = self.timeslots
+
+        clashes = agenda.find_clashes(self.timeslots)
+
+        self.assertEqual([], clashes[keynote.pk])
+        self.assertEqual([python], clashes[django.pk])
+        self.assertEqual([django, lunch], clashes[python.pk])
+        self.assertEqual([python], clashes[lunch.pk])
+
+    def test_add_and_remove_maintain_count(self):
+        timeslot = self.timeslots[0]
+
+        self.assertTrue(agenda.add(timeslot, user=self.user))
+        self.assertFalse(agenda.add(timeslot, user=self.user))
+        self.assertTrue(agenda.add(timeslot, session_key='abc'))
+        self.assertEqual(2, self.get_count(timeslot))
+
+        self.assertTrue(agenda.remove(timeslot, user=self.user))
+        self.assertFalse(agenda.remove(timeslot, user=self.user))
+        self.assertEqual(1, self.get_count(timeslot))
+
+    def test_deleting_user_maintains_count(self):
+        agenda.add(self.timeslots[0], user=self.user)
+        agenda.add(self.timeslots[0], session_key='abc')
+
+        self.user.delete()
+
+        self.assertEqual(1, self.get_count(self.timeslots[0]))
+
+    def test_recount(self):
+        agenda.add(self.timeslots[0], user=self.user)
+        TimeSlot.objects.filter(pk=self.timeslots[0].pk).update(
+            bookmark_count=5)
+        TimeSlot.objects.filter(pk=self.timeslots[1].pk).update(
+            bookmark_count=2)
+
+        self.assertEqual(2, agenda.recount())
+        self.assertEqual([1, 0, 0, 0], [self.get_count(timeslot)
+                                        for timeslot in self.timeslots])
+
+    def test_get_agenda(self):
+        for timeslot in self.timeslots[1:]:
+            agenda.add(timeslot, user=self.user)
+            timeslot.presenters.add(PresenterFactory())
+            timeslot.resources.add(ResourceFactory())
+        agenda.add(TimeSlotFactory(), user=self.user)
+        agenda.add(self.timeslots[0], session_key='abc')
+
+        with self.assertNumQueries(3):
+            timeslots = agenda.get_agenda(self.conference, user=self.user)
+            for timeslot in timeslots:
+                timeslot.presenter_names, timeslot.resource_names
+
+        self.assertEqual(self.timeslots[1:], timeslots)
+        self.assertEqual([timeslots[1]], timeslots[0].clashes)
+        self.assertEqual([1, 1, 1], [timeslot.bookmark_count
+                                     for timeslot in timeslots])
+
+    def test_cloned_timeslots_have_no_bookmarks(self):
+        agenda.add(self.timeslots[0], user=self.user)
+
+        copy = editing.clone(self.conference)
+
+        self.assertEqual([0] * 4, list(copy.timeslots.values_list(
+            'bookmark_count', flat=True)))
+
+
+class TestAgendaViews(AgendaTestCase):
+
+    def setUp(self):
+        super(TestAgendaViews, self).setUp()
+        self.agenda_url = reverse('conference:conference_agenda',
+                                  kwargs={'slug': self.conference.slug})
+        self.bookmark_url = reverse('conference:conference_bookmark',
+                                    kwargs={'slug': self.conference.slug})
+
+    def star(self, timeslot, **data):
+        data['timeslot'] = str(timeslot.pk)
+        return self.client.post(self.bookmark_url, data)
+
+    def test_anonymous_agenda(self):
+        response = self.client.get(self.agenda_url)
+        self.assertContains(response, 'Star sessions')
+
+        response = self.star(self.timeslots[1])
+        self.assertRedirects(response, self.agenda_url)
+        self.star(self.timeslots[2])
+
+        response = self.client.get(self.agenda_url)
+        self.assertEqual(self.timeslots[1:3], response.context['timeslots'])
+        self.assertContains(response, 'Clashes with Python')
+        self.assertContains(response, 'Starred by 1')
+        self.assertEqual(2, Bookmark.objects.filter(
+            session_key__isnull=False).count())
+
+    def test_unstar(self):
+        self.star(self.timeslots[0])
+
+        self.star(self.timeslots[0], remove='')
+
+        self.assertEqual(0, Bookmark.objects.count())
+        self.assertEqual(0, self.get_count(self.timeslots[0]))
+
+    def test_redirects_to_next(self):
+        url = reverse('conference:conference_search',
+                      kwargs={'slug': self.conference.slug}) + '?q=django'
+
+        self.assertRedirects(self.star(self.timeslots[0], next=url), url)
+        self.assertRedirects(
+            self.star(self.timeslots[0], next='http://example.com/'),
+            self.agenda_url)
+
+    def test_unknown_timeslot(self):
+        self.assertEqual(404, self.star(TimeSlotFactory()).status_code)
+        self.assertEqual(404, self.client.post(
+            self.bookmark_url, {'timeslot': 'invalid'}).status_code)
+
+    def test_user_agenda(self):
+        self.client.force_login(self.user)
+        self.star(self.timeslots[0])
+
+        response = self.client.get(self.agenda_url)
+
+        self.assertEqual(self.timeslots[:1], response.context['timeslots'])
+        self.assertEqual(self.user, Bookmark.objects.get().user)
+
+    def test_login_moves_anonymous_bookmarks(self):
+        agenda.add(self.timeslots[0], user=self.user)
+        self.star(self.timeslots[0])
+        self.star(self.timeslots[1])
+
+        self.client.login(username='ada', password='password')
+
+        self.assertEqual(set(self.timeslots[:2]), set(
+            bookmark.timeslot for bookmark in Bookmark.objects.all()))
+        self.assertEqual(2, Bookmark.objects.filter(user=self.user).count())
+        self.assertEqual([1, 1], [self.get_count(timeslot)
+                                  for timeslot in self.timeslots[:2]])
+
+    def test_agenda_query_count_is_independent_of_bookmarks(self):
+        self.client.force_login(self.user)
+        self.star(self.timeslots[0])
+        with self.assertNumQueries(6):
+            self.client.get(self.agenda_url)
+
+        for timeslot in self.timeslots[1:]:
+            self.star(timeslot)
+            timeslot.presenters.add(PresenterFactory())
+        with self.assertNumQueries(6):
+            self.client.get(self.agenda_url)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Presenter, Resource, TimeSlot
+from conference.serializers import FieldError, TimeSlotSerializer
+from dateutil.relativedelta import relativedelta
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+import json
+
+
+class TestTimeSlotSerializer(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.timeslot = TimeSlotFactory(name='Keynote', start_at=self.now)
+        self.timeslot.presenters.add(
+            Presenter.objects.create(name='Bob', biography='Bio'),
+            Presenter.objects.create(name='Ada'))
+        self.timeslot.resources.add(Resource.objects.create(
+            name='Hall A', venue=VenueFactory(name='Centre')))
+        self.other_timeslot = TimeSlotFactory(
+            conference=self.timeslot.conference, start_at=self.now)
+
+    def serialize(self, fields=None):
+        serializer = TimeSlotSerializer(fields=fields)
+        return serializer.serialize(TimeSlot.objects.filter(
+            pk=self.timeslot.pk))
+
+    def test_serializes_selected_fields(self):
+        data = self.serialize(['name', 'start_at'])
+
+        self.assertEqual([{'name': 'Keynote', 'start_at': self.now}], data)
+
+    def test_serializes_nested_presenters_in_name_order(self):
+        data = self.serialize(['name', 'presenters.name'])
+
+        self.assertEqual([{'name': 'Keynote', 'presenters': [
+            {'name': 'Ada'}, {'name': 'Bob'}]}], data)
+
+    def test_serializes_nested_resource_venues(self):
+        data = self.serialize(['resources.name', 'resources.venue.name'])
+
+        self.assertEqual([{'resources': [
+            {'name': 'Hall A', 'venue': {'name': 'Centre'}}]}], data)
+
+    def test_serializes_empty_related_lists(self):
+        serializer = TimeSlotSerializer(fields=['presenters.name'])
+
+        data = serializer.serialize(TimeSlot.objects.filter(
+            pk=self.other_timeslot.pk))
+
+        self.assertEqual([{'presenters': []}], data)
+
+    def test_queries_only_selected_columns(self):
+        with self.assertNumQueries(1) as context:
+            self.serialize(['name'])
+
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_makes_a_query_for_each_selected_relation(self):
+        with self.assertNumQueries(3):
+            self.serialize()
+
+    def test_rejects_unknown_field(self):
+        for field in ['unknown', 'presenters.email', 'venue.name']:
+            with self.assertRaises(FieldError):
+                TimeSlotSerializer(fields=[field])
+
+
+class TestScheduleView(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory()
+        self.past_timeslot = TimeSlotFactory(
+            conference=self.conference, name='Past',
+            start_at=self.now + relativedelta(hours=-2),
+            end_at=self.now + relativedelta(hours=-1))
+        self.current_timeslot = TimeSlotFactory(
+            conference=self.conference, name='Current',
+            start_at=self.now + relativedelta(hours=-1),
+            end_at=self.now + relativedelta(hours=+1))
+        self.future_timeslot = TimeSlotFactory(
+            conference=self.conference, name='Future',
+            start_at=self.now + relativedelta(hours=+1),
+            end_at=self.now + relativedelta(hours=+2))
+        self.url = reverse('conference:conference_schedule',
+                           kwargs={'slug': self.conference.slug})
+
+    def get(self, headers=None, **params):
+        with freeze_time(self.now):
+            return self.client.get(self.url, params, **(headers or {}))
+
+    def test_returns_conference_and_timeslots(self):
+        data = json.loads(self.get().content.decode('utf-8'))
+
+        self.assertEqual(self.conference.slug, data['conference']['slug'])
+        self.assertEqual(['Past', 'Current', 'Future'],
+                         [timeslot['name'] for timeslot in data['timeslots']])
+        self.assertEqual(str(self.past_timeslot.pk),
+                         data['timeslots'][0]['id'])
+
+    def test_returns_selected_fields(self):
+        response = self.get(fields='name,presenters.name')
+        data = json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual({'name': 'Past', 'presenters': []},
+                         data['timeslots'][0])
+
+    def test_filters_timeslots(self):
+        for when, name in [('past', 'Past'), ('current', 'Current'),
+                           ('future', 'Future')]:
+            data = json.loads(self.get(when=when).content.decode('utf-8'))
+            self.assertEqual([name], [timeslot['name']
+                                      for timeslot in data['timeslots']])
+
+    def test_rejects_unknown_field(self):
+        response = self.get(fields='name,unknown')
+
+        self.assertEqual(400, response.status_code)
+
+    def test_rejects_unknown_filter(self):
+        response = self.get(when='someday')
+
+        self.assertEqual(400, response.status_code)
+
+    def test_not_modified_for_matching_etag(self):
+        etag = self.get()['ETag']
+
+        response = self.get(headers={'HTTP_IF_NONE_MATCH': etag})
+
+        self.assertEqual(304, response.status_code)
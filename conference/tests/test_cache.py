@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Presenter, Resource, TimeSlot
+from conference.views.conference import DetailView
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.utils import timezone
+from freezegun import freeze_time
+import unittest
+
+try:  # Python 3
+    from unittest import mock
+except ImportError:  # Python 2
+    import mock
+
+
+# Test cases never commit, so run on-commit callbacks at once.
+@mock.patch.object(cache, 'on_commit', new=lambda func: func())
+class TestScheduleCacheVersion(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.conference = ConferenceFactory()
+        self.timeslot = TimeSlotFactory(conference=self.conference)
+        self.venue = VenueFactory()
+        self.resource = Resource.objects.create(name='Room',
+                                                venue=self.venue)
+        self.presenter = Presenter.objects.create(name='Presenter')
+        self.timeslot.presenters.add(self.presenter)
+        self.timeslot.resources.add(self.resource)
+        self.version = cache.get_version(self.conference.pk)
+
+    def assertVersionBumped(self):
+        self.assertNotEqual(self.version,
+                            cache.get_version(self.conference.pk))
+
+    def assertVersionNotBumped(self):
+        self.assertEqual(self.version, cache.get_version(self.conference.pk))
+
+    def test_bumped_when_conference_saved(self):
+        self.conference.save()
+        self.assertVersionBumped()
+
+    def test_bumped_when_timeslot_saved(self):
+        self.timeslot.save()
+        self.assertVersionBumped()
+
+    def test_bumped_when_timeslot_moved(self):
+        other = ConferenceFactory()
+        version = cache.get_version(other.pk)
+        self.timeslot.conference = other
+        self.timeslot.save()
+        self.assertVersionBumped()
+        self.assertNotEqual(version, cache.get_version(other.pk))
+
+    def test_bumped_when_timeslot_created(self):
+        TimeSlotFactory(conference=self.conference)
+        self.assertVersionBumped()
+
+    def test_bumped_when_timeslot_deleted(self):
+        self.timeslot.delete()
+        self.assertVersionBumped()
+
+    def test_not_bumped_when_other_conference_timeslot_saved(self):
+        TimeSlotFactory()
+        self.assertVersionNotBumped()
+
+    def test_bumped_when_presenter_saved(self):
+        self.presenter.save()
+        self.assertVersionBumped()
+
+    def test_bumped_when_presenter_deleted(self):
+        self.presenter.delete()
+        self.assertVersionBumped()
+
+    def test_not_bumped_when_unrelated_presenter_saved(self):
+        Presenter.objects.create(name='Other presenter')
+        self.assertVersionNotBumped()
+
+    def test_bumped_when_presenter_added_to_timeslot(self):
+        self.timeslot.presenters.add(Presenter.objects.create(name='Other'))
+        self.assertVersionBumped()
+
+    def test_bumped_when_timeslot_added_to_presenter(self):
+        presenter = Presenter.objects.create(name='Other')
+        version = cache.get_version(self.conference.pk)
+        presenter.timeslots.add(self.timeslot)
+        self.assertNotEqual(version, cache.get_version(self.conference.pk))
+
+    def test_bumped_when_presenter_timeslots_cleared(self):
+        self.presenter.timeslots.clear()
+        self.assertVersionBumped()
+
+    def test_bumped_when_resource_saved(self):
+        self.resource.save()
+        self.assertVersionBumped()
+
+    def test_bumped_when_timeslot_resources_cleared(self):
+        self.timeslot.resources.clear()
+        self.assertVersionBumped()
+
+    def test_bumped_when_venue_saved(self):
+        self.venue.save()
+        self.assertVersionBumped()
+
+    def test_bumped_when_venue_added_to_conference(self):
+        self.conference.venues.add(VenueFactory())
+        self.assertVersionBumped()
+
+    def test_bumped_when_conference_added_to_venue(self):
+        venue = VenueFactory()
+        version = cache.get_version(self.conference.pk)
+        venue.conferences.add(self.conference)
+        self.assertNotEqual(version, cache.get_version(self.conference.pk))
+
+    def test_bumped_when_version_evicted(self):
+        cache.get_cache().delete(cache.get_version_key(self.conference.pk))
+        cache.bump_version(self.conference.pk)
+        self.assertVersionBumped()
+
+
+@unittest.skipUnless(hasattr(transaction, 'on_commit'),
+                     'Django 1.8 has no on-commit hooks.')
+class TestScheduleCacheVersionOnCommit(TransactionTestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.timeslot = TimeSlotFactory()
+        self.conference_pk = self.timeslot.conference_id
+        self.version = cache.get_version(self.conference_pk)
+
+    def test_bumped_when_change_committed(self):
+        with transaction.atomic():
+            self.timeslot.save()
+            self.assertEqual(self.version,
+                             cache.get_version(self.conference_pk))
+
+        self.assertNotEqual(self.version,
+                            cache.get_version(self.conference_pk))
+
+    def test_not_bumped_when_change_rolled_back(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.timeslot.save()
+                raise ValueError
+
+        self.assertEqual(self.version, cache.get_version(self.conference_pk))
+
+
+class TestScheduleCacheTimeout(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+
+    def test_returns_seconds_until_boundary(self):
+        timeout = cache.get_timeout(self.now + relativedelta(minutes=+5),
+                                    at=self.now)
+        self.assertEqual(300, timeout)
+
+    def test_returns_at_least_one_second(self):
+        timeout = cache.get_timeout(self.now, at=self.now)
+        self.assertEqual(1, timeout)
+
+    def test_returns_maximum_timeout_without_boundary(self):
+        with self.settings(CONFERENCE_CACHE_TIMEOUT=60):
+            self.assertEqual(60, cache.get_timeout(None))
+
+    def test_returns_maximum_timeout_for_distant_boundary(self):
+        with self.settings(CONFERENCE_CACHE_TIMEOUT=60):
+            timeout = cache.get_timeout(self.now + relativedelta(days=+1),
+                                        at=self.now)
+        self.assertEqual(60, timeout)
+
+
+@mock.patch.object(cache, 'on_commit', new=lambda func: func())
+class TestConferenceDetailViewCache(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory()
+        self.timeslot = TimeSlotFactory(
+            conference=self.conference, name='Keynote',
+            start_at=self.now + relativedelta(minutes=+30),
+            end_at=self.now + relativedelta(minutes=+90))
+        self.url = self.conference.get_absolute_url()
+
+    def test_serves_cached_page(self):
+        with freeze_time(self.now):
+            self.client.get(self.url)
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url)
+
+        self.assertContains(response, '<h2>Next</h2>')
+
+    def test_rerenders_page_when_schedule_changed(self):
+        with freeze_time(self.now):
+            self.client.get(self.url)
+            self.timeslot.name = 'Opening keynote'
+            self.timeslot.save()
+            response = self.client.get(self.url)
+
+        self.assertContains(response, 'Opening keynote')
+
+    def test_rerenders_page_when_boundary_passed(self):
+        with freeze_time(self.now):
+            self.client.get(self.url)
+        with freeze_time(self.now + relativedelta(minutes=+30)):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, '<h2>Now</h2>')
+
+    def test_reuses_cached_schedule_data_when_boundary_passed(self):
+        with freeze_time(self.now):
+            self.client.get(self.url)
+        with freeze_time(self.now + relativedelta(minutes=+30)):
+            with self.assertNumQueries(1):
+                self.client.get(self.url)
+
+
+@mock.patch.object(cache, 'on_commit', new=lambda func: func())
+class TestConferenceDetailViewFragmentCache(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory()
+        self.timeslot = TimeSlotFactory(
+            conference=self.conference, name='Keynote',
+            start_at=self.now + relativedelta(minutes=+30),
+            end_at=self.now + relativedelta(minutes=+90))
+        self.view = DetailView.as_view(cache_page=False)
+
+    def get(self):
+        request = RequestFactory().get('/')
+        response = self.view(request, slug=self.conference.slug)
+        response.render()
+        return response
+
+    def test_does_not_load_timeslots_when_fragments_cached(self):
+        with freeze_time(self.now):
+            self.get()
+            with self.assertNumQueries(1):
+                response = self.get()
+
+        schedule = response.context_data['schedule']
+        self.assertNotIn('timeslots', schedule.__dict__)
+        self.assertContains(response, '<h2>Next</h2>')
+        self.assertContains(response, '<h2>Schedule</h2>')
+
+    def test_rerenders_live_fragment_only_when_boundary_passed(self):
+        with freeze_time(self.now):
+            self.get()
+        TimeSlot.objects.update(name='Renamed without signals')
+        cache.get_cache().delete(
+            cache.make_key(self.conference.pk, 'timeslots'))
+
+        with freeze_time(self.now + relativedelta(minutes=+30)):
+            response = self.get()
+
+        self.assertContains(response, '<h2>Now</h2>')
+        self.assertContains(response, 'Renamed without signals', count=1)
+        self.assertContains(response, 'Keynote', count=1)
+
+    def test_rerenders_all_fragments_when_schedule_changed(self):
+        with freeze_time(self.now):
+            self.get()
+            self.timeslot.name = 'Opening keynote'
+            self.timeslot.save()
+            response = self.get()
+
+        self.assertContains(response, 'Opening keynote', count=2)
+        self.assertNotContains(response, ': Keynote</h3>')
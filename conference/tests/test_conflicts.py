@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.admin import TimeSlotAdminForm
+from conference.conflicts import Conflict, find_overlaps
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.models import Presenter, Resource, TimeSlot, Venue
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import six, timezone
+
+
+class TestFindOverlaps(TestCase):
+
+    def test_finds_overlapping_pairs(self):
+        intervals = [('a', 1, 3, 'x'), ('a', 2, 4, 'y'), ('a', 3, 5, 'z')]
+
+        self.assertEqual([('a', 'x', 'y'), ('a', 'y', 'z')],
+                         list(find_overlaps(intervals)))
+
+    def test_adjacent_intervals_do_not_overlap(self):
+        intervals = [('a', 2, 3, 'y'), ('a', 1, 2, 'x')]
+
+        self.assertEqual([], list(find_overlaps(intervals)))
+
+    def test_finds_every_pair_within_a_long_interval(self):
+        intervals = [('a', 0, 10, 'w'), ('a', 1, 2, 'x'), ('a', 3, 4, 'y'),
+                     ('a', 3, 5, 'z')]
+
+        self.assertEqual(
+            [('a', 'w', 'x'), ('a', 'w', 'y'), ('a', 'w', 'z'),
+             ('a', 'y', 'z')],
+            sorted(find_overlaps(intervals)))
+
+    def test_groups_are_independent(self):
+        intervals = [('a', 1, 3, 'x'), ('b', 2, 4, 'y')]
+
+        self.assertEqual([], list(find_overlaps(intervals)))
+
+
+class TestTimeSlotQuerySetConflicts(TestCase):
+
+    def setUp(self):
+        self.start = timezone.datetime(2016, 1, 2, 9, tzinfo=timezone.utc)
+        self.conference = ConferenceFactory()
+        self.room = Resource.objects.create(name='Room',
+                                            venue=Venue.objects.create())
+        self.presenter = Presenter.objects.create(name='Ada')
+        self.first = self.create(0, 60)
+        self.second = self.create(30, 90)
+        self.third = self.create(90, 120)
+
+    def create(self, start, end, **kwargs):
+        return TimeSlotFactory(
+            conference=kwargs.pop('conference', self.conference),
+            start_at=self.start + timezone.timedelta(minutes=start),
+            end_at=self.start + timezone.timedelta(minutes=end), **kwargs)
+
+    def test_no_conflicts_without_shared_objects(self):
+        self.assertEqual([], TimeSlot.objects.conflicts())
+
+    def test_finds_resource_conflicts(self):
+        for timeslot in [self.first, self.second, self.third]:
+            timeslot.resources.add(self.room)
+
+        self.assertEqual(
+            [Conflict('resources', self.room.pk, self.first.pk,
+                      self.second.pk)],
+            TimeSlot.objects.conflicts())
+
+    def test_finds_presenter_conflicts(self):
+        self.first.presenters.add(self.presenter)
+        self.second.presenters.add(self.presenter)
+
+        self.assertEqual(
+            [Conflict('presenters', self.presenter.pk, self.first.pk,
+                      self.second.pk)],
+            TimeSlot.objects.conflicts())
+
+    def test_limited_to_fields(self):
+        self.first.presenters.add(self.presenter)
+        self.second.presenters.add(self.presenter)
+
+        self.assertEqual([], TimeSlot.objects.conflicts(fields=['resources']))
+
+    def test_limited_to_queryset(self):
+        other = self.create(0, 60, conference=ConferenceFactory())
+        self.first.resources.add(self.room)
+        other.resources.add(self.room)
+
+        self.assertEqual([], self.conference.timeslots.conflicts())
+        self.assertEqual(1, len(TimeSlot.objects.conflicts()))
+
+    def test_single_query_per_field(self):
+        self.first.resources.add(self.room)
+        self.second.resources.add(self.room)
+
+        with self.assertNumQueries(2):
+            TimeSlot.objects.conflicts()
+
+    def test_overlapping(self):
+        timeslots = TimeSlot.objects.overlapping(
+            self.start + timezone.timedelta(minutes=60),
+            self.start + timezone.timedelta(minutes=90))
+
+        self.assertEqual([self.second], list(timeslots))
+
+
+class TestTimeSlotAdminForm(TestCase):
+
+    def setUp(self):
+        timezone.activate(timezone.utc)
+        self.addCleanup(timezone.deactivate)
+        self.timeslot = TimeSlotFactory(
+            start_at=timezone.datetime(2016, 1, 2, 9, tzinfo=timezone.utc))
+        self.room = Resource.objects.create(name='Room',
+                                            venue=Venue.objects.create())
+        self.timeslot.resources.add(self.room)
+
+    def get_form(self, start_at, end_at, instance=None):
+        return TimeSlotAdminForm(instance=instance, data={
+            'conference': self.timeslot.conference.pk, 'name': 'Talk',
+            'start_at': start_at, 'end_at': end_at,
+            'resources': [self.room.pk]})
+
+    def test_overlapping_resource_is_invalid(self):
+        form = self.get_form('2016-01-02 09:30', '2016-01-02 10:30')
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('resources', form.errors)
+        self.assertIn(self.timeslot.name, form.errors['resources'][0])
+
+    def test_adjacent_time_slot_is_valid(self):
+        form = self.get_form('2016-01-02 10:00', '2016-01-02 11:00')
+
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_time_slot_does_not_conflict_with_itself(self):
+        form = self.get_form('2016-01-02 09:30', '2016-01-02 10:30',
+                             instance=self.timeslot)
+
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+class TestCheckConflictsCommand(TestCase):
+
+    def call(self, *args):
+        stdout = six.StringIO()
+        call_command('check_conflicts', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_no_conflicts(self):
+        self.assertIn('No conflicts found.', self.call())
+
+    def test_reports_conflicts(self):
+        start_at = timezone.datetime(2016, 1, 2, 9, tzinfo=timezone.utc)
+        presenter = Presenter.objects.create(name='Ada')
+        first = TimeSlotFactory(name='First', start_at=start_at)
+        second = TimeSlotFactory(
+            name='Second', start_at=start_at + timezone.timedelta(minutes=30))
+        first.presenters.add(presenter)
+        second.presenters.add(presenter)
+        stdout = six.StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command('check_conflicts', stdout=stdout)
+
+        self.assertIn('Ada: "First" overlaps "Second" (presenters).',
+                      stdout.getvalue())
+        self.assertIn('No conflicts found.', self.call(
+            first.conference.slug))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import editing
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Conference, Presenter, Resource, TimeSlot
+from conference.signals import schedule_changed
+from django.test import TestCase
+from django.utils import timezone
+import datetime
+
+
+def at(hour, minute=0):
+    return timezone.datetime(2016, 1, 2, hour, minute, tzinfo=timezone.utc)
+
+
+class TestEditing(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.venue = VenueFactory()
+        self.conference.venues.add(self.venue)
+        self.room = Resource.objects.create(name='Room', venue=self.venue)
+        self.hall = Resource.objects.create(name='Hall', venue=self.venue)
+        self.presenter = Presenter.objects.create(name='Ada')
+        self.first = TimeSlotFactory(conference=self.conference,
+                                     start_at=at(9), end_at=at(10))
+        self.first.presenters.add(self.presenter)
+        self.first.resources.add(self.room)
+        self.second = TimeSlotFactory(conference=self.conference,
+                                      start_at=at(10), end_at=at(11))
+        self.second.resources.add(self.room, self.hall)
+        self.other = TimeSlotFactory(start_at=at(9), end_at=at(10))
+        self.sent = []
+        schedule_changed.connect(self.receiver)
+
+    def tearDown(self):
+        schedule_changed.disconnect(self.receiver)
+
+    def receiver(self, sender, **kwargs):
+        self.sent.append(kwargs)
+
+    def test_shift(self):
+        queryset = TimeSlot.objects.filter(conference=self.conference)
+
+        with self.assertNumQueries(9):
+            pks = editing.shift(queryset.filter(resources=self.room),
+                                datetime.timedelta(minutes=-15))
+
+        self.assertEqual({self.first.pk, self.second.pk}, set(pks))
+        self.assertEqual(
+            [(at(8, 45), at(9, 45)), (at(9, 45), at(10, 45))],
+            list(queryset.values_list('start_at', 'end_at')))
+        self.assertEqual(at(9),
+                         TimeSlot.objects.get(pk=self.other.pk).start_at)
+
+    def test_shift_sends_schedule_changed(self):
+        editing.shift(TimeSlot.objects.filter(pk=self.first.pk),
+                      datetime.timedelta(hours=1))
+
+        self.assertEqual([{'conferences': {self.conference.pk},
+                           'timeslots': {self.first.pk}, 'signal':
+                           schedule_changed}], self.sent)
+
+    def test_reassign(self):
+        pks = editing.reassign(
+            TimeSlot.objects.filter(conference=self.conference), self.hall)
+
+        self.assertEqual({self.first.pk, self.second.pk}, set(pks))
+        self.assertEqual([self.hall], list(self.first.resources.all()))
+        self.assertEqual([self.hall], list(self.second.resources.all()))
+        self.assertEqual([self.presenter], list(self.first.presenters.all()))
+        self.assertEqual({self.conference.pk}, self.sent[-1]['conferences'])
+
+    def test_clone(self):
+        copy = editing.clone(self.conference)
+
+        self.assertEqual('{} (copy)'.format(self.conference.name), copy.name)
+        self.assertEqual('{}-copy'.format(self.conference.slug), copy.slug)
+        self.assertEqual([self.venue], list(copy.venues.all()))
+        timeslots = list(copy.timeslots.order_by('start_at'))
+        self.assertEqual([at(9), at(10)],
+                         [timeslot.start_at for timeslot in timeslots])
+        self.assertNotIn(self.first.pk,
+                         [timeslot.pk for timeslot in timeslots])
+        self.assertEqual([self.presenter], list(timeslots[0].presenters.all()))
+        self.assertEqual([self.room], list(timeslots[0].resources.all()))
+        self.assertEqual([self.hall, self.room],
+                         list(timeslots[1].resources.all()))
+        self.assertEqual(2, self.conference.timeslots.count())
+        self.assertEqual({'conferences': {copy.pk},
+                          'timeslots': {timeslot.pk for timeslot in timeslots},
+                          'signal': schedule_changed}, self.sent[-1])
+
+    def test_clone_to_start_date(self):
+        self.conference.start_date = datetime.date(2016, 1, 2)
+        self.conference.end_date = datetime.date(2016, 1, 3)
+
+        copy = editing.clone(self.conference, datetime.date(2017, 1, 7))
+
+        self.assertEqual(datetime.date(2017, 1, 7), copy.start_date)
+        self.assertEqual(datetime.date(2017, 1, 8), copy.end_date)
+        offset = datetime.timedelta(days=371)
+        self.assertEqual([(at(9) + offset, at(10) + offset),
+                          (at(10) + offset, at(11) + offset)],
+                         list(copy.timeslots.order_by('start_at').values_list(
+                             'start_at', 'end_at')))
+        self.assertEqual([], TimeSlot.objects.conflicts())
+
+    def test_clone_to_start_date_without_conference_dates(self):
+        copy = editing.clone(self.conference, datetime.date(2016, 1, 9))
+
+        first = copy.timeslots.order_by('start_at')[0]
+        self.assertEqual(at(9) + datetime.timedelta(days=7), first.start_at)
+
+    def test_clone_query_count_is_independent_of_schedule(self):
+        with self.assertNumQueries(19):
+            editing.clone(self.conference)
+        for _ in range(5):
+            TimeSlotFactory(conference=self.conference).resources.add(
+                self.room)
+
+        with self.assertNumQueries(19):
+            editing.clone(self.conference)
+
+    def test_get_copy_slug(self):
+        ConferenceFactory(slug='pycon-copy')
+        ConferenceFactory(slug='pycon-copy-2')
+
+        self.assertEqual('pycon-copy-3', editing.get_copy_slug('pycon'))
+        self.assertEqual('devcon-copy', editing.get_copy_slug('devcon'))
+        self.assertEqual('x' * 41 + '-copy', editing.get_copy_slug('x' * 50))
+        self.assertFalse(Conference.objects.filter(slug='devcon').exists())
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache
+from conference.export import StaticExporter, get_path
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import six, timezone
+from freezegun import freeze_time
+import json
+import os
+import shutil
+import tempfile
+
+try:  # Python 3
+    from unittest import mock
+except ImportError:  # Python 2
+    import mock
+
+
+class TestGetPath(TestCase):
+
+    def test_exports_directory_urls_as_index(self):
+        self.assertEqual('index.html', get_path('/'))
+        self.assertEqual('conferences/pycon/index.html',
+                         get_path('/conferences/pycon/'))
+
+    def test_exports_file_urls_as_is(self):
+        self.assertEqual('conferences/pycon/schedule.json',
+                         get_path('/conferences/pycon/schedule.json'))
+
+
+@mock.patch.object(cache, 'on_commit', new=lambda func: func())
+class TestStaticExporter(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.now = timezone.make_aware(timezone.datetime(2016, 1, 2, 11, 12),
+                                       timezone.utc)
+        with freeze_time(self.now + relativedelta(days=-1)):
+            self.conference = ConferenceFactory(slug='pycon')
+            self.other = ConferenceFactory(slug='djangocon')
+            self.timeslot = TimeSlotFactory(
+                conference=self.conference, name='Keynote',
+                start_at=self.now + relativedelta(minutes=-30),
+                end_at=self.now + relativedelta(minutes=+30))
+        self.exporter = StaticExporter(self.directory, host='testserver',
+                                       processes=1)
+
+    def export(self, at=None, **kwargs):
+        with freeze_time(at or self.now):
+            return self.exporter.export(**kwargs)
+
+    def read(self, path):
+        with open(os.path.join(self.directory, path), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def test_exports_pages(self):
+        result = self.export()
+
+        self.assertEqual(['djangocon', 'pycon'], result['exported'])
+        self.assertIn('/conferences/pycon/',
+                      self.read('conferences/index.html'))
+        self.assertIn('Keynote', self.read('conferences/pycon/index.html'))
+        schedule = json.loads(self.read('conferences/pycon/schedule.json'))
+        self.assertEqual(['Keynote'], [timeslot['name'] for timeslot in
+                                       schedule['timeslots']])
+        self.assertIn('SUMMARY:Keynote',
+                      self.read('conferences/pycon/schedule.ics'))
+
+    def test_writes_manifest(self):
+        self.export()
+
+        manifest = json.loads(self.read('manifest.json'))
+        self.assertEqual(
+            ['conferences/pycon/index.html',
+             'conferences/pycon/schedule.ics',
+             'conferences/pycon/schedule.json'],
+            sorted(manifest['conferences']['pycon']['files']))
+        self.assertEqual(['conferences/index.html'],
+                         list(manifest['index']['files']))
+
+    def test_leaves_no_temporary_files(self):
+        self.export()
+
+        self.assertEqual(['djangocon', 'index.html', 'pycon'],
+                         sorted(os.listdir(os.path.join(self.directory,
+                                                        'conferences'))))
+
+    def test_skips_unchanged_conferences(self):
+        self.export()
+        path = os.path.join(self.directory, 'conferences/pycon/index.html')
+        os.utime(path, (0, 0))
+
+        with self.assertNumQueries(2):
+            result = self.export()
+
+        self.assertEqual([], result['exported'])
+        self.assertEqual(['djangocon', 'pycon'], result['unchanged'])
+        self.assertEqual(0, os.path.getmtime(path))
+
+    def test_exports_changed_conference(self):
+        self.export()
+
+        with freeze_time(self.now):
+            self.timeslot.name = 'Opening keynote'
+            self.timeslot.save()
+        result = self.export()
+
+        self.assertEqual(['pycon'], result['exported'])
+        self.assertIn('Opening keynote',
+                      self.read('conferences/pycon/index.html'))
+
+    def test_exports_conference_when_boundary_passed(self):
+        self.export()
+
+        result = self.export(at=self.now + relativedelta(hours=1))
+
+        self.assertEqual(['pycon'], result['exported'])
+
+    def test_removes_deleted_conference(self):
+        self.export()
+
+        self.other.delete()
+        result = self.export()
+
+        self.assertEqual(['djangocon'], result['removed'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'conferences/djangocon')))
+        self.assertNotIn('/conferences/djangocon/',
+                         self.read('conferences/index.html'))
+
+    def test_exports_all_conferences_when_forced(self):
+        self.export()
+
+        result = self.export(force=True)
+
+        self.assertEqual(['djangocon', 'pycon'], result['exported'])
+
+    def test_removes_deleted_conference_when_forced(self):
+        self.export()
+
+        self.other.delete()
+        result = self.export(force=True)
+
+        self.assertEqual(['djangocon'], result['removed'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'conferences/djangocon')))
+
+    def test_removes_deleted_conference_when_host_changed(self):
+        self.export()
+
+        self.other.delete()
+        self.exporter.host = 'example.com'
+        result = self.export()
+
+        self.assertEqual(['pycon'], result['exported'])
+        self.assertEqual(['djangocon'], result['removed'])
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'conferences/djangocon')))
+
+    def test_rewrites_missing_files(self):
+        self.export()
+        os.remove(os.path.join(self.directory,
+                               'conferences/pycon/schedule.ics'))
+
+        self.export(force=True)
+
+        self.assertIn('SUMMARY:Keynote',
+                      self.read('conferences/pycon/schedule.ics'))
+
+
+class TestExportStaticCommand(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        ConferenceFactory()
+
+    def call(self, *args):
+        stdout = six.StringIO()
+        call_command('export_static', self.directory, '--host', 'testserver',
+                     '--processes', '1', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_exports_conferences(self):
+        output = self.call()
+
+        self.assertIn('Exported 1 conferences (0 unchanged, 0 removed)',
+                      output)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, 'manifest.json')))
+
+    def test_reports_unchanged_conferences(self):
+        self.call()
+
+        output = self.call()
+
+        self.assertIn('Exported 0 conferences (1 unchanged, 0 removed)',
+                      output)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import (PresenterFactory, ResourceFactory,
+                                  ScheduleGenerator)
+from conference.models import Conference, Presenter, Resource, TimeSlot
+from conference.signals import schedule_changed
+from django.test import TestCase
+from django.utils import timezone
+import datetime
+
+
+class TestFactories(TestCase):
+
+    def test_presenter_factory(self):
+        presenter = PresenterFactory()
+
+        self.assertTrue(presenter.name.startswith('Presenter '))
+
+    def test_resource_factory(self):
+        resource = ResourceFactory()
+
+        self.assertTrue(Resource.objects.filter(pk=resource.pk,
+                                                venue=resource.venue).exists())
+
+
+class TestScheduleGenerator(TestCase):
+
+    def setUp(self):
+        self.start_date = datetime.date(2016, 5, 30)
+
+    def create(self, seed=0, **kwargs):
+        kwargs.setdefault('start_date', self.start_date)
+        return ScheduleGenerator(seed=seed).create(**kwargs)
+
+    def get_schedule(self, conference):
+        return [(timeslot.start_at, timeslot.end_at,
+                 timeslot.resources.get().name[:4],
+                 timeslot.presenters.count())
+                for timeslot in conference.timeslots.order_by(
+                    'start_at', 'resources__name')]
+
+    def test_creates_conference_graph(self):
+        conferences = self.create(conferences=2, timeslots=50, resources=4,
+                                  venues=2, presenters_per_timeslot=(1, 3))
+
+        self.assertEqual(2, Conference.objects.count())
+        for conference in conferences:
+            timeslots = TimeSlot.objects.filter(conference=conference)
+            self.assertEqual(50, timeslots.count())
+            self.assertEqual(2, conference.venues.count())
+            self.assertEqual(4, Resource.objects.filter(
+                venue__conferences=conference).count())
+            self.assertEqual(50, TimeSlot.resources.through.objects.filter(
+                timeslot__conference=conference).count())
+            presenters = TimeSlot.presenters.through.objects.filter(
+                timeslot__conference=conference).count()
+            self.assertTrue(50 <= presenters <= 150)
+            self.assertEqual(self.start_date, conference.start_date)
+        self.assertLess(Presenter.objects.count(), 300)
+
+    def test_schedules_do_not_overlap(self):
+        self.create(timeslots=200, resources=5)
+
+        self.assertEqual([], TimeSlot.objects.conflicts())
+
+    def test_schedules_are_within_day_hours(self):
+        conference = self.create(timeslots=100, resources=2)[0]
+
+        for start_at, end_at in conference.timeslots.values_list(
+                'start_at', 'end_at'):
+            start_at = timezone.localtime(start_at)
+            end_at = timezone.localtime(end_at)
+            self.assertEqual(start_at.date(), end_at.date())
+            self.assertGreaterEqual(start_at.time(), datetime.time(9))
+            self.assertLessEqual(end_at.time(), datetime.time(18))
+        self.assertEqual(conference.end_date,
+                         timezone.localtime(end_at).date())
+        self.assertGreater(conference.end_date, conference.start_date)
+
+    def test_seed_is_deterministic(self):
+        first = self.create(seed=1, timeslots=30, resources=3)[0]
+        second = self.create(seed=1, timeslots=30, resources=3)[0]
+        third = self.create(seed=2, timeslots=30, resources=3)[0]
+
+        self.assertEqual(self.get_schedule(first), self.get_schedule(second))
+        self.assertNotEqual(self.get_schedule(first),
+                            self.get_schedule(third))
+
+    def test_query_count_is_independent_of_size(self):
+        with self.assertNumQueries(16):
+            self.create(timeslots=10, resources=2)
+
+        with self.assertNumQueries(16):
+            self.create(timeslots=40, resources=2)
+
+    def test_sends_schedule_changed(self):
+        sent = []
+
+        def receiver(sender, conferences, **kwargs):
+            sent.append(conferences)
+        schedule_changed.connect(receiver)
+        try:
+            conferences = self.create(conferences=2, timeslots=5)
+        finally:
+            schedule_changed.disconnect(receiver)
+
+        self.assertEqual([set(conference.pk for conference in conferences)],
+                         sent)
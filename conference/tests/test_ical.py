@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.ical import (escape_text, fold_line, iter_calendar,
+                             validate_calendar)
+from conference.models import Presenter, Resource, TimeSlot
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ValidationError
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+class TestEscapeText(TestCase):
+
+    def test_escapes_special_characters(self):
+        self.assertEqual('a\\\\b\\;c\\,d\\ne',
+                         escape_text('a\\b;c,d\ne'))
+
+
+class TestFoldLine(TestCase):
+
+    def test_does_not_fold_short_line(self):
+        self.assertEqual('SUMMARY:Keynote\r\n', fold_line('SUMMARY:Keynote'))
+
+    def test_folds_long_line_at_75_octets(self):
+        lines = fold_line('SUMMARY:' + 'x' * 200).split('\r\n')
+
+        self.assertEqual([75, 75, 60, 0], [len(line) for line in lines])
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:-1]))
+
+    def test_does_not_split_multi_octet_characters(self):
+        folded = fold_line('SUMMARY:' + 'é' * 100)
+
+        for line in folded.split('\r\n'):
+            self.assertLessEqual(len(line.encode('utf-8')), 75)
+        self.assertEqual('SUMMARY:' + 'é' * 100,
+                         folded.replace('\r\n ', '').rstrip('\r\n'))
+
+
+class TestValidateCalendar(TestCase):
+
+    def setUp(self):
+        self.lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//test//EN',
+                      'BEGIN:VEVENT', 'UID:1@test', 'DTSTAMP:20160101T000000Z',
+                      'DTSTART:20160101T000000Z', 'END:VEVENT',
+                      'END:VCALENDAR']
+
+    def get_content(self, lines):
+        return ''.join(fold_line(line) for line in lines).encode('utf-8')
+
+    def test_accepts_valid_calendar(self):
+        validate_calendar(self.get_content(self.lines))
+
+    def test_accepts_folded_lines(self):
+        self.lines.insert(7, 'SUMMARY:' + 'x' * 200)
+        validate_calendar(self.get_content(self.lines))
+
+    def test_rejects_long_line(self):
+        content = self.get_content(self.lines).replace(
+            b'UID:1@test', b'UID:' + b'1' * 80)
+
+        with self.assertRaises(ValidationError):
+            validate_calendar(content)
+
+    def test_rejects_bare_line_feed(self):
+        content = self.get_content(self.lines).replace(b'\r\nUID', b'\nUID')
+
+        with self.assertRaises(ValidationError):
+            validate_calendar(content)
+
+    def test_rejects_event_missing_required_property(self):
+        self.lines.remove('DTSTAMP:20160101T000000Z')
+
+        with self.assertRaises(ValidationError):
+            validate_calendar(self.get_content(self.lines))
+
+    def test_rejects_unbalanced_components(self):
+        self.lines.remove('END:VEVENT')
+
+        with self.assertRaises(ValidationError):
+            validate_calendar(self.get_content(self.lines))
+
+    def test_rejects_empty_content(self):
+        with self.assertRaises(ValidationError):
+            validate_calendar(b'')
+
+
+class TestCalendarView(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory(name='PyCon; 2016')
+        self.timeslot = TimeSlotFactory(
+            conference=self.conference, name='Keynote, part 1',
+            description='Opening\nkeynote', start_at=self.now,
+            end_at=self.now + relativedelta(hours=+1))
+        self.timeslot.presenters.add(Presenter.objects.create(name='Ada'))
+        self.timeslot.resources.add(Resource.objects.create(
+            name='Hall A', venue=VenueFactory(name='Centre')))
+        self.url = reverse('conference:conference_calendar',
+                           kwargs={'slug': self.conference.slug})
+
+    def get_content(self):
+        response = self.client.get(self.url)
+        self.assertEqual('text/calendar; charset=utf-8',
+                         response['Content-Type'])
+        return b''.join(response.streaming_content)
+
+    def test_returns_valid_calendar(self):
+        validate_calendar(self.get_content())
+
+    def test_includes_timeslot_event(self):
+        content = self.get_content().decode('utf-8')
+
+        self.assertIn('UID:{}@testserver\r\n'.format(self.timeslot.pk),
+                      content)
+        self.assertIn('DTSTART:20160102T121200Z\r\n', content)
+        self.assertIn('DTEND:20160102T131200Z\r\n', content)
+        self.assertIn('SUMMARY:Keynote\\, part 1\r\n', content)
+        self.assertIn('X-WR-CALNAME:PyCon\\; 2016\r\n', content)
+
+    def test_includes_presenters_and_resources(self):
+        content = self.get_content().decode('utf-8')
+
+        self.assertIn('DESCRIPTION:With Ada.\\n\\nOpening\\nkeynote\r\n',
+                      content)
+        self.assertIn('LOCATION:Hall A (Centre)\r\n', content)
+
+    def test_includes_all_timeslots_across_chunks(self):
+        for index in range(6):
+            TimeSlotFactory(conference=self.conference, start_at=self.now)
+
+        content = ''.join(iter_calendar(self.conference, 'test',
+                                        chunk_size=2))
+
+        self.assertEqual(7, content.count('BEGIN:VEVENT'))
+
+    def test_not_found_for_unknown_conference(self):
+        self.url = reverse('conference:conference_calendar',
+                           kwargs={'slug': 'unknown'})
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(404, response.status_code)
+
+
+@unittest.skipIf(tracemalloc is None, 'tracemalloc is not available.')
+class TestCalendarViewMemory(TestCase):
+
+    timeslots = 50000
+
+    #: Peak memory allowed while streaming, in bytes.
+    ceiling = 4 * 1024 * 1024
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        start_at = timezone.now()
+        TimeSlot.objects.bulk_create((
+            TimeSlot(conference=self.conference,
+                     name='Time Slot {}'.format(index),
+                     description='A session about topic {}.'.format(index),
+                     start_at=start_at + relativedelta(minutes=index),
+                     end_at=start_at + relativedelta(minutes=index + 30))
+            for index in range(self.timeslots)), batch_size=500)
+        self.url = reverse('conference:conference_calendar',
+                           kwargs={'slug': self.conference.slug})
+
+    def test_streams_large_calendar_under_memory_ceiling(self):
+        tracemalloc.start()
+        try:
+            response = self.client.get(self.url)
+            events, size = 0, 0
+            for chunk in response.streaming_content:
+                events += chunk.count(b'BEGIN:VEVENT')
+                size += len(chunk)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(self.timeslots, events)
+        self.assertLess(peak, self.ceiling)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import ConferenceFactory
+from conference.importer import (ImportDataError, ScheduleImporter, read_csv,
+                                 parse_resource)
+from conference.models import Conference, Presenter, Resource, TimeSlot, Venue
+from conference.signals import schedule_changed
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import six, timezone
+import io
+import json
+import os
+import shutil
+import tempfile
+
+
+DATA = {
+    'conferences': [
+        {'slug': 'pycon', 'name': 'PyCon', 'city': 'Portland',
+         'start_date': '2016-05-28', 'end_date': '2016-06-05',
+         'venues': ['Convention Center']},
+    ],
+    'venues': [
+        {'name': 'Convention Center', 'address': '777 NE MLK Jr Blvd'},
+    ],
+    'presenters': [
+        {'name': 'Ada', 'email': 'ada@example.com'},
+    ],
+    'timeslots': [
+        {'conference': 'pycon', 'name': 'Keynote',
+         'start_at': '2016-05-30T09:00:00Z', 'end_at': '2016-05-30T10:00:00Z',
+         'presenters': ['Ada', 'Bob'],
+         'resources': ['Convention Center/Hall A']},
+        {'conference': 'pycon', 'name': 'Lunch',
+         'start_at': '2016-05-30T12:00:00Z', 'end_at': '2016-05-30T13:00:00Z',
+         'resources': [{'venue': 'Convention Center', 'name': 'Hall A'},
+                       {'venue': 'Convention Center', 'name': 'Hall B'}]},
+    ],
+}
+
+
+class TestParseResource(TestCase):
+
+    def test_parses_string(self):
+        self.assertEqual(('Centre', 'Hall A'), parse_resource('Centre/Hall A'))
+
+    def test_parses_dict(self):
+        self.assertEqual(('Centre', 'Hall A'),
+                         parse_resource({'venue': 'Centre', 'name': 'Hall A'}))
+
+    def test_string_without_venue_is_invalid(self):
+        with self.assertRaises(ImportDataError):
+            parse_resource('Hall A')
+
+
+class TestScheduleImporter(TestCase):
+
+    def test_imports_schedule(self):
+        created = ScheduleImporter().import_data(DATA)
+
+        conference = Conference.objects.get(slug='pycon')
+        self.assertEqual('Portland', conference.city)
+        self.assertEqual(['Convention Center'],
+                         [venue.name for venue in conference.venues.all()])
+        keynote = TimeSlot.objects.get(name='Keynote')
+        self.assertEqual(conference, keynote.conference)
+        self.assertEqual(
+            timezone.datetime(2016, 5, 30, 9, tzinfo=timezone.utc),
+            keynote.start_at)
+        self.assertEqual(['Ada', 'Bob'],
+                         [presenter.name for presenter in
+                          keynote.presenters.order_by('name')])
+        self.assertEqual('ada@example.com',
+                         Presenter.objects.get(name='Ada').email)
+        self.assertEqual(['Hall A', 'Hall B'], [
+            resource.name for resource in TimeSlot.objects.get(
+                name='Lunch').resources.order_by('name')])
+        self.assertEqual(2, created['TimeSlot'])
+        self.assertEqual(3, created['TimeSlot_resources'])
+
+    def test_import_is_idempotent(self):
+        ScheduleImporter().import_data(DATA)
+
+        created = ScheduleImporter().import_data(DATA)
+
+        self.assertEqual(0, sum(created.values()))
+        self.assertEqual(1, Venue.objects.count())
+        self.assertEqual(2, Resource.objects.count())
+        self.assertEqual(2, Presenter.objects.count())
+        self.assertEqual(2, TimeSlot.objects.count())
+        self.assertEqual(3, TimeSlot.resources.through.objects.count())
+
+    def test_uses_existing_objects(self):
+        conference = ConferenceFactory(slug='pycon', name='Existing')
+
+        ScheduleImporter().import_data(DATA)
+
+        self.assertEqual(1, Conference.objects.count())
+        self.assertEqual('Existing', Conference.objects.get().name)
+        self.assertEqual(2, conference.timeslots.count())
+
+    def test_query_count_is_independent_of_row_count(self):
+        timeslots = [
+            {'conference': 'pycon', 'name': 'Talk {}'.format(index),
+             'start_at': '2016-05-30T09:00:00Z',
+             'end_at': '2016-05-30T10:00:00Z',
+             'presenters': ['Presenter {}'.format(index)],
+             'resources': ['Centre/Room {}'.format(index % 5)]}
+            for index in range(100)]
+
+        with self.assertNumQueries(22):
+            ScheduleImporter().import_data({'timeslots': timeslots})
+
+        self.assertEqual(100, TimeSlot.objects.count())
+
+    def test_sends_schedule_changed(self):
+        received = []
+
+        def receiver(sender, conferences, **kwargs):
+            received.extend(conferences)
+
+        schedule_changed.connect(receiver)
+        self.addCleanup(schedule_changed.disconnect, receiver)
+
+        ScheduleImporter().import_data(DATA)
+
+        self.assertEqual([Conference.objects.get().pk], received)
+
+    def test_invalid_data_is_rolled_back(self):
+        data = {'timeslots': DATA['timeslots'] + [{'conference': 'pycon'}]}
+
+        with self.assertRaises(ImportDataError):
+            ScheduleImporter().import_data(data)
+
+        self.assertFalse(Conference.objects.exists())
+        self.assertFalse(TimeSlot.objects.exists())
+
+    def test_invalid_datetime(self):
+        data = {'timeslots': [dict(DATA['timeslots'][0], start_at='soon')]}
+
+        with self.assertRaises(ImportDataError) as context:
+            ScheduleImporter().import_data(data)
+
+        self.assertIn('"soon"', six.text_type(context.exception))
+
+
+class TestImportScheduleCommand(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def call(self, *args):
+        stdout = six.StringIO()
+        call_command('import_schedule', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_imports_json(self):
+        path = self.write('schedule.json', six.text_type(json.dumps(DATA)))
+
+        output = self.call(path)
+
+        self.assertIn('Imported 2 time slots', output)
+        self.assertIn('rows/s', output)
+        self.assertEqual(2, TimeSlot.objects.count())
+
+    def test_imports_csv(self):
+        path = self.write('schedule.csv', (
+            'conference,name,start_at,end_at,presenters,resources\n'
+            'pycon,Keynote,2016-05-30T09:00:00Z,2016-05-30T10:00:00Z,'
+            'Ada; Bob,Centre/Hall A\n'
+            'pycon,Café,2016-05-30T12:00:00Z,2016-05-30T13:00:00Z,,\n'))
+
+        self.call(path)
+
+        self.assertEqual(['Café', 'Keynote'], list(
+            TimeSlot.objects.order_by('name').values_list('name', flat=True)))
+        self.assertEqual(2, TimeSlot.objects.get(
+            name='Keynote').presenters.count())
+
+    def test_read_csv(self):
+        path = self.write('schedule.csv', (
+            'conference,name,start_at,end_at,presenters\n'
+            'pycon,Keynote,2016-05-30T09:00:00Z,2016-05-30T10:00:00Z,'
+            'Ada;Bob\n'))
+
+        data = read_csv(path)
+
+        self.assertEqual(['Ada', 'Bob'], data['timeslots'][0]['presenters'])
+        self.assertEqual([], data['timeslots'][0]['resources'])
+
+    def test_unknown_format(self):
+        path = self.write('schedule.txt', '')
+
+        with self.assertRaises(CommandError):
+            self.call(path)
+
+    def test_invalid_file(self):
+        path = self.write('schedule.json', '{')
+
+        with self.assertRaises(CommandError):
+            self.call(path)
+
+    def test_imports_all_files_or_none(self):
+        valid = self.write('schedule.json', six.text_type(json.dumps(DATA)))
+        invalid = self.write('invalid.json', '{')
+
+        with self.assertRaises(CommandError):
+            self.call(valid, invalid)
+
+        self.assertFalse(TimeSlot.objects.exists())
+        self.assertFalse(Conference.objects.exists())
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache, instrumentation
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.models import Conference, Presenter, TimeSlot
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+
+try:  # Python 3
+    from unittest import mock
+except ImportError:  # Python 2
+    import mock
+
+
+class TestMeasurement(TestCase):
+
+    def make_measurement(self, *queries):
+        measurement = instrumentation.Measurement('test')
+        measurement.queries = [{'sql': sql, 'time': '0.002'}
+                               for sql in queries]
+        return measurement
+
+    def test_normalize(self):
+        self.assertEqual(
+            'SELECT * FROM "t" WHERE "t"."id" = ? AND "t"."name" = ? '
+            'AND "t"."pk" IN (...)',
+            instrumentation.normalize(
+                'SELECT * FROM "t" WHERE "t"."id" = 12 AND "t"."name" = '
+                '\'It\'\'s\' AND "t"."pk" IN (\'a\', \'b\')'))
+
+    def test_db_time(self):
+        measurement = self.make_measurement('SELECT 1', 'SELECT 2')
+
+        self.assertEqual(2, measurement.count)
+        self.assertAlmostEqual(0.004, measurement.db_time)
+
+    def test_repeated(self):
+        measurement = self.make_measurement(
+            *['SELECT * FROM "t" WHERE "id" = {}'.format(n)
+              for n in range(3)] + ['SELECT * FROM "u"'] * 2)
+
+        self.assertEqual([('SELECT * FROM "t" WHERE "id" = ?', 3)],
+                         measurement.repeated)
+
+
+class TestSinks(TestCase):
+
+    def setUp(self):
+        self.measurement = instrumentation.Measurement('conference:detail')
+        self.measurement.queries = [
+            {'sql': 'SELECT * FROM "t" WHERE "id" = {}'.format(n),
+             'time': '0.010'} for n in range(4)]
+        self.measurement.render_time = 0.5
+        self.measurement.total_time = 1.0
+
+    def test_logging_sink(self):
+        with mock.patch.object(instrumentation, 'logger') as logger:
+            instrumentation.LoggingSink().record(self.measurement)
+
+        logger.info.assert_called_once_with(
+            mock.ANY, 'conference:detail', 4, 40.0, 500.0, 1000.0)
+        logger.warning.assert_called_once_with(
+            mock.ANY, 'conference:detail', 4,
+            'SELECT * FROM "t" WHERE "id" = ?')
+
+    def test_prometheus_sink(self):
+        sink = instrumentation.PrometheusSink()
+
+        sink.record(self.measurement)
+        sink.record(self.measurement)
+
+        lines = sink.render().splitlines()
+        self.assertIn('# TYPE conference_calls_total counter', lines)
+        self.assertIn('conference_calls_total{name="conference:detail"} 2',
+                      lines)
+        self.assertIn(
+            'conference_queries_total{name="conference:detail"} 8', lines)
+        self.assertIn('conference_repeated_queries_total'
+                      '{name="conference:detail"} 8', lines)
+        self.assertIn('conference_seconds_total{name="conference:detail"} 2.0',
+                      lines)
+
+
+class TestRecording(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.conference = ConferenceFactory()
+        TimeSlotFactory(conference=self.conference)
+
+    def test_disabled_by_default(self):
+        self.assertEqual([], instrumentation.get_sinks())
+        self.assertFalse(instrumentation.is_enabled())
+
+    @override_settings(CONFERENCE_INSTRUMENTATION_SINKS=[
+        'conference.instrumentation.MemorySink'])
+    def test_configured_sinks(self):
+        sinks = instrumentation.get_sinks()
+
+        TimeSlot.objects.next_boundary()
+
+        self.assertIs(sinks[0], instrumentation.get_sinks()[0])
+        self.assertEqual(['TimeSlotQuerySet.next_boundary'],
+                         [measurement.name
+                          for measurement in sinks[0].measurements])
+
+    def test_record(self):
+        with instrumentation.capture() as measurements:
+            with instrumentation.record('test') as measurement:
+                list(Conference.objects.all())
+                list(Presenter.objects.all())
+
+        self.assertEqual([measurement], measurements)
+        self.assertEqual(2, measurement.count)
+        self.assertGreater(measurement.total_time, 0)
+
+    def test_record_counts_queries_when_query_log_is_full(self):
+        connection.queries_log.extend([{}] * connection.queries_limit)
+        self.addCleanup(connection.queries_log.clear)
+
+        with instrumentation.record('test') as measurement:
+            list(Conference.objects.all())
+            list(Presenter.objects.all())
+
+        self.assertEqual(2, measurement.count)
+
+    def test_record_does_not_log_queries(self):
+        with instrumentation.record('test') as measurement:
+            self.assertFalse(connection.queries_logged)
+            list(Conference.objects.all())
+
+        self.assertEqual(1, measurement.count)
+        self.assertEqual([], connection.queries)
+
+    def test_nested_records(self):
+        with instrumentation.record('outer') as outer:
+            list(Conference.objects.all())
+            with instrumentation.record('inner') as inner:
+                list(Presenter.objects.all())
+
+        self.assertEqual(2, outer.count)
+        self.assertEqual(1, inner.count)
+        self.assertIn('conference_presenter', inner.queries[0]['sql'])
+
+    def test_record_discards_failed_calls(self):
+        with instrumentation.capture() as measurements:
+            with self.assertRaises(ValueError):
+                with instrumentation.record('test'):
+                    raise ValueError
+
+        self.assertEqual([], measurements)
+
+    def test_queryset_methods(self):
+        with instrumentation.capture() as measurements:
+            TimeSlot.objects.now_next_later()
+            TimeSlot.objects.filter(conference=self.conference).conflicts()
+
+        self.assertEqual(['TimeSlotQuerySet.now_next_later',
+                          'TimeSlotQuerySet.conflicts'],
+                         [measurement.name for measurement in measurements])
+        self.assertEqual([1, 2], [measurement.count
+                                  for measurement in measurements])
+
+    def test_views(self):
+        with instrumentation.capture() as measurements:
+            self.client.get(self.conference.get_absolute_url())
+            self.client.get(reverse('conference:conference_list'))
+
+        self.assertEqual(['conference:conference_detail',
+                          'conference:conference_list'],
+                         [measurement.name for measurement in measurements])
+        self.assertGreater(measurements[0].render_time, 0)
+        self.assertLessEqual(measurements[0].render_time,
+                             measurements[0].total_time)
+
+
+class TestMetricsView(TestCase):
+
+    def setUp(self):
+        self.url = reverse('conference:metrics')
+
+    def test_not_found_without_prometheus_sink(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(404, response.status_code)
+
+    @override_settings(CONFERENCE_INSTRUMENTATION_SINKS=[
+        'conference.instrumentation.PrometheusSink'])
+    def test_renders_metrics(self):
+        self.client.get(reverse('conference:conference_list'))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual('text/plain; version=0.0.4; charset=utf-8',
+                         response['Content-Type'])
+        self.assertContains(response, 'conference_calls_total'
+                                      '{name="conference:conference_list"} 1')
+
+
+class TestInstrumentationTestMixin(instrumentation.InstrumentationTestMixin,
+                                   TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        for _ in range(3):
+            TimeSlotFactory(conference=self.conference)
+
+    def test_assert_measured(self):
+        with self.assertMeasured('TimeSlotQuerySet.next_boundary',
+                                 max_queries=1):
+            TimeSlot.objects.next_boundary()
+
+    def test_assert_measured_fails_on_repeated_queries(self):
+        with self.assertRaises(AssertionError):
+            with self.assertMeasured('test'):
+                with instrumentation.record('test'):
+                    for timeslot in TimeSlot.objects.all():
+                        timeslot.conference
+
+    def test_assert_measured_fails_on_query_count(self):
+        with self.assertRaises(AssertionError):
+            with self.assertMeasured('TimeSlotQuerySet.next_boundary',
+                                     max_queries=0):
+                TimeSlot.objects.next_boundary()
@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from collections import defaultdict
+from conference import cache, live
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.live import (AsyncioDriver, Event, Scheduler, ThreadDriver,
+                             load_event)
+from conference.signals import send_schedule_changed
+from conference.views.live import EventStreamView
+from dateutil.relativedelta import relativedelta
+from django.core.urlresolvers import reverse
+from django.db import DatabaseError
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from django.utils.six.moves import queue
+from freezegun import freeze_time
+import json
+import threading
+import unittest
+
+try:  # Python 3
+    from unittest import mock
+except ImportError:  # Python 2
+    import mock
+
+
+def at(hour, minute=0):
+    return timezone.datetime(2016, 1, 2, hour, minute, tzinfo=timezone.utc)
+
+
+class Subscribers(object):
+    """Simulate many subscribers to the conferences of a scheduler, driven
+    against a frozen clock."""
+
+    def __init__(self, scheduler, conferences, count):
+        self.events = defaultdict(list)
+        self.scheduler = scheduler
+        self.subscriptions = [
+            scheduler.subscribe(conferences[index % len(conferences)].pk,
+                                self.events[index].append)
+            for index in range(count)]
+
+    def tick(self, at):
+        with freeze_time(at):
+            return self.scheduler.tick(timezone.now())
+
+    def received(self):
+        """Get the number of events received by each subscriber."""
+        return [len(self.events[index])
+                for index in range(len(self.subscriptions))]
+
+
+class LiveTestCase(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.other = ConferenceFactory()
+        self.timeslots = [
+            TimeSlotFactory(conference=self.conference, name=name,
+                            start_at=start_at, end_at=end_at)
+            for name, start_at, end_at in [
+                ('Keynote', at(9), at(10)),
+                ('Talk', at(10), at(11)),
+                ('Lunch', at(12), at(13)),
+            ]]
+        TimeSlotFactory(conference=self.other, start_at=at(11, 30),
+                        end_at=at(12, 30))
+
+
+class TestLoadEvent(LiveTestCase):
+
+    def test_loads_now_next_and_later(self):
+        with self.assertNumQueries(1):
+            event, boundary = load_event(self.conference.pk, at(9, 30))
+
+        data = json.loads(event.data)
+        self.assertEqual(['Keynote'], [timeslot['name']
+                                       for timeslot in data['now']])
+        self.assertEqual('Talk', data['next']['name'])
+        self.assertEqual('Lunch', data['later']['name'])
+        self.assertEqual(at(10), boundary)
+
+    def test_boundary_is_end_of_current_timeslot(self):
+        self.assertEqual(at(13), load_event(self.conference.pk,
+                                            at(12, 30))[1])
+
+    def test_no_boundary_after_last_timeslot(self):
+        event, boundary = load_event(self.conference.pk, at(14))
+
+        self.assertEqual({'now': [], 'next': None, 'later': None},
+                         json.loads(event.data))
+        self.assertIsNone(boundary)
+
+    def test_id_changes_with_data(self):
+        self.assertEqual(load_event(self.conference.pk, at(9))[0],
+                         load_event(self.conference.pk, at(9, 30))[0])
+        self.assertNotEqual(load_event(self.conference.pk, at(9))[0].id,
+                            load_event(self.conference.pk, at(10))[0].id)
+
+
+class TestScheduler(LiveTestCase):
+
+    def setUp(self):
+        super(TestScheduler, self).setUp()
+        self.scheduler = Scheduler()
+        self.subscribers = Subscribers(
+            self.scheduler, [self.conference, self.other], 1000)
+
+    def test_loads_each_conference_once_for_all_subscribers(self):
+        with self.assertNumQueries(2):
+            due = self.subscribers.tick(at(9, 15))
+
+        self.assertEqual([1] * 1000, self.subscribers.received())
+        self.assertEqual(at(10), due)
+
+    def test_does_not_load_before_boundary(self):
+        self.subscribers.tick(at(9, 15))
+
+        with self.assertNumQueries(0):
+            self.subscribers.tick(at(9, 59))
+
+        self.assertEqual([1] * 1000, self.subscribers.received())
+
+    def test_publishes_when_boundary_passes(self):
+        self.subscribers.tick(at(9, 15))
+
+        with self.assertNumQueries(1):
+            due = self.subscribers.tick(at(10))
+
+        self.assertEqual([2, 1] * 500, self.subscribers.received())
+        self.assertEqual('Talk', json.loads(
+            self.subscribers.events[0][-1].data)['now'][0]['name'])
+        self.assertEqual(at(11), due)
+
+    def test_publishes_when_schedule_edited(self):
+        self.subscribers.tick(at(9, 15))
+        self.timeslots[1].name = 'Lightning talks'
+        self.timeslots[1].save()
+
+        self.scheduler.invalidate([self.conference.pk])
+        with self.assertNumQueries(1):
+            self.subscribers.tick(at(9, 16))
+
+        self.assertEqual([2, 1] * 500, self.subscribers.received())
+
+    def test_publishes_when_schedule_edited_in_other_process(self):
+        self.subscribers.tick(at(9, 15))
+        self.timeslots[1].name = 'Lightning talks'
+        self.timeslots[1].save()
+
+        cache.bump_version(self.conference.pk)
+        with self.assertNumQueries(1):
+            self.subscribers.tick(at(9, 16))
+
+        self.assertEqual([2, 1] * 500, self.subscribers.received())
+
+    def test_retries_conference_which_failed_to_load(self):
+        failures = [self.conference.pk]
+
+        def loader(conference_pk, at):
+            if conference_pk in failures:
+                failures.remove(conference_pk)
+                raise DatabaseError
+            return load_event(conference_pk, at)
+
+        self.scheduler.loader = loader
+        with mock.patch.object(live.logger, 'exception') as exception:
+            due = self.subscribers.tick(at(9, 15))
+
+        self.assertEqual(1, exception.call_count)
+        self.assertEqual([0, 1] * 500, self.subscribers.received())
+        retry_at = at(9, 15) + relativedelta(seconds=+5)
+        self.assertEqual(retry_at, due)
+
+        self.subscribers.tick(retry_at)
+
+        self.assertEqual([1] * 1000, self.subscribers.received())
+
+    def test_does_not_publish_unchanged_event(self):
+        self.subscribers.tick(at(9, 15))
+
+        self.scheduler.invalidate([self.conference.pk])
+        self.subscribers.tick(at(9, 16))
+
+        self.assertEqual([1] * 1000, self.subscribers.received())
+
+    def test_publishes_current_event_to_new_subscriber(self):
+        self.subscribers.tick(at(9, 15))
+        events = []
+
+        with self.assertNumQueries(0):
+            self.scheduler.subscribe(self.conference.pk, events.append)
+
+        self.assertEqual(self.subscribers.events[0], events)
+
+    def test_wakes_up_driver(self):
+        self.scheduler.wakeup = wakeup = mock.Mock()
+
+        self.scheduler.subscribe(ConferenceFactory().pk, lambda event: None)
+        self.scheduler.invalidate([self.conference.pk])
+
+        self.assertEqual(2, wakeup.call_count)
+
+    def test_removes_conference_without_subscribers(self):
+        for subscription in self.subscribers.subscriptions:
+            subscription.cancel()
+
+        self.assertEqual(0, self.scheduler.subscriber_count())
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.subscribers.tick(at(9, 15)))
+
+
+class TestInvalidate(LiveTestCase):
+
+    def test_invalidates_shared_scheduler(self):
+        scheduler = mock.Mock()
+        with mock.patch.dict(live._schedulers,
+                             {live.os.getpid(): scheduler}), \
+                mock.patch.object(cache, 'on_commit',
+                                  side_effect=lambda func: func()):
+            send_schedule_changed(sender=None,
+                                  conferences=[self.conference.pk])
+
+        scheduler.invalidate.assert_called_once_with({self.conference.pk})
+
+
+class StubLoader(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, conference_pk, at):
+        self.calls.append((conference_pk, at))
+        return Event(str(len(self.calls)), '{}'), None
+
+
+class TestThreadDriver(TestCase):
+
+    def setUp(self):
+        self.loader = StubLoader()
+        self.scheduler = Scheduler(loader=self.loader)
+        self.driver = ThreadDriver(self.scheduler, clock=lambda: at(9))
+        self.driver.start()
+        self.addCleanup(self.driver.stop)
+
+    def test_loads_once_for_concurrent_subscribers(self):
+        received = queue.Queue()
+
+        def subscribe():
+            events = queue.Queue()
+            self.scheduler.subscribe('conference', events.put)
+            received.put(events.get(timeout=5))
+
+        threads = [threading.Thread(target=subscribe) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(50, received.qsize())
+        self.assertEqual([('conference', at(9))], self.loader.calls)
+
+    def test_reloads_when_invalidated(self):
+        events = queue.Queue()
+        self.scheduler.subscribe('conference', events.put)
+        self.assertEqual('1', events.get(timeout=5).id)
+
+        self.scheduler.invalidate(['conference'])
+
+        self.assertEqual('2', events.get(timeout=5).id)
+
+
+@unittest.skipIf(live.asyncio is None, 'asyncio is not available.')
+class TestAsyncioDriver(TestCase):
+
+    def setUp(self):
+        self.loop = live.asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.loader = StubLoader()
+        self.scheduler = Scheduler(loader=self.loader)
+        self.driver = AsyncioDriver(self.scheduler, loop=self.loop,
+                                    clock=lambda: at(9))
+        self.driver.start()
+        self.addCleanup(self.driver.stop)
+
+    def get(self, events):
+        return self.loop.run_until_complete(
+            live.asyncio.wait_for(events.get(), 5, loop=self.loop))
+
+    def test_publishes_to_queues(self):
+        events, subscription = self.driver.subscribe('conference')
+        other_events, _ = self.driver.subscribe('conference')
+
+        self.assertEqual('1', self.get(events).id)
+        self.assertEqual('1', self.get(other_events).id)
+        self.assertEqual(1, len(self.loader.calls))
+
+    def test_reloads_when_invalidated(self):
+        events, subscription = self.driver.subscribe('conference')
+        self.get(events)
+
+        self.scheduler.invalidate(['conference'])
+
+        self.assertEqual('2', self.get(events).id)
+
+
+class TestEventStreamView(LiveTestCase):
+
+    def setUp(self):
+        super(TestEventStreamView, self).setUp()
+        self.scheduler = Scheduler()
+        patcher = mock.patch.object(live, 'get_scheduler',
+                                    return_value=self.scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('conference:conference_events',
+                           kwargs={'slug': self.conference.slug})
+
+    def get(self, **headers):
+        view = EventStreamView.as_view(keepalive=0.01, timeout=5)
+        response = view(RequestFactory().get(self.url, **headers),
+                        slug=self.conference.slug)
+        self.addCleanup(response.close)
+        return response, (chunk.decode('utf-8')
+                          for chunk in response.streaming_content)
+
+    def tick(self, at):
+        with freeze_time(at):
+            self.scheduler.tick(timezone.now())
+
+    def test_streams_events(self):
+        response, chunks = self.get()
+
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertEqual('retry: 5000\n\n', next(chunks))
+        self.tick(at(9, 15))
+        event = next(chunks)
+        self.assertTrue(event.startswith('id: '))
+        self.assertIn('event: schedule\ndata: {"now": [{', event)
+        self.tick(at(10))
+        self.assertIn('"name": "Talk"', next(chunks))
+
+    def test_sends_keepalive_comments(self):
+        response, chunks = self.get()
+        next(chunks)
+
+        self.assertEqual(':\n\n', next(chunks))
+
+    def test_does_not_resend_last_event(self):
+        event = load_event(self.conference.pk, at(9, 15))[0]
+        subscription = self.scheduler.subscribe(self.conference.pk,
+                                                lambda event: None)
+        self.tick(at(9, 15))
+        subscription.cancel()
+        response, chunks = self.get(HTTP_LAST_EVENT_ID=event.id)
+        next(chunks)
+
+        self.assertEqual(':\n\n', next(chunks))
+
+    def test_unsubscribes_when_closed(self):
+        response, chunks = self.get()
+        next(chunks)
+        self.assertEqual(1, self.scheduler.subscriber_count())
+
+        response.close()
+
+        self.assertEqual(0, self.scheduler.subscriber_count())
+
+    def test_not_found_for_unknown_conference(self):
+        view = EventStreamView.as_view()
+        with self.assertRaises(Http404):
+            view(RequestFactory().get(self.url), slug='unknown')
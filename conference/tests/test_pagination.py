@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import ConferenceFactory
+from conference.models import Conference
+from conference.pagination import KeysetPaginator
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+import datetime
+
+
+class TestKeysetPaginator(TestCase):
+
+    def setUp(self):
+        start_dates = [None, None, None, datetime.date(2016, 1, 1),
+                       datetime.date(2016, 1, 1), datetime.date(2016, 1, 1),
+                       datetime.date(2016, 2, 1), datetime.date(2017, 1, 1)]
+        for start_date in start_dates:
+            ConferenceFactory(start_date=start_date)
+        self.paginator = KeysetPaginator(Conference.objects.all(), 3,
+                                         field='start_date')
+
+    def get_all_pages(self):
+        pages, cursor = [], None
+        while True:
+            page = self.paginator.page(cursor)
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            cursor = page.next_cursor
+
+    def test_returns_all_objects_in_order(self):
+        objects = [obj for page in self.get_all_pages() for obj in page]
+
+        expected = sorted(Conference.objects.all(), key=lambda c: (
+            c.start_date is not None, c.start_date, str(c.pk)))
+        self.assertEqual(expected, objects)
+
+    def test_returns_full_pages(self):
+        pages = self.get_all_pages()
+
+        self.assertEqual([3, 3, 2], [len(page) for page in pages])
+
+    def test_first_page_has_no_previous_page(self):
+        page = self.paginator.page()
+
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_last_page_has_no_next_page(self):
+        page = self.get_all_pages()[-1]
+
+        self.assertTrue(page.has_previous())
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+
+    def test_page_within_dated_objects_makes_a_single_query(self):
+        cursor = self.get_all_pages()[1].next_cursor
+
+        with self.assertNumQueries(1):
+            self.paginator.page(cursor)
+
+    def test_returns_empty_page_without_objects(self):
+        page = KeysetPaginator(Conference.objects.none(), 3,
+                               field='start_date').page()
+
+        self.assertEqual([], page.object_list)
+        self.assertFalse(page.has_other_pages())
+
+    def test_raises_invalid_page_for_invalid_cursor(self):
+        for cursor in ['invalid', 'fA', 'MjAxNi0xMy0wMXwx']:
+            with self.assertRaises(InvalidPage):
+                self.paginator.page(cursor)
@@ -350,3 +350,116 @@ class TestLotteryQuerySetLaterFilter(TestCase):
             later = TimeSlot.objects.later()
 
         self.assertIsNone(later)
+
+
+class TestTimeSlotQuerySetNowNextLater(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.earlier_timeslot = TimeSlotFactory(
+            start_at=self.now + relativedelta(hours=-2),
+            end_at=self.now + relativedelta(hours=-1))
+        self.now_timeslot = TimeSlotFactory(
+            start_at=self.now + relativedelta(hours=-0.5),
+            end_at=self.now + relativedelta(hours=+0.5))
+        self.next_timeslot = TimeSlotFactory(
+            start_at=self.now + relativedelta(hours=+1),
+            end_at=self.now + relativedelta(hours=+2))
+        self.later_timeslot = TimeSlotFactory(
+            start_at=self.now + relativedelta(hours=+2),
+            end_at=self.now + relativedelta(hours=+3))
+        self.last_timeslot = TimeSlotFactory(
+            start_at=self.now + relativedelta(hours=+3),
+            end_at=self.now + relativedelta(hours=+4))
+
+    def test_returns_current_timeslots(self):
+        result = TimeSlot.objects.now_next_later(at=self.now)
+
+        self.assertEqual([self.now_timeslot], result.current)
+
+    def test_returns_next_timeslot(self):
+        result = TimeSlot.objects.now_next_later(at=self.now)
+
+        self.assertEqual(self.next_timeslot, result.next)
+
+    def test_returns_later_timeslot(self):
+        result = TimeSlot.objects.now_next_later(at=self.now)
+
+        self.assertEqual(self.later_timeslot, result.later)
+
+    def test_defaults_to_current_time(self):
+        with freeze_time(self.now):
+            result = TimeSlot.objects.now_next_later()
+
+        self.assertEqual(self.next_timeslot, result.next)
+
+    def test_returns_none_when_no_future_timeslots(self):
+        result = TimeSlot.objects.now_next_later(
+            at=self.now + relativedelta(days=+1))
+
+        self.assertEqual(([], None, None), result)
+
+    def test_makes_a_single_query(self):
+        with self.assertNumQueries(1):
+            TimeSlot.objects.now_next_later(at=self.now)
+
+    def test_makes_no_query_when_already_evaluated(self):
+        queryset = TimeSlot.objects.all()
+        list(queryset)
+
+        with self.assertNumQueries(0):
+            result = queryset.now_next_later(at=self.now)
+
+        self.assertEqual(
+            ([self.now_timeslot], self.next_timeslot, self.later_timeslot),
+            result)
+
+    def test_matches_database_result_when_already_evaluated(self):
+        queryset = TimeSlot.objects.all()
+        list(queryset)
+
+        for hours in [-3, -1.5, -1, 0, 0.5, 1, 2.5, 5]:
+            at = self.now + relativedelta(hours=hours)
+            self.assertEqual(TimeSlot.objects.now_next_later(at=at),
+                             queryset.now_next_later(at=at))
+
+
+class TestTimeSlotQuerySetNextBoundary(TestCase):
+
+    def setUp(self):
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        TimeSlotFactory(start_at=self.now + relativedelta(hours=-2),
+                        end_at=self.now + relativedelta(hours=-1))
+        TimeSlotFactory(start_at=self.now + relativedelta(hours=-0.5),
+                        end_at=self.now + relativedelta(hours=+1.5))
+        TimeSlotFactory(start_at=self.now + relativedelta(hours=+1),
+                        end_at=self.now + relativedelta(hours=+2))
+
+    def test_returns_next_start(self):
+        boundary = TimeSlot.objects.next_boundary(at=self.now)
+
+        self.assertEqual(self.now + relativedelta(hours=+1), boundary)
+
+    def test_returns_next_end(self):
+        boundary = TimeSlot.objects.next_boundary(
+            at=self.now + relativedelta(hours=+1))
+
+        self.assertEqual(self.now + relativedelta(hours=+1.5), boundary)
+
+    def test_returns_none_when_all_timeslots_have_ended(self):
+        boundary = TimeSlot.objects.next_boundary(
+            at=self.now + relativedelta(hours=+2))
+
+        self.assertIsNone(boundary)
+
+    def test_matches_database_result_when_already_evaluated(self):
+        queryset = TimeSlot.objects.all()
+        list(queryset)
+
+        for hours in [-3, -1, 0, 1, 1.25, 1.5, 2]:
+            at = self.now + relativedelta(hours=hours)
+            with self.assertNumQueries(0):
+                boundary = queryset.next_boundary(at=at)
+            self.assertEqual(TimeSlot.objects.next_boundary(at=at), boundary)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Presenter, Resource, TimeSlot
+from conference.records import TimeSlotRecord, load_records
+from conference.serializers import FieldError, TimeSlotSerializer
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+import json
+import pickle
+
+
+class RecordsTestCase(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.venue = VenueFactory(name='Centre')
+        self.ada = Presenter.objects.create(name='Ada')
+        self.bob = Presenter.objects.create(name='Bob', biography='Bio')
+        self.hall = Resource.objects.create(name='Hall', venue=self.venue)
+        self.timeslots = []
+        for index in range(3):
+            timeslot = TimeSlotFactory(
+                conference=self.conference, name='Talk {}'.format(index),
+                start_at=timezone.datetime(2016, 1, 2, 9 + index,
+                                           tzinfo=timezone.utc))
+            timeslot.presenters.add(self.bob, self.ada)
+            timeslot.resources.add(self.hall)
+            self.timeslots.append(timeslot)
+
+    def load(self):
+        return load_records(self.conference.timeslots.all())
+
+
+class TestLoadRecords(RecordsTestCase):
+
+    def test_loads_in_three_queries(self):
+        with self.assertNumQueries(3):
+            records = self.load()
+
+        self.assertEqual(['Talk 0', 'Talk 1', 'Talk 2'],
+                         [str(record) for record in records])
+
+    def test_loads_related_names_in_name_order(self):
+        record = self.load()[0]
+
+        self.assertEqual(['Ada', 'Bob'], record.presenter_names)
+        self.assertEqual(['Hall'], record.resource_names)
+        self.assertEqual('Centre', record.resources[0].venue.name)
+
+    def test_shares_related_records(self):
+        records = self.load()
+
+        self.assertIs(records[0].presenters[0], records[1].presenters[0])
+        self.assertIs(records[0].resources[0].venue,
+                      records[2].resources[0].venue)
+
+    def test_loads_nothing_for_empty_schedule(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([], load_records(
+                TimeSlot.objects.filter(name='Unknown')))
+
+    def test_compares_by_primary_key(self):
+        record = self.load()[0]
+
+        self.assertEqual(self.timeslots[0].pk, record.pk)
+        self.assertEqual(record, self.load()[0])
+        self.assertNotEqual(record, self.load()[1])
+        self.assertEqual(1, len({record, self.load()[0]}))
+
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.load()[0], '__dict__'))
+
+    def test_pickles(self):
+        records = self.load()
+
+        loaded = pickle.loads(pickle.dumps(records, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(records, loaded)
+        self.assertIsInstance(loaded[0], TimeSlotRecord)
+        self.assertEqual(records[0].start_at, loaded[0].start_at)
+        self.assertIs(loaded[0].presenters[0], loaded[1].presenters[0])
+
+
+class TestSerializeRecords(RecordsTestCase):
+
+    def assertSerializedEqual(self, fields=None):
+        serializer = TimeSlotSerializer(fields=fields)
+        self.assertEqual(
+            serializer.serialize(self.conference.timeslots.all()),
+            serializer.serialize_records(self.load()))
+
+    def test_serializes_default_fields_as_queryset(self):
+        self.assertSerializedEqual()
+
+    def test_serializes_selected_fields_as_queryset(self):
+        self.assertSerializedEqual(['name', 'presenters.name'])
+        self.assertSerializedEqual(['id', 'resources.venue.name'])
+
+    def test_rejects_fields_not_held_by_records(self):
+        serializer = TimeSlotSerializer(
+            fields=['name', 'presenters.biography'])
+
+        self.assertFalse(serializer.supports_records)
+        with self.assertRaises(FieldError):
+            serializer.serialize_records(self.load())
+
+
+class TestScheduleViewRecords(RecordsTestCase):
+
+    def setUp(self):
+        super(TestScheduleViewRecords, self).setUp()
+        cache.get_cache().clear()
+        self.url = reverse('conference:conference_schedule',
+                           kwargs={'slug': self.conference.slug})
+
+    def test_serializes_cached_records(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(['Ada', 'Bob'], [
+            presenter['name']
+            for presenter in data['timeslots'][0]['presenters']])
+
+    def test_queries_fields_not_held_by_records(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'fields': 'name,presenters.biography'})
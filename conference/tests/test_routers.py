@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache, live, routers, timeline
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.middleware import ReadYourWritesMiddleware
+from conference.models import Conference, TimeSlot
+from conference.routers import ReplicaRouter
+from conference.schedule import Schedule
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse
+from django.test import (RequestFactory, TestCase, modify_settings,
+                         override_settings)
+import time
+
+
+@override_settings(DATABASE_ROUTERS=['conference.routers.ReplicaRouter'],
+                   CONFERENCE_REPLICA_DATABASES=['replica'])
+class RoutingTestCase(TestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.addCleanup(routers.reset)
+        self.conference = ConferenceFactory(slug='replicated')
+        self.timeslot = TimeSlotFactory(conference=self.conference)
+        self.replicate(self.conference, self.timeslot)
+        # Not yet replicated, as if the replica were lagging.
+        self.lagging = ConferenceFactory(slug='lagging')
+        routers.reset()
+
+    def replicate(self, *objs):
+        for obj in objs:
+            obj.save(using='replica')
+
+
+class TestReplicaRouter(RoutingTestCase):
+
+    def test_reads_from_replica(self):
+        self.assertEqual('replica', Conference.objects.all().db)
+        self.assertEqual(['replicated'], list(
+            Conference.objects.values_list('slug', flat=True)))
+
+    def test_writes_to_primary(self):
+        self.assertEqual('default', ReplicaRouter().db_for_write(TimeSlot))
+        self.assertEqual(2, Conference.objects.using('default').count())
+
+    def test_pins_reads_after_write(self):
+        ConferenceFactory()
+
+        self.assertTrue(routers.is_pinned())
+        self.assertEqual('default', TimeSlot.objects.all().db)
+
+    def test_pins_reads_within_block(self):
+        with routers.pinned():
+            self.assertEqual('default', Conference.objects.all().db)
+
+        self.assertEqual('replica', Conference.objects.all().db)
+
+    def test_reads_from_primary_queryset(self):
+        self.assertEqual('default', TimeSlot.objects.primary().db)
+        self.assertEqual('default', TimeSlot.objects.filter(
+            conference=self.conference).primary().db)
+
+    def test_does_not_route_other_apps(self):
+        self.assertEqual('default', User.objects.all().db)
+
+    def test_allows_relations_across_primary_and_replicas(self):
+        replicated = Conference.objects.get(slug='replicated')
+
+        self.assertTrue(ReplicaRouter().allow_relation(replicated,
+                                                       self.lagging))
+
+    @override_settings(CONFERENCE_REPLICA_DATABASES=[])
+    def test_reads_from_primary_without_replicas(self):
+        self.assertEqual('default', Conference.objects.all().db)
+
+
+class TestStaleReplica(RoutingTestCase):
+    """The replica lags behind an edit, which has been committed."""
+
+    def setUp(self):
+        super(TestStaleReplica, self).setUp()
+        self.replicated = Conference.objects.get(slug='replicated')
+        # Build the caches before the edit.
+        Schedule(self.replicated, cached=True).timeslots
+        timeline.get_timeline(self.conference.pk)
+        self.timeslot.name = 'Renamed'
+        self.timeslot.start_at += relativedelta(minutes=-30)
+        self.timeslot.save()
+        cache.bump_version(self.conference.pk)
+        routers.reset()
+
+    def test_rebuilds_schedule_cache_from_primary(self):
+        timeslots = Schedule(self.replicated, cached=True).timeslots
+
+        self.assertEqual(['Renamed'], [timeslot.name
+                                       for timeslot in timeslots])
+        self.assertEqual('replica', TimeSlot.objects.all().db)
+
+    def test_rebuilds_detail_page_from_primary(self):
+        response = self.client.get(self.conference.get_absolute_url())
+
+        self.assertContains(response, 'Renamed')
+
+    def test_rebuilds_timeline_from_primary(self):
+        start_at = self.timeslot.start_at
+
+        self.assertEqual(start_at, timeline.get_timeline(
+            self.conference.pk).next_boundary(start_at +
+                                              relativedelta(minutes=-1)))
+
+    def test_loads_live_event_from_primary(self):
+        event, _ = live.load_event(self.conference.pk,
+                                   self.timeslot.start_at)
+
+        self.assertIn('Renamed', event.data)
+
+
+@modify_settings(MIDDLEWARE_CLASSES={
+    'append': 'conference.middleware.ReadYourWritesMiddleware'})
+class TestReadYourWritesMiddleware(RoutingTestCase):
+
+    def get(self, conference):
+        return self.client.get(reverse('conference:conference_detail',
+                                       kwargs={'slug': conference.slug}))
+
+    def test_reads_from_replica(self):
+        self.assertEqual(200, self.get(self.conference).status_code)
+        self.assertEqual(404, self.get(self.lagging).status_code)
+
+    def test_pins_client_after_write(self):
+        response = self.client.post(
+            reverse('conference:conference_bookmark',
+                    kwargs={'slug': self.conference.slug}),
+            {'timeslot': str(self.timeslot.pk)})
+
+        self.assertIn(ReadYourWritesMiddleware.cookie_name, response.cookies)
+        self.assertEqual(200, self.get(self.lagging).status_code)
+        self.assertFalse(routers.is_pinned())
+
+    def test_does_not_pin_after_timeout(self):
+        self.client.cookies[ReadYourWritesMiddleware.cookie_name] = str(
+            time.time() - 1)
+
+        self.assertEqual(404, self.get(self.lagging).status_code)
+
+    def test_ignores_invalid_cookie(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[ReadYourWritesMiddleware.cookie_name] = 'invalid'
+        middleware = ReadYourWritesMiddleware()
+
+        middleware.process_request(request)
+
+        self.assertFalse(routers.is_pinned())
+
+    def test_does_not_set_cookie_without_write(self):
+        middleware = ReadYourWritesMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+
+        response = middleware.process_response(request, HttpResponse())
+
+        self.assertNotIn(ReadYourWritesMiddleware.cookie_name,
+                         response.cookies)
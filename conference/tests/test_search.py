@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import search
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.models import Presenter
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import six
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class TestTokenize(TestCase):
+
+    def test_folds_case_and_diacritics(self):
+        self.assertEqual(['cafe', 'creme', '2016'],
+                         search.tokenize('Café Crème, 2016!'))
+
+
+class TestMakeSnippet(TestCase):
+
+    def setUp(self):
+        self.fields = {'name': 'Keynote', 'presenters': '', 'biographies': '',
+                       'description': ' '.join(
+                           'word{}'.format(n) for n in range(40))}
+
+    def test_marks_matches_with_context(self):
+        snippet = search.make_snippet(self.fields, ['word20'])
+
+        self.assertTrue(snippet.startswith('…word16 word17'))
+        self.assertIn('\x02word20\x03', snippet)
+        self.assertTrue(snippet.endswith('word31…'))
+
+    def test_uses_field_with_most_matches(self):
+        self.fields['name'] = 'Python'
+        self.fields['presenters'] = 'Python Pythonista'
+
+        self.assertEqual('\x02Python\x03 \x02Pythonista\x03',
+                         search.make_snippet(self.fields, ['python']))
+
+    def test_highlight_escapes(self):
+        self.assertEqual('&lt;b&gt; <mark>x</mark>',
+                         search.highlight('<b> \x02x\x03'))
+
+
+class BackendTestMixin(object):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.python = TimeSlotFactory(
+            conference=self.conference, name='Python for the web',
+            description='Building web applications with Django.')
+        self.data = TimeSlotFactory(
+            conference=self.conference, name='Data science',
+            description='Numbers, and a little Python.')
+        self.data.presenters.add(Presenter.objects.create(
+            name='Ada Lovelace', biography='Wrote the first program.'))
+        self.other = TimeSlotFactory(name='Python elsewhere')
+
+    def search(self, text, **kwargs):
+        return self.backend.search(text, **kwargs)
+
+    def test_ranks_name_matches_first(self):
+        results = self.search('python')
+
+        self.assertEqual(self.data, results[-1].timeslot)
+        self.assertEqual(3, len(results))
+        self.assertGreater(results[0].score, results[-1].score)
+
+    def test_matches_all_words_as_prefixes(self):
+        results = self.search('pyth web')
+
+        self.assertEqual([self.python], [result.timeslot
+                                         for result in results])
+
+    def test_searches_presenters(self):
+        result, = self.search('lovelace')
+
+        self.assertEqual(self.data, result.timeslot)
+        self.assertEqual('Ada <mark>Lovelace</mark>', result.snippet)
+
+    def test_highlights_description(self):
+        result, = self.search('django')
+
+        self.assertIn('<mark>Django</mark>', result.snippet)
+
+    def test_filters_by_conference(self):
+        results = self.search('python', conference=self.conference)
+
+        self.assertNotIn(self.other, [result.timeslot for result in results])
+
+    def test_limit(self):
+        self.assertEqual(1, len(self.search('python', limit=1)))
+
+    def test_empty_query(self):
+        self.assertEqual([], self.search(' ,'))
+
+    def test_index_is_updated(self):
+        self.python.name = 'Rust for the web'
+        self.python.save()
+
+        self.assertEqual([self.python], [
+            result.timeslot for result in self.search('rust')])
+
+    def test_deleted_time_slots_are_removed(self):
+        self.other.delete()
+
+        self.assertEqual(2, len(self.search('python')))
+
+    def test_rebuild(self):
+        self.backend.rebuild()
+
+        self.assertEqual(3, len(self.search('python')))
+
+
+class TestFTS5Backend(BackendTestMixin, TestCase):
+
+    def setUp(self):
+        if not search.FTS5Backend.is_available(connection):
+            self.skipTest('SQLite FTS5 is not available.')
+        self.backend = search.FTS5Backend()
+        patcher = mock.patch.object(search, 'get_backend',
+                                    return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestFTS5Backend, self).setUp()
+
+
+class TestMemoryBackend(BackendTestMixin, TestCase):
+
+    def setUp(self):
+        self.backend = search.MemoryBackend()
+        patcher = mock.patch.object(search, 'get_backend',
+                                    return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestMemoryBackend, self).setUp()
+
+    def test_index_is_built_on_first_query(self):
+        self.assertFalse(self.backend.built)
+
+        with self.assertNumQueries(2):
+            self.search('python', limit=0)
+
+        self.assertTrue(self.backend.built)
+
+
+class TestGetBackend(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(search._backends, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_falls_back_to_memory_backend(self):
+        with mock.patch.object(search.FTS5Backend, 'is_available',
+                               return_value=False):
+            self.assertIsInstance(search.get_backend(), search.MemoryBackend)
+
+    @override_settings(
+        CONFERENCE_SEARCH_BACKEND='conference.search.MemoryBackend')
+    def test_configured_backend(self):
+        backend = search.get_backend()
+
+        self.assertIsInstance(backend, search.MemoryBackend)
+        self.assertIs(backend, search.get_backend())
+
+
+class TestRebuildSearchIndexCommand(TestCase):
+
+    def setUp(self):
+        self.backend = search.MemoryBackend()
+        patcher = mock.patch.object(search, 'get_backend',
+                                    return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rebuilds_index(self):
+        timeslot = TimeSlotFactory(name='Python')
+        stdout = six.StringIO()
+
+        call_command('rebuild_search_index', stdout=stdout)
+
+        self.assertIn('Rebuilt the MemoryBackend', stdout.getvalue())
+        self.assertTrue(self.backend.built)
+        self.assertEqual([timeslot], [
+            result.timeslot for result in self.backend.search('python')])
+
+
+class TestSearchView(TestCase):
+
+    def setUp(self):
+        self.timeslot = TimeSlotFactory(name='Python <3')
+        self.url = reverse('conference:conference_search',
+                           kwargs={'slug': self.timeslot.conference.slug})
+
+    def test_renders_results(self):
+        response = self.client.get(self.url, {'q': 'python'})
+
+        self.assertEqual([self.timeslot], [
+            result.timeslot for result in response.context['results']])
+        self.assertContains(response, '<mark>Python</mark> &lt;3')
+
+    def test_without_query(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual([], response.context['results'])
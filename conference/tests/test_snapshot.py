@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache, snapshot
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.ical import iter_calendar
+from conference.models import Presenter, Resource, ScheduleEntry, TimeSlot
+from dateutil.relativedelta import relativedelta
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import six, timezone
+from freezegun import freeze_time
+
+
+@override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=True)
+class TestScheduleSnapshot(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.venue = VenueFactory(name='Centre')
+        self.timeslot = TimeSlotFactory(conference=self.conference,
+                                        name='Keynote')
+        self.presenter = Presenter.objects.create(name='Bob')
+        self.resource = Resource.objects.create(name='Hall', venue=self.venue)
+        self.timeslot.presenters.add(
+            self.presenter, Presenter.objects.create(name='Ada'))
+        self.timeslot.resources.add(self.resource)
+
+    def get_entry(self):
+        return ScheduleEntry.objects.get(timeslot=self.timeslot)
+
+    def test_entry_is_created(self):
+        entry = self.get_entry()
+
+        self.assertEqual(self.conference.pk, entry.conference_id)
+        self.assertEqual('Keynote', entry.name)
+        self.assertEqual(self.timeslot.start_at, entry.start_at)
+        self.assertEqual(['Ada', 'Bob'], entry.presenter_names)
+        self.assertEqual(['Hall'], entry.resource_names)
+
+    def test_entry_is_updated_when_time_slot_changes(self):
+        self.timeslot.name = 'Opening keynote'
+        self.timeslot.save()
+
+        self.assertEqual('Opening keynote', self.get_entry().name)
+
+    def test_entry_is_updated_when_presenter_changes(self):
+        self.presenter.name = 'Carol'
+        self.presenter.save()
+
+        self.assertEqual(['Ada', 'Carol'], self.get_entry().presenter_names)
+
+    def test_entry_is_updated_when_presenter_is_deleted(self):
+        self.presenter.delete()
+
+        self.assertEqual(['Ada'], self.get_entry().presenter_names)
+
+    def test_entry_is_updated_when_relation_is_cleared_in_reverse(self):
+        self.resource.timeslots.clear()
+
+        self.assertEqual([], self.get_entry().resource_names)
+
+    def test_entry_is_deleted_with_time_slot(self):
+        self.timeslot.delete()
+
+        self.assertFalse(ScheduleEntry.objects.exists())
+
+    def test_only_affected_entries_are_rebuilt(self):
+        other = TimeSlotFactory(conference=self.conference)
+        ScheduleEntry.objects.filter(timeslot=other).update(name='Stale')
+
+        self.presenter.name = 'Carol'
+        self.presenter.save()
+
+        self.assertEqual('Stale', ScheduleEntry.objects.get(
+            timeslot=other).name)
+
+    def test_check_is_consistent(self):
+        self.assertEqual([], snapshot.check())
+
+    def test_check_finds_problems(self):
+        other = TimeSlotFactory(conference=self.conference)
+        ScheduleEntry.objects.filter(timeslot=self.timeslot).update(
+            presenters_data='[]')
+        ScheduleEntry.objects.filter(timeslot=other).delete()
+
+        self.assertEqual(
+            sorted([('stale', self.timeslot.pk), ('missing', other.pk)]),
+            sorted(snapshot.check()))
+
+    def test_check_finds_orphaned_entries(self):
+        with override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=False):
+            TimeSlot.objects.filter(pk=self.timeslot.pk).delete()
+        ScheduleEntry.objects.create(
+            timeslot_id=self.timeslot.pk, conference=self.conference,
+            name='Orphan', start_at=timezone.now(), end_at=timezone.now(),
+            updated_at=timezone.now())
+
+        self.assertEqual([('orphaned', self.timeslot.pk)], snapshot.check())
+
+    def test_rebuild_conference(self):
+        ScheduleEntry.objects.all().delete()
+
+        snapshot.rebuild(conferences=[self.conference.pk])
+
+        self.assertEqual([], snapshot.check())
+
+    def test_calendar_is_read_from_snapshot(self):
+        with override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=False):
+            expected = ''.join(iter_calendar(self.conference, 'example.com'))
+
+        with self.assertNumQueries(1):
+            content = ''.join(iter_calendar(self.conference, 'example.com'))
+
+        self.assertEqual(expected, content)
+        self.assertIn('LOCATION:Hall (Centre)', content)
+
+
+@override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=True)
+class TestConferenceDetailViewSnapshot(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory()
+        venue = VenueFactory()
+        for index in range(5):
+            timeslot = TimeSlotFactory(
+                conference=self.conference,
+                start_at=self.now + relativedelta(hours=index - 1),
+                end_at=self.now + relativedelta(hours=index))
+            timeslot.presenters.add(
+                Presenter.objects.create(name='Presenter {}'.format(index)),
+                Presenter.objects.create(name='Co-presenter {}'.format(index)))
+            timeslot.resources.add(Resource.objects.create(
+                name='Room {}'.format(index), venue=venue))
+        self.url = self.conference.get_absolute_url()
+
+    def test_loads_schedule_in_one_query(self):
+        with freeze_time(self.now), self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_renders_same_schedule(self):
+        with freeze_time(self.now):
+            content = self.client.get(self.url).content
+            cache.get_cache().clear()
+            with override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=False):
+                expected = self.client.get(self.url).content
+
+        self.assertIn(b'Co-presenter 1', content)
+        self.assertEqual(expected, content)
+
+
+@override_settings(CONFERENCE_SCHEDULE_SNAPSHOT=True)
+class TestCheckScheduleSnapshotCommand(TestCase):
+
+    def setUp(self):
+        self.timeslot = TimeSlotFactory()
+
+    def call(self, *args):
+        stdout = six.StringIO()
+        call_command('check_schedule_snapshot', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_consistent(self):
+        self.assertIn('consistent', self.call())
+
+    def test_reports_and_rebuilds_problems(self):
+        ScheduleEntry.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            self.call()
+
+        output = self.call('--rebuild')
+
+        self.assertIn('Missing: {}'.format(self.timeslot.pk), output)
+        self.assertIn('consistent', self.call(
+            self.timeslot.conference.slug))
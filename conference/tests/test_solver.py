@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Presenter, Resource, TimeSlot
+from conference.signals import schedule_changed
+from conference.solver import Intervals, ScheduleSolver, SolverError
+from django.test import TestCase
+from django.utils import timezone
+import datetime
+
+
+def at(hour, minute=0, day=2):
+    return timezone.datetime(2016, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+class TestIntervals(TestCase):
+
+    def setUp(self):
+        self.intervals = Intervals([(1, 3), (5, 7)])
+
+    def test_is_free(self):
+        self.assertTrue(self.intervals.is_free(3, 5))
+        self.assertTrue(self.intervals.is_free(7, 9))
+        self.assertFalse(self.intervals.is_free(2, 4))
+        self.assertFalse(self.intervals.is_free(0, 9))
+        self.assertFalse(self.intervals.is_free(6, 7))
+
+    def test_contains(self):
+        self.assertTrue(self.intervals.contains(5, 7))
+        self.assertFalse(self.intervals.contains(2, 6))
+        self.assertFalse(self.intervals.contains(0, 1))
+
+    def test_add_merges_overlapping_intervals(self):
+        self.intervals.add(2, 6)
+
+        self.assertEqual(([1], [7]),
+                         (self.intervals.starts, self.intervals.ends))
+
+    def test_add_keeps_intervals_sorted(self):
+        self.intervals.add(8, 9)
+        self.intervals.add(-1, 0)
+
+        self.assertEqual([-1, 1, 5, 8], self.intervals.starts)
+        self.assertEqual(4, len(self.intervals))
+
+
+class TestScheduleSolver(TestCase):
+
+    def setUp(self):
+        timezone.activate(timezone.utc)
+        self.addCleanup(timezone.deactivate)
+        self.conference = ConferenceFactory(
+            start_date=datetime.date(2016, 1, 2),
+            end_date=datetime.date(2016, 1, 3))
+        venue = VenueFactory()
+        self.conference.venues.add(venue)
+        self.room_a = Resource.objects.create(name='A', venue=venue)
+        self.room_b = Resource.objects.create(name='B', venue=venue)
+        self.presenter = Presenter.objects.create(name='Ada')
+
+    def create(self, name, hours=1, presenters=(), resources=(), start=9):
+        timeslot = TimeSlotFactory(
+            conference=self.conference, name=name, start_at=at(start),
+            end_at=at(start) + datetime.timedelta(hours=hours))
+        timeslot.presenters.add(*presenters)
+        timeslot.resources.add(*resources)
+        return timeslot
+
+    def solve(self, **kwargs):
+        return ScheduleSolver(self.conference, **kwargs).solve()
+
+    def test_places_sessions_in_free_rooms(self):
+        self.create('Booked', resources=[self.room_a])
+        session = self.create('Session')
+
+        solution = self.solve()
+
+        self.assertEqual([], solution.unscheduled)
+        assignment, = solution.assignments
+        self.assertEqual((session, self.room_b, at(9), at(10)),
+                         tuple(assignment))
+
+    def test_presenters_are_not_double_booked(self):
+        self.create('First', presenters=[self.presenter])
+        self.create('Second', presenters=[self.presenter])
+
+        solution = self.solve()
+
+        self.assertEqual([at(9), at(10)], sorted(
+            assignment.start_at for assignment in solution.assignments))
+
+    def test_respects_presenter_availability(self):
+        self.create('Session', presenters=[self.presenter])
+
+        solution = self.solve(availability={
+            self.presenter.pk: [(at(13, day=3), at(15, day=3))]})
+
+        self.assertEqual(at(13, day=3), solution.assignments[0].start_at)
+
+    def test_longer_sessions_are_placed_first(self):
+        self.create('Short')
+        self.create('Long', hours=2)
+
+        solution = self.solve()
+
+        self.assertEqual(['Long', 'Short'], [
+            assignment.timeslot.name for assignment in solution.assignments])
+
+    def test_sessions_which_do_not_fit_are_unscheduled(self):
+        session = self.create('Too long', hours=10)
+
+        solution = self.solve()
+
+        self.assertEqual([], solution.assignments)
+        self.assertEqual([session], solution.unscheduled)
+
+    def test_exhausted_time_budget_leaves_sessions_unscheduled(self):
+        self.create('Session')
+
+        solution = self.solve(time_budget=0)
+
+        self.assertEqual(1, len(solution.unscheduled))
+
+    def test_conference_without_dates(self):
+        self.conference.start_date = None
+
+        with self.assertRaises(SolverError):
+            self.solve()
+
+    def test_solution_is_conflict_free(self):
+        for n in range(20):
+            self.create('Session {}'.format(n), hours=1 + n % 2,
+                        presenters=[self.presenter] if n % 4 == 0 else [])
+
+        solver = ScheduleSolver(self.conference)
+        solution = solver.solve()
+        solver.save(solution)
+
+        self.assertEqual(20, len(solution.assignments))
+        self.assertEqual([], TimeSlot.objects.conflicts())
+
+    def test_save(self):
+        session = self.create('Session', start=12)
+        solver = ScheduleSolver(self.conference)
+        solution = solver.solve()
+        received = []
+
+        def receiver(sender, conferences, **kwargs):
+            received.extend(conferences)
+
+        schedule_changed.connect(receiver)
+        self.addCleanup(schedule_changed.disconnect, receiver)
+
+        with self.assertNumQueries(9):
+            solver.save(solution)
+
+        session.refresh_from_db()
+        self.assertEqual(at(9), session.start_at)
+        self.assertEqual(at(10), session.end_at)
+        self.assertEqual([self.room_a], list(session.resources.all()))
+        self.assertEqual([self.conference.pk], received)
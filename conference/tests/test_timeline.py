@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from collections import namedtuple
+from conference import cache, timeline
+from conference.factories import ConferenceFactory, TimeSlotFactory
+from conference.querysets import get_next_boundary, split_now_next_later
+from conference.timeline import Timeline, get_timeline
+from django.test import TestCase
+from django.utils import timezone
+import datetime
+import random
+import uuid
+
+
+Row = namedtuple('Row', ['pk', 'start_at', 'end_at'])
+
+
+def at(hour, minute=0):
+    return timezone.datetime(2016, 1, 2, hour, minute, tzinfo=timezone.utc)
+
+
+class TestTimeline(TestCase):
+
+    def setUp(self):
+        self.rows = [Row(uuid.uuid4(), start_at, end_at)
+                     for start_at, end_at in [(at(9), at(10)),
+                                              (at(9, 30), at(11)),
+                                              (at(10), at(10, 30)),
+                                              (at(12), at(13))]]
+        self.timeline = Timeline.build(self.rows)
+
+    def pks(self, *indexes):
+        return [self.rows[index].pk for index in indexes]
+
+    def test_before_first_timeslot(self):
+        self.assertEqual(([], self.rows[0].pk, self.rows[1].pk),
+                         self.timeline.now_next_later(at(8)))
+        self.assertEqual(at(9), self.timeline.next_boundary(at(8)))
+
+    def test_overlapping_timeslots(self):
+        self.assertEqual((self.pks(0, 1), self.rows[2].pk, self.rows[3].pk),
+                         self.timeline.now_next_later(at(9, 45)))
+        self.assertEqual(at(10), self.timeline.next_boundary(at(9, 45)))
+
+    def test_at_boundary(self):
+        self.assertEqual((self.pks(1, 2), self.rows[3].pk, None),
+                         self.timeline.now_next_later(at(10)))
+        self.assertEqual(at(10, 30), self.timeline.next_boundary(at(10)))
+
+    def test_between_timeslots(self):
+        self.assertEqual(([], self.rows[3].pk, None),
+                         self.timeline.now_next_later(at(11, 30)))
+
+    def test_after_last_timeslot(self):
+        self.assertEqual(([], None, None),
+                         self.timeline.now_next_later(at(13)))
+        self.assertIsNone(self.timeline.next_boundary(at(13)))
+
+    def test_empty(self):
+        timeline = Timeline.build([])
+
+        self.assertEqual(0, len(timeline))
+        self.assertEqual(([], None, None), timeline.now_next_later(at(9)))
+        self.assertIsNone(timeline.next_boundary(at(9)))
+
+    def test_preserves_microseconds(self):
+        start_at = at(9).replace(microsecond=123457)
+        timeline = Timeline.build([(uuid.uuid4(), start_at, at(10))])
+
+        self.assertEqual(start_at, timeline.next_boundary(at(8)))
+
+    def test_stores_arrays(self):
+        self.assertFalse(hasattr(self.timeline, '__dict__'))
+        self.assertEqual(4, len(self.timeline))
+        self.assertEqual(64, len(self.timeline.ids))
+
+    def test_matches_time_slot_lists(self):
+        rng = random.Random(0)
+        rows = []
+        for _ in range(200):
+            start_at = at(9) + datetime.timedelta(minutes=rng.randrange(600))
+            rows.append(Row(uuid.uuid4(), start_at, start_at +
+                            datetime.timedelta(minutes=rng.randrange(90))))
+        rows.sort(key=lambda row: (row.start_at, row.end_at, row.pk))
+        timeline = Timeline.build(rows)
+
+        for minute in range(-10, 720, 7):
+            time = at(9) + datetime.timedelta(minutes=minute)
+            current, next, later = split_now_next_later(rows, time)
+            self.assertEqual(
+                ([row.pk for row in current], next and next.pk,
+                 later and later.pk), timeline.now_next_later(time))
+            self.assertEqual(get_next_boundary(rows, time),
+                             timeline.next_boundary(time))
+
+    def test_long_timeslot_spans_checkpoints(self):
+        rows = [Row(uuid.uuid4(), at(9), at(17))] + [
+            Row(uuid.uuid4(), at(9, minute), at(9, minute + 1))
+            for minute in range(1, 50)]
+        timeline = Timeline.build(rows)
+
+        self.assertEqual(([rows[0].pk, rows[40].pk], rows[41].pk,
+                          rows[42].pk), timeline.now_next_later(at(9, 40)))
+        self.assertEqual(at(9, 41), timeline.next_boundary(at(9, 40)))
+        self.assertEqual(([rows[0].pk], None, None),
+                         timeline.now_next_later(at(12)))
+        self.assertEqual(at(17), timeline.next_boundary(at(12)))
+
+
+class TestGetTimeline(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.conference = ConferenceFactory()
+        self.timeslot = TimeSlotFactory(conference=self.conference,
+                                        start_at=at(9), end_at=at(10))
+
+    def test_builds_lazily_in_one_query(self):
+        with self.assertNumQueries(1):
+            timeline = get_timeline(self.conference.pk)
+
+        with self.assertNumQueries(0):
+            self.assertIs(timeline, get_timeline(self.conference.pk))
+        self.assertEqual(([self.timeslot.pk], None, None),
+                         timeline.now_next_later(at(9, 30)))
+
+    def test_builds_from_loaded_timeslots(self):
+        timeslots = list(self.conference.timeslots.all())
+
+        with self.assertNumQueries(0):
+            timeline = get_timeline(self.conference.pk, lambda: timeslots)
+
+        self.assertEqual(at(10), timeline.next_boundary(at(9, 30)))
+
+    def test_rebuilds_after_schedule_edited(self):
+        get_timeline(self.conference.pk)
+
+        self.timeslot.end_at = at(11)
+        self.timeslot.save()
+
+        self.assertNotIn(self.conference.pk, timeline._timelines)
+        self.assertEqual(at(11), get_timeline(
+            self.conference.pk).next_boundary(at(9, 30)))
+
+    def test_rebuilds_when_version_changes(self):
+        built = get_timeline(self.conference.pk)
+
+        # As when the schedule is edited by another process.
+        cache.bump_version(self.conference.pk)
+
+        self.assertIsNot(built, get_timeline(self.conference.pk))
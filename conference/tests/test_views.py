@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from conference import cache
+from conference.instrumentation import InstrumentationTestMixin
+from conference.factories import (ConferenceFactory, TimeSlotFactory,
+                                  VenueFactory)
+from conference.models import Conference, Presenter, Resource
+from conference.views.conference import ListView
+from dateutil.relativedelta import relativedelta
+from django.core.urlresolvers import reverse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+
+class TestConferenceDetailView(InstrumentationTestMixin, TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        self.conference = ConferenceFactory()
+        self.venue = VenueFactory()
+        self.url = self.conference.get_absolute_url()
+
+    def create_timeslots(self, count, start_at):
+        for index in range(count):
+            timeslot = TimeSlotFactory(
+                conference=self.conference,
+                start_at=start_at + relativedelta(hours=index),
+                end_at=start_at + relativedelta(hours=index + 1))
+            timeslot.presenters.add(
+                Presenter.objects.create(name='Presenter {}'.format(index)),
+                Presenter.objects.create(name='Co-presenter {}'.format(index)))
+            timeslot.resources.add(Resource.objects.create(
+                name='Room {}'.format(index), venue=self.venue))
+
+    def test_loads_schedule_in_fixed_queries_with_one_timeslot(self):
+        self.create_timeslots(1, start_at=self.now + relativedelta(hours=-1))
+
+        with freeze_time(self.now), self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_loads_schedule_in_fixed_queries_with_many_timeslots(self):
+        self.create_timeslots(30, start_at=self.now + relativedelta(hours=-1))
+
+        with freeze_time(self.now), self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_does_not_repeat_queries_for_each_timeslot(self):
+        self.create_timeslots(30, start_at=self.now + relativedelta(hours=-1))
+
+        with freeze_time(self.now), self.assertMeasured(
+                'conference:conference_detail', max_queries=4):
+            self.client.get(self.url)
+
+    def test_renders_now_next_and_later_timeslots(self):
+        self.create_timeslots(3, start_at=self.now + relativedelta(hours=-0.5))
+
+        with freeze_time(self.now):
+            response = self.client.get(self.url)
+
+        schedule = response.context['schedule']
+        self.assertEqual(['Room 0'],
+                         [timeslot.resources[0].name
+                          for timeslot in schedule.current])
+        self.assertEqual(schedule.timeslots[1], schedule.next)
+        self.assertEqual(schedule.timeslots[2], schedule.later)
+        self.assertContains(response, '<h2>Now</h2>')
+        self.assertContains(response, '<h2>Later</h2>')
+        self.assertContains(response, 'with Co-presenter 2 and Presenter 2')
+
+    def test_renders_no_now_section_when_nothing_is_happening(self):
+        self.create_timeslots(1, start_at=self.now + relativedelta(hours=+1))
+
+        with freeze_time(self.now):
+            response = self.client.get(self.url)
+
+        self.assertNotContains(response, '<h2>Now</h2>')
+        self.assertContains(response, '<h2>Next</h2>')
+        self.assertNotContains(response, '<h2>Later</h2>')
+
+
+class TestConferenceDetailViewConditionalRequests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.now = timezone.pytz.timezone('Atlantic/Azores').localize(
+            timezone.datetime(2016, 1, 2, 11, 12))
+        with freeze_time(self.now + relativedelta(days=-1)):
+            self.conference = ConferenceFactory()
+            self.timeslot = TimeSlotFactory(
+                conference=self.conference,
+                start_at=self.now + relativedelta(minutes=-30),
+                end_at=self.now + relativedelta(minutes=+30))
+            self.presenter = Presenter.objects.create(name='Presenter')
+            self.timeslot.presenters.add(self.presenter)
+        self.url = self.conference.get_absolute_url()
+
+    def get(self, at=None, **headers):
+        with freeze_time(at or self.now):
+            return self.client.get(self.url, **headers)
+
+    def test_sets_validators(self):
+        response = self.get()
+
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual('Sat, 02 Jan 2016 11:42:00 GMT',
+                         response['Last-Modified'])
+
+    def test_not_modified_for_matching_etag(self):
+        etag = self.get()['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_not_modified_since_last_modified(self):
+        last_modified = self.get()['Last-Modified']
+
+        response = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_modified_when_timeslot_saved(self):
+        etag = self.get()['ETag']
+        self.timeslot.save()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+
+    def test_modified_when_presenter_saved(self):
+        etag = self.get()['ETag']
+        self.presenter.save()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+
+    def test_modified_when_presenter_removed(self):
+        etag = self.get()['ETag']
+        self.timeslot.presenters.remove(self.presenter)
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+
+    def test_not_modified_before_boundary(self):
+        etag = self.get()['ETag']
+
+        response = self.get(at=self.now + relativedelta(minutes=+29),
+                            HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_modified_when_boundary_passed(self):
+        response = self.get()
+
+        response = self.get(
+            at=self.now + relativedelta(minutes=+30),
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(200, response.status_code)
+
+    def test_not_found_for_unknown_conference(self):
+        self.url = '/conferences/unknown/'
+
+        response = self.get()
+
+        self.assertEqual(404, response.status_code)
+
+
+class TestConferenceListViewConditionalRequests(TestCase):
+
+    def setUp(self):
+        self.conference = ConferenceFactory()
+        self.url = reverse('conference:conference_list')
+
+    def test_not_modified_for_matching_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+
+    def test_modified_when_conference_created(self):
+        etag = self.client.get(self.url)['ETag']
+        ConferenceFactory()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+
+    def test_modified_when_conference_deleted(self):
+        ConferenceFactory().delete()
+        etag = self.client.get(self.url)['ETag']
+        self.conference.delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+
+
+class TestConferenceListView(TestCase):
+
+    def setUp(self):
+        for index in range(3):
+            ConferenceFactory(start_date=timezone.datetime(2016, 1, index + 1))
+        self.url = reverse('conference:conference_list')
+
+    def test_links_to_conferences(self):
+        response = self.client.get(self.url)
+
+        for conference in Conference.objects.all():
+            self.assertContains(response, '<a href="{}">{}</a>'.format(
+                conference.get_absolute_url(), conference))
+
+    def test_paginates_conferences(self):
+        response = self.client.get(self.url)
+        page = response.context['page_obj']
+
+        self.assertFalse(response.context['is_paginated'])
+        self.assertEqual(list(Conference.objects.all()), list(page))
+
+    def test_follows_next_link(self):
+        view = ListView.as_view(paginate_by=2)
+        response = view(RequestFactory().get(self.url)).render()
+        cursor = response.context_data['page_obj'].next_cursor
+        self.assertContains(response, '?after={}'.format(cursor))
+
+        response = view(RequestFactory().get(self.url, {'after': cursor}))
+
+        self.assertEqual([Conference.objects.last()],
+                         list(response.context_data['object_list']))
+
+    def test_links_to_conferences_without_pagination(self):
+        view = ListView.as_view(paginate_by=None)
+        response = view(RequestFactory().get(self.url)).render()
+
+        self.assertIsNone(response.context_data['paginator'])
+        for conference in Conference.objects.all():
+            self.assertContains(response, '<a href="{}">{}</a>'.format(
+                conference.get_absolute_url(), conference))
+
+    def test_makes_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_not_found_for_invalid_cursor(self):
+        response = self.client.get(self.url, {'after': 'invalid'})
+
+        self.assertEqual(404, response.status_code)
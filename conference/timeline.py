@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory timelines of conference schedules, answering which time slots
+are current, next and next+1 at a point in time by binary search, without
+querying the database.
+
+A timeline holds the primary keys, and start and end times, of a
+conference's time slots in start order, in arrays. The next time slots are
+found by binary search of the start times, and the current ones from a
+checkpoint of the time slots running every :py:data:`.CHECKPOINT` starts,
+so its size grows with the number of time slots, rather than with the
+number of intervals between boundaries times the number of parallel
+tracks. Timelines are built lazily, with a single query, and
+kept for each process; they are rebuilt when the conference's schedule
+cache version changes (see :py:mod:`conference.cache`), so an edit in one
+process invalidates the timelines of the others.
+
+"""
+
+from __future__ import absolute_import, unicode_literals
+from . import cache, routers
+from .models import TimeSlot
+from .querysets import NowNextLater
+from .signals import schedule_changed
+from array import array
+from django.conf import settings
+from django.dispatch import receiver
+from django.utils import timezone
+import bisect
+import calendar
+import datetime
+import uuid
+
+
+#: Number of time slot starts between checkpoints of the running time slots.
+#: Lookups check the end times of at most this many time slots, besides
+#: those in the checkpoint.
+CHECKPOINT = 16
+
+_timelines = {}
+
+
+def to_microseconds(value):
+    """Convert a time to microseconds since the epoch, which floats hold
+    exactly.
+
+    :type value: :py:class:`~datetime.datetime`
+    :rtype: int
+    """
+    return (calendar.timegm(value.utctimetuple()) * 1000000 +
+            value.microsecond)
+
+
+def from_microseconds(value):
+    """Convert microseconds since the epoch to a time, aware of the UTC time
+    zone if time zone support is enabled.
+
+    :rtype: :py:class:`~datetime.datetime`
+    """
+    epoch = datetime.datetime(1970, 1, 1)
+    if settings.USE_TZ:
+        epoch = epoch.replace(tzinfo=timezone.utc)
+    return epoch + datetime.timedelta(microseconds=int(value))
+
+
+class Timeline(object):
+    """The start and end times of a conference's time slots, with
+    checkpoints of the time slots running as they start.
+
+    Build timelines with :py:meth:`.build`, or :py:func:`.get_timeline`.
+
+    """
+
+    __slots__ = ['checkpoint_offsets', 'checkpoint_slots', 'ends', 'ids',
+                 'starts']
+
+    def __init__(self, ids, starts, ends, checkpoint_slots,
+                 checkpoint_offsets):
+        #: Time slot primary keys, as 16 bytes each, ordered by start time.
+        self.ids = ids
+        #: Start and end times of each time slot, in microseconds since the
+        #: epoch.
+        self.starts = starts
+        self.ends = ends
+        #: Indexes of the time slots which started before index
+        #: ``checkpoint * CHECKPOINT``, and are still running when the last
+        #: of them starts, from ``checkpoint_offsets[checkpoint]`` to
+        #: ``checkpoint_offsets[checkpoint + 1]``.
+        self.checkpoint_slots = checkpoint_slots
+        self.checkpoint_offsets = checkpoint_offsets
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, rows):
+        """Build a timeline.
+
+        :param rows: Time slot primary keys (UUIDs), start and end times.
+        :type rows: iterable
+        :rtype: :py:class:`.Timeline`
+        """
+        rows = sorted((to_microseconds(start_at), to_microseconds(end_at),
+                       pk) for pk, start_at, end_at in rows)
+        starts = array('d', [start for start, _, _ in rows])
+        ends = array('d', [end for _, end, _ in rows])
+        checkpoint_slots, checkpoint_offsets = array('I'), array('I', [0, 0])
+        active, previous = [], 0
+        for position in range(CHECKPOINT, len(rows) + 1, CHECKPOINT):
+            # Start times only increase, so a time slot which has ended by
+            # one checkpoint has ended by all of the following ones.
+            at = starts[position - 1]
+            active = [index for index in active if ends[index] > at]
+            active.extend(index for index in range(previous, position)
+                          if ends[index] > at)
+            checkpoint_slots.extend(active)
+            checkpoint_offsets.append(len(checkpoint_slots))
+            previous = position
+        ids = b''.join(pk.bytes for _, _, pk in rows)
+        return cls(ids, starts, ends, checkpoint_slots, checkpoint_offsets)
+
+    def get_id(self, index):
+        if index < len(self.starts):
+            return uuid.UUID(bytes=self.ids[index * 16:index * 16 + 16])
+
+    def get_slots(self, at):
+        """Get the number of time slots started at the given time, and the
+        indexes of those still running, in start order.
+
+        :param at: Reference time, in microseconds since the epoch.
+        :type at: float
+        :rtype: tuple
+        """
+        position = bisect.bisect_right(self.starts, at)
+        checkpoint = position // CHECKPOINT
+        ends = self.ends
+        current = [index for index in self.checkpoint_slots[
+            self.checkpoint_offsets[checkpoint]:
+            self.checkpoint_offsets[checkpoint + 1]] if ends[index] > at]
+        current.extend(index for index in range(checkpoint * CHECKPOINT,
+                                                position)
+                       if ends[index] > at)
+        return position, current
+
+    def next_boundary(self, at):
+        """Get the first time after the given time at which a time slot
+        starts or ends.
+
+        :param at: Reference time.
+        :type at: :py:class:`~datetime.datetime`
+        :returns: Boundary time, or ``None`` if no time slots end after the
+            reference time.
+        :rtype: :py:class:`~datetime.datetime`
+        """
+        position, current = self.get_slots(to_microseconds(at))
+        # Time slots starting later also end later than the next one starts.
+        boundaries = [self.ends[index] for index in current]
+        if position < len(self.starts):
+            boundaries.append(self.starts[position])
+        if boundaries:
+            return from_microseconds(min(boundaries))
+
+    def now_next_later(self, at):
+        """Get the primary keys of the time slots happening at, and the next
+        two starting after, the given time.
+
+        :param at: Reference time.
+        :type at: :py:class:`~datetime.datetime`
+        :returns: Current time slot primary keys, ordered by start time, and
+            the next and next+1 future time slot primary keys (or ``None``).
+        :rtype: :py:class:`~conference.querysets.NowNextLater`
+        """
+        position, current = self.get_slots(to_microseconds(at))
+        return NowNextLater([self.get_id(index) for index in current],
+                            self.get_id(position), self.get_id(position + 1))
+
+
+def get_timeline(conference_pk, timeslots=None):
+    """Get the timeline of a conference, building it if the conference's
+    schedule has changed since it was last built by this process.
+
+    :param conference_pk: Conference primary key.
+    :param timeslots: Function returning the time slots (or schedule
+        entries) of the conference, e.g. from the schedule cache, to build
+        the timeline from instead of querying the database.
+    :type timeslots: callable
+    :rtype: :py:class:`.Timeline`
+    """
+    version = cache.get_version(conference_pk)
+    entry = _timelines.get(conference_pk)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    # Read from the primary database, as a lagging replica's time slots
+    # would be kept under the new version.
+    with routers.pinned():
+        if timeslots is None:
+            rows = list(TimeSlot.objects.filter(conference_id=conference_pk)
+                        .values_list('pk', 'start_at', 'end_at'))
+        else:
+            rows = [(timeslot.pk, timeslot.start_at, timeslot.end_at)
+                    for timeslot in timeslots()]
+    # An edit while building bumps the version, so the timeline is built
+    # again on the next lookup.
+    timeline = Timeline.build(rows)
+    _timelines[conference_pk] = (version, timeline)
+    return timeline
+
+
+@receiver(schedule_changed)
+def invalidate(sender, conferences, **kwargs):
+    for conference_pk in conferences:
+        _timelines.pop(conference_pk, None)
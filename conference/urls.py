@@ -16,7 +16,8 @@
 
 
 from __future__ import absolute_import, unicode_literals
-from .views import conference
+from .views import (agenda, api, calendar, conference, live, metrics,
+                    search)
 from django.conf.urls import url
 
 
@@ -28,7 +29,28 @@ urlpatterns = [
     url(r'^$',
         conference.ListView.as_view(), name='conference_list'),
 
+    url(r'^metrics$',
+        metrics.MetricsView.as_view(), name='metrics'),
+
     url(r'^(?P<slug>[\w-]+)/$',
         conference.DetailView.as_view(), name='conference_detail'),
 
+    url(r'^(?P<slug>[\w-]+)/schedule\.ics$',
+        calendar.CalendarView.as_view(), name='conference_calendar'),
+
+    url(r'^(?P<slug>[\w-]+)/schedule\.json$',
+        api.ScheduleView.as_view(), name='conference_schedule'),
+
+    url(r'^(?P<slug>[\w-]+)/events$',
+        live.EventStreamView.as_view(), name='conference_events'),
+
+    url(r'^(?P<slug>[\w-]+)/search/$',
+        search.SearchView.as_view(), name='conference_search'),
+
+    url(r'^(?P<slug>[\w-]+)/agenda/$',
+        agenda.AgendaView.as_view(), name='conference_agenda'),
+
+    url(r'^(?P<slug>[\w-]+)/bookmarks/$',
+        agenda.BookmarkView.as_view(), name='conference_bookmark'),
+
 ]
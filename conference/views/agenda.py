@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .. import agenda
+from ..models import Conference, TimeSlot
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.urlresolvers import reverse
+from django.http import Http404, HttpResponseRedirect
+from django.utils.http import is_safe_url
+from django.views import generic
+
+
+class AgendaView(generic.detail.SingleObjectMixin, generic.TemplateView):
+    """List the time slots of a conference starred by the current user, or
+    anonymous visitor, with those which clash."""
+
+    model = Conference
+
+    template_name = 'conference/conference_agenda.html'
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(AgendaView, self).get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        owner = agenda.get_owner(self.request)
+        kwargs['timeslots'] = agenda.get_agenda(
+            self.object, **owner) if owner is not None else []
+        kwargs['next'] = self.request.get_full_path()
+        return super(AgendaView, self).get_context_data(**kwargs)
+
+
+class BookmarkView(generic.detail.SingleObjectMixin, generic.View):
+    """Star, or unstar (when ``remove`` is posted), a time slot, then
+    redirect to ``next`` or the agenda."""
+
+    model = Conference
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        try:
+            timeslot = TimeSlot.objects.get(conference=self.object,
+                                            pk=request.POST.get('timeslot'))
+        except (TimeSlot.DoesNotExist, ValidationError, ValueError):
+            raise Http404('No time slot found.')
+        owner = agenda.get_owner(request, create=True)
+        if owner is None:
+            raise PermissionDenied('Bookmarks require a user, or a session.')
+        if 'remove' in request.POST:
+            agenda.remove(timeslot, **owner)
+        else:
+            agenda.add(timeslot, **owner)
+        url = request.POST.get('next')
+        if not is_safe_url(url, host=request.get_host()):
+            url = reverse('conference:conference_agenda',
+                          kwargs={'slug': self.object.slug})
+        return HttpResponseRedirect(url)
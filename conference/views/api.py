@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .. import snapshot
+from ..models import Conference
+from ..schedule import Schedule
+from ..serializers import FieldError, TimeSlotSerializer
+from .mixins import ScheduleConditionalMixin
+from collections import OrderedDict
+from django.http import JsonResponse
+from django.views import generic
+
+
+class ScheduleView(ScheduleConditionalMixin,
+                   generic.detail.SingleObjectMixin, generic.View):
+    """A conference schedule as JSON.
+
+    The ``fields`` query string parameter selects a comma-separated list of
+    time slot fields, using dotted paths for related objects (e.g.
+    ``?fields=name,start_at,presenters.name``). The ``when`` parameter
+    filters for ``past``, ``current`` or ``future`` time slots.
+
+    The whole schedule, with fields held by time slot records, is serialized
+    from the records shared with the schedule page (see
+    :py:class:`~conference.schedule.Schedule`).
+
+    """
+
+    model = Conference
+
+    #: Whether to read the time slot records from the schedule cache.
+    cache_schedule = True
+
+    #: Time slot filters which may be selected with ``when``.
+    filters = ['past', 'current', 'future']
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        fields = request.GET.get('fields')
+        try:
+            serializer = TimeSlotSerializer(
+                fields=fields.split(',') if fields else None)
+        except FieldError as e:
+            return JsonResponse({'error': e.args[0]}, status=400)
+        queryset = self.object.timeslots.all()
+        when = request.GET.get('when')
+        if when:
+            if when not in self.filters:
+                return JsonResponse(
+                    {'error': 'Unknown filter "{}".'.format(when)},
+                    status=400)
+            queryset = getattr(queryset, when)()
+        if not when and serializer.supports_records and \
+                not snapshot.is_enabled():
+            timeslots = serializer.serialize_records(Schedule(
+                self.object, cached=self.cache_schedule).timeslots)
+        else:
+            timeslots = serializer.serialize(queryset)
+        return JsonResponse(OrderedDict([
+            ('conference', OrderedDict([
+                ('id', self.object.pk),
+                ('name', self.object.name),
+                ('slug', self.object.slug),
+            ])),
+            ('timeslots', timeslots),
+        ]))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ..ical import iter_calendar
+from ..models import Conference
+from django.http import StreamingHttpResponse
+from django.views import generic
+
+
+class CalendarView(generic.detail.SingleObjectMixin, generic.View):
+    """Stream a conference schedule as an iCalendar feed, loading a fixed
+    number of time slots at a time."""
+
+    model = Conference
+
+    #: Number of time slots loaded at a time.
+    chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        response = StreamingHttpResponse(
+            iter_calendar(self.object, domain=request.get_host(),
+                          chunk_size=self.chunk_size),
+            content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="{}.ics"'.format(
+            self.object.slug)
+        return response
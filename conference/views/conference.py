@@ -16,15 +16,116 @@
 
 
 from __future__ import absolute_import, unicode_literals
+from .. import cache, routers
 from ..models import Conference
+from ..pagination import KeysetPaginator
+from ..schedule import Schedule
+from .mixins import (ConditionalMixin, InstrumentedMixin,
+                     ScheduleConditionalMixin)
+from django.core.paginator import InvalidPage
+from django.core.urlresolvers import reverse
+from django.db import models
+from django.http import Http404, HttpResponse
+from django.utils import timezone, translation
 from django.views import generic
 
 
-class DetailView(generic.DetailView):
+class DetailView(InstrumentedMixin, ScheduleConditionalMixin,
+                 generic.DetailView):
 
     model = Conference
 
+    #: Whether to cache the rendered page until the conference schedule is
+    #: changed, or the next time slot boundary passes.
+    cache_page = True
 
-class ListView(generic.ListView):
+    #: Whether to cache the schedule data and rendered template fragments.
+    cache_schedule = True
+
+    def get(self, request, *args, **kwargs):
+        if not self.cache_page:
+            return super(DetailView, self).get(request, *args, **kwargs)
+        self.object = self.get_object()
+        key = cache.make_key(self.object.pk, 'detail',
+                             translation.get_language(),
+                             timezone.get_current_timezone_name())
+        content = cache.get_cache().get(key)
+        if content is not None:
+            return HttpResponse(content)
+        # The page is cached under the current version, so it is rendered
+        # from the primary database rather than a possibly lagging replica.
+        with routers.pinned():
+            if self.object._state.db != routers.get_primary():
+                self.object = self.get_object()
+            context = self.get_context_data(object=self.object)
+            response = self.render_to_response(context).render()
+        schedule = context['schedule']
+        cache.get_cache().set(key, response.content, cache.get_timeout(
+            schedule.next_boundary, at=schedule.at))
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super(DetailView, self).get_context_data(**kwargs)
+        context['schedule'] = self.get_schedule()
+        return context
+
+    def get_schedule(self):
+        """Get the prefetched schedule for the conference.
+
+        :returns: Conference schedule.
+        :rtype: :py:class:`~conference.schedule.Schedule`
+        """
+        return Schedule(self.object, cached=self.cache_schedule)
+
+
+class ListView(InstrumentedMixin, ConditionalMixin, generic.ListView):
 
     model = Conference
+
+    paginate_by = 50
+
+    paginator_class = KeysetPaginator
+
+    #: Name of the query string parameter holding the page cursor.
+    cursor_kwarg = 'after'
+
+    def get_queryset(self):
+        queryset = super(ListView, self).get_queryset()
+        return queryset.only('id', 'name', 'slug', 'start_date')
+
+    def get_context_data(self, **kwargs):
+        context = super(ListView, self).get_context_data(**kwargs)
+        if context['paginator'] is None:
+            self.set_urls(context['object_list'])
+        return context
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(queryset, per_page, field='start_date')
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the queryset by seeking to the requested cursor, and set
+        the URL of each conference on the page as ``url``."""
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        self.set_urls(page.object_list)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def set_urls(self, conferences):
+        """Set the URL of each conference as ``url``.
+
+        :param conferences: Conferences to be listed.
+        """
+        # Reverse the URL once, rather than once for each conference.
+        prefix, suffix = reverse('conference:conference_detail',
+                                 kwargs={'slug': '__slug__'}).split('__slug__')
+        for conference in conferences:
+            conference.url = prefix + conference.slug + suffix
+
+    def get_validators(self, request, *args, **kwargs):
+        values = self.get_queryset().aggregate(
+            updated_at=models.Max('updated_at'), count=models.Count('pk'))
+        return [values['updated_at'], values['count']], values['updated_at']
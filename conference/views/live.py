@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .. import live
+from ..models import Conference
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils.six.moves import queue
+from django.views import generic
+import time
+
+
+def format_event(event):
+    return 'id: {}\nevent: schedule\ndata: {}\n\n'.format(event.id,
+                                                          event.data)
+
+
+class EventStreamView(generic.detail.SingleObjectMixin, generic.View):
+    """Stream the current, next and next+1 time slots of a conference as
+    server-sent events, sent when a time slot starts or ends, or the
+    schedule is edited.
+
+    Events are published by the process's shared scheduler (see
+    :py:mod:`conference.live`), so streams make no database queries of their
+    own once connected. A client reconnecting with the ``Last-Event-ID`` of
+    the current event is not sent it again.
+
+    """
+
+    model = Conference
+
+    #: Seconds between comments keeping the connection open.
+    keepalive = 15
+
+    #: Milliseconds clients wait before reconnecting.
+    retry = 5000
+
+    #: Seconds after which the stream ends, and clients reconnect, freeing
+    #: the worker serving it.
+    timeout = 600
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if not connection.in_atomic_block:
+            # Streams are long lived, and do not need a connection.
+            connection.close()
+        response = StreamingHttpResponse(
+            self.stream(request.META.get('HTTP_LAST_EVENT_ID')),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def get_scheduler(self):
+        return live.get_scheduler()
+
+    def stream(self, last_event_id=None):
+        events = queue.Queue()
+        subscription = self.get_scheduler().subscribe(self.object.pk,
+                                                      events.put)
+        try:
+            yield 'retry: {}\n\n'.format(self.retry)
+            deadline = time.time() + self.timeout
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = events.get(timeout=min(self.keepalive,
+                                                   remaining))
+                except queue.Empty:
+                    yield ':\n\n'
+                    continue
+                if event.id != last_event_id:
+                    yield format_event(event)
+                last_event_id = None
+        finally:
+            subscription.cancel()
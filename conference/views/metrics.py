@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .. import instrumentation
+from django.http import Http404, HttpResponse
+from django.views import generic
+
+
+class MetricsView(generic.View):
+    """Expose the totals of the configured
+    :py:class:`~conference.instrumentation.PrometheusSink` in the Prometheus
+    text format."""
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request, *args, **kwargs):
+        sinks = [sink for sink in instrumentation.get_sinks()
+                 if isinstance(sink, instrumentation.PrometheusSink)]
+        if not sinks:
+            raise Http404('Metrics are not enabled.')
+        return HttpResponse(''.join(sink.render() for sink in sinks),
+                            content_type=self.content_type)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from .. import instrumentation
+from django.db import models
+from django.utils import timezone
+from django.views.decorators.http import condition
+import hashlib
+import time
+
+
+def boundary(aggregate, lookup, at):
+    """Aggregate the time slot start or end times before or after the given
+    time, e.g. ``boundary(Min, 'start_at__gt', at)``."""
+    field = 'timeslots__{}'.format(lookup.split('__')[0])
+    return aggregate(models.Case(
+        models.When(then=models.F(field), **{'timeslots__' + lookup: at}),
+        output_field=models.DateTimeField()))
+
+
+def annotate_validators(queryset, at):
+    """Annotate a conference queryset with the aggregates from which the
+    schedule validators are computed by :py:func:`get_schedule_validators`.
+
+    :param queryset: Conference queryset.
+    :param at: Time the next and last time slot boundaries are relative to.
+    :rtype: :py:class:`~django.db.models.query.QuerySet`
+    """
+    return queryset.annotate(
+        timeslots_updated_at=models.Max('timeslots__updated_at'),
+        timeslots_count=models.Count('timeslots'),
+        last_start_at=boundary(models.Max, 'start_at__lte', at),
+        last_end_at=boundary(models.Max, 'end_at__lte', at),
+        next_start_at=boundary(models.Min, 'start_at__gt', at),
+        next_end_at=boundary(models.Min, 'end_at__gt', at))
+
+
+def get_schedule_validators(conference):
+    """Get the validators of a conference annotated by
+    :py:func:`annotate_validators`, which change when the schedule is
+    edited, and when a time slot starts or ends.
+
+    :returns: Values from which the ETag is computed, and the last modified
+        time.
+    :rtype: tuple
+    """
+    next_boundaries = [value for value in [
+        conference.next_start_at, conference.next_end_at] if value]
+    last_modified = max(value for value in [
+        conference.updated_at, conference.timeslots_updated_at,
+        conference.last_start_at, conference.last_end_at] if value)
+    etag = [conference.pk, conference.updated_at,
+            conference.timeslots_updated_at, conference.timeslots_count,
+            min(next_boundaries) if next_boundaries else None]
+    return etag, last_modified
+
+
+def make_etag(parts):
+    """Make an ETag from the values returned as validators.
+
+    :rtype: str
+    """
+    value = ':'.join(str(part) for part in parts)
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+class ConditionalMixin(object):
+    """Mixin for views supporting conditional requests, answering with a
+    "304 Not Modified" response when the ``ETag`` and ``Last-Modified``
+    validators returned by :py:meth:`.get_validators` match the request.
+
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        view = condition(etag_func=self.get_etag,
+                         last_modified_func=self.get_last_modified)(
+            super(ConditionalMixin, self).dispatch)
+        return view(request, *args, **kwargs)
+
+    def get_etag(self, request, *args, **kwargs):
+        parts = self._get_validators(request, *args, **kwargs)[0]
+        if parts is not None:
+            return make_etag(parts)
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return self._get_validators(request, *args, **kwargs)[1]
+
+    def get_validators(self, request, *args, **kwargs):
+        """Get the validators for a request.
+
+        :returns: Values from which the ETag is computed (or ``None``), and
+            the last modified time (or ``None``).
+        :rtype: tuple
+        """
+        return None, None
+
+    def _get_validators(self, request, *args, **kwargs):
+        if not hasattr(self, '_validators'):
+            self._validators = self.get_validators(request, *args, **kwargs)
+        return self._validators
+
+
+class InstrumentedMixin(object):
+    """Mixin for views whose requests are measured, including the time
+    spent rendering the response, while instrumentation is enabled (see
+    :py:mod:`conference.instrumentation`).
+
+    """
+
+    #: Measurement of the current request, or ``None``.
+    measurement = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not instrumentation.is_enabled():
+            return super(InstrumentedMixin, self).dispatch(
+                request, *args, **kwargs)
+        with instrumentation.record(self.get_measurement_name()) as \
+                self.measurement:
+            response = super(InstrumentedMixin, self).dispatch(
+                request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                self.render(response)
+        return response
+
+    def get_measurement_name(self):
+        """Get the name measurements of the view are recorded as, the name
+        of its URL pattern where known.
+
+        :rtype: str
+        """
+        match = getattr(self.request, 'resolver_match', None)
+        if match is not None and match.url_name:
+            return match.view_name
+        return type(self).__name__
+
+    def render(self, response):
+        if not response.is_rendered:
+            start = time.time()
+            response.render()
+            self.measurement.render_time += time.time() - start
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super(InstrumentedMixin, self).render_to_response(
+            context, **response_kwargs)
+        if self.measurement is not None:
+            self.render(response)
+        return response
+
+
+class ScheduleConditionalMixin(ConditionalMixin):
+    """Mixin for single conference views, supporting conditional requests
+    with validators which change when the conference schedule is edited,
+    and when a time slot starts or ends.
+
+    """
+
+    def get_object(self, queryset=None):
+        # The object is already loaded when the validators are computed.
+        if queryset is None and getattr(self, 'object', None) is not None:
+            return self.object
+        return super(ScheduleConditionalMixin, self).get_object(
+            queryset=queryset)
+
+    def get_validators(self, request, *args, **kwargs):
+        """Get the validators from aggregates computed in the same query
+        which loads the conference."""
+        queryset = annotate_validators(self.get_queryset(), timezone.now())
+        self.object = self.get_object(queryset=queryset)
+        return get_schedule_validators(self.object)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2016 Matt Austin
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import, unicode_literals
+from ..models import Conference
+from ..search import search
+from django.views import generic
+
+
+class SearchView(generic.detail.SingleObjectMixin, generic.TemplateView):
+    """Search a conference's time slots, and their presenters."""
+
+    model = Conference
+
+    template_name = 'conference/conference_search.html'
+
+    #: Maximum number of results.
+    limit = 50
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(SearchView, self).get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        query = self.request.GET.get('q', '').strip()
+        kwargs['query'] = query
+        kwargs['results'] = search(query, conference=self.object,
+                                   limit=self.limit) if query else []
+        kwargs['next'] = self.request.get_full_path()
+        return super(SearchView, self).get_context_data(**kwargs)
@@ -27,12 +27,37 @@ settings.configure(
     DATABASES={
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-        }
+        },
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+        },
     },
     INSTALLED_APPS=[
+        'django.contrib.admin',
+        'django.contrib.auth',
         'django.contrib.contenttypes',
+        'django.contrib.messages',
+        'django.contrib.sessions',
         'conference',
     ],
+    MIDDLEWARE_CLASSES=[
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    ],
+    ROOT_URLCONF='conference.tests.urls',
+    TEMPLATES=[
+        {
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {
+                'context_processors': [
+                    'django.contrib.auth.context_processors.auth',
+                    'django.contrib.messages.context_processors.messages',
+                ],
+            },
+        },
+    ],
 )
 
 
@@ -31,7 +31,7 @@ setup(
     version=__version__,
 
     # Packaging
-    packages=find_packages(exclude=['docs']),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'docs']),
     include_package_data=True,
 
     # Dependencies